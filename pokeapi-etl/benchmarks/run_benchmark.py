@@ -0,0 +1,264 @@
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from sqlalchemy import func, select
+
+from benchmarks.stub_server import PokeApiStub
+from data_models.models import Base, Pokemon
+from etl import orchestrate
+from etl.extract import extractor
+from utils.config import Config
+from utils.database import configure_database, get_database_engine
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Relative slack before a metric counts as a regression, and the absolute latency
+# change (ms) below which p99 differences are treated as noise
+DEFAULT_TOLERANCE = 0.2
+LATENCY_NOISE_MS = 1.0
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of `samples`, or None when empty"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StageTimer:
+    """Times calls to module-level pipeline functions while active"""
+
+    # stage name -> (module, function name); load is timed per batch
+    STAGES = {
+        "extract": (extractor, "extract_pokemon"),
+        "transform": (orchestrate, "_transform_record"),
+        "load": (orchestrate, "_load_batch"),
+    }
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in self.STAGES}
+        self._originals = {}
+
+    def _timed(self, stage, function):
+        samples = self.samples[stage]
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+
+        return timed
+
+    def __enter__(self):
+        for stage, (module, name) in self.STAGES.items():
+            original = getattr(module, name)
+            self._originals[stage] = original
+            setattr(module, name, self._timed(stage, original))
+        return self
+
+    def __exit__(self, *exc_info):
+        for stage, (module, name) in self.STAGES.items():
+            setattr(module, name, self._originals[stage])
+        return False
+
+    def summary(self):
+        return {
+            stage: {
+                "count": len(samples),
+                "p50_ms": round(percentile(samples, 50) * 1000, 3) if samples else None,
+                "p99_ms": round(percentile(samples, 99) * 1000, 3) if samples else None,
+            }
+            for stage, samples in self.samples.items()
+        }
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_benchmark(
+    database_url,
+    count=200,
+    workers=8,
+    streaming=True,
+    batch_size=None,
+    latency=0.0,
+    jitter=0.0,
+    error_rate=0.0,
+    recorded_dir=None,
+):
+    """Run the pipeline end to end over `count` IDs served by a local stub; returns metrics
+
+    `database_url` is dropped and recreated first, so point it at a scratch database.
+    """
+    previous_engine = get_database_engine()
+    engine = configure_database(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    saved_base_url = extractor.POKEAPI_BASE_URL
+    with PokeApiStub(latency, jitter, error_rate, recorded_dir=recorded_dir) as stub:
+        # The stub is local, so the production politeness limits would only measure sleeps
+        extractor.POKEAPI_BASE_URL = stub.base_url
+        extractor.configure_rate_limiter(
+            rate=None, adaptive=False, concurrency=max(workers, Config.MAX_CONCURRENT_REQUESTS)
+        )  # unpaced
+        extractor.configure_response_cache("off")
+        try:
+            with StageTimer() as timer:
+                started = time.perf_counter()
+                orchestrate.run_etl_pipeline(
+                    1, count, workers=workers, streaming=streaming, batch_size=batch_size
+                )
+                elapsed = time.perf_counter() - started
+        finally:
+            extractor.POKEAPI_BASE_URL = saved_base_url
+            extractor.configure_rate_limiter()
+            extractor.close_http_session()
+            configure_database(previous_engine)
+        http_requests = dict(stub.requests)
+
+    with engine.connect() as connection:
+        loaded = connection.execute(select(func.count()).select_from(Pokemon)).scalar_one()
+    engine.dispose()
+
+    return {
+        "database": engine.dialect.name,
+        "records": loaded,
+        "seconds": round(elapsed, 3),
+        "records_per_sec": round(loaded / elapsed, 2) if elapsed else None,
+        "stages": timer.summary(),
+        "peak_rss_mb": _peak_rss_mb(),
+        "http_requests": http_requests,
+    }
+
+
+def run_isolated(database_url, **options):
+    """Run one benchmark in a fresh process so peak RSS is not shared between targets"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(run_benchmark, database_url, **options).result()
+
+
+def compare_to_baseline(result, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return human-readable regressions of `result` against a baseline result"""
+    regressions = []
+    if baseline.get("records_per_sec") and result["records_per_sec"] is not None:
+        floor = baseline["records_per_sec"] * (1 - tolerance)
+        if result["records_per_sec"] < floor:
+            regressions.append(
+                f"throughput {result['records_per_sec']} records/s < "
+                f"{baseline['records_per_sec']} baseline"
+            )
+    for stage, metrics in result["stages"].items():
+        base_p99 = baseline.get("stages", {}).get(stage, {}).get("p99_ms")
+        p99 = metrics["p99_ms"]
+        if base_p99 is None or p99 is None:
+            continue
+        if p99 > base_p99 * (1 + tolerance) and p99 - base_p99 > LATENCY_NOISE_MS:
+            regressions.append(f"{stage} p99 {p99} ms > {base_p99} ms baseline")
+    if baseline.get("peak_rss_mb") and result["peak_rss_mb"] > baseline["peak_rss_mb"] * (
+        1 + tolerance
+    ):
+        regressions.append(
+            f"peak RSS {result['peak_rss_mb']} MB > {baseline['peak_rss_mb']} MB baseline"
+        )
+    return regressions
+
+
+def _format(result):
+    lines = [
+        f"[{result['database']}] {result['records']} records in {result['seconds']} s "
+        f"= {result['records_per_sec']} records/s, peak RSS {result['peak_rss_mb']} MB",
+    ]
+    for stage, metrics in result["stages"].items():
+        lines.append(
+            f"  {stage:<9} n={metrics['count']:<6} p50={metrics['p50_ms']} ms  "
+            f"p99={metrics['p99_ms']} ms"
+        )
+    lines.append(f"  HTTP requests: {result['http_requests']}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the ETL pipeline against a local PokeAPI stub"
+    )
+    parser.add_argument(
+        "--database-url",
+        action="append",
+        help="Scratch database to benchmark against (repeatable; default: a temporary SQLite file). "
+        "Its tables are dropped and recreated.",
+    )
+    parser.add_argument("--count", type=int, default=200, help="Pokémon IDs to run")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--no-stream", dest="streaming", action="store_false")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub response delay (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, up to (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--recorded-dir", help="Serve recorded <resource>/<id>.json payloads")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = dict(
+        count=args.count,
+        workers=args.workers,
+        streaming=args.streaming,
+        batch_size=args.batch_size,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        recorded_dir=args.recorded_dir,
+    )
+
+    with tempfile.TemporaryDirectory() as scratch:
+        urls = args.database_url or [f"sqlite:///{os.path.join(scratch, 'benchmark.db')}"]
+        results = [run_isolated(url, **options) for url in urls]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressed = False
+    for result in results:
+        print(_format(result))
+        if result["database"] in baseline:
+            for regression in compare_to_baseline(
+                result, baseline[result["database"]], args.tolerance
+            ):
+                regressed = True
+                print(f"  REGRESSION: {regression}")
+
+    if args.save_baseline:
+        baseline.update({result["database"]: result for result in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
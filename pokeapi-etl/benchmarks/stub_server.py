@@ -0,0 +1,208 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESOURCES = ("pokemon", "pokemon-species", "evolution-chain")
+POKEAPI_BASE_URL = "https://pokeapi.co/api/v2/"
+
+TYPE_NAMES = [
+    "normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+    "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy",
+]
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+_PATH = re.compile(r"^/api/v2/(?P<resource>[a-z-]+)/(?P<id>\d+)/?$")
+
+
+class PokeApiStub:
+    """Local stand-in for PokeAPI serving pokemon, species and evolution-chain JSON
+
+    Payloads come from `recorded_dir` (`<resource>/<id>.json`, as saved from the real
+    API) when given, otherwise they are generated deterministically: every `family_size`
+    consecutive IDs share one species line and evolution chain, like real families do.
+    Each response waits `latency` seconds plus up to `jitter` more, and a fraction
+    `error_rate` of requests fail with 503 so client retries are exercised.
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        recorded_dir=None,
+        family_size=3,
+        seed=0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.recorded_dir = recorded_dir
+        self.family_size = family_size
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v2/"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="pokeapi-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def _draw(self):
+        """Return (delay, fail) for one request"""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        return delay, fail
+
+    def respond(self, resource, item_id):
+        """Return (status, body) for one resource request"""
+        delay, fail = self._draw()
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.requests[resource] += 1
+            if fail:
+                self.requests["errors"] += 1
+        if fail:
+            return 503, {"detail": "Injected failure"}
+
+        payload = self._payload(resource, item_id)
+        if payload is None:
+            return 404, {"detail": "Not found."}
+        return 200, payload
+
+    def _payload(self, resource, item_id):
+        if self.recorded_dir:
+            path = os.path.join(self.recorded_dir, resource, f"{item_id}.json")
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.loads(f.read().replace(POKEAPI_BASE_URL, self.base_url))
+        if resource == "pokemon":
+            return generate_pokemon(item_id, self.base_url)
+        if resource == "pokemon-species":
+            return generate_species(item_id, self.base_url, self.family_size)
+        return generate_evolution_chain(item_id, self.base_url, self.family_size)
+
+
+def _handler_for(stub):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+        disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+        def do_GET(self):
+            match = _PATH.match(self.path.split("?", 1)[0])
+            if match and match["resource"] in RESOURCES:
+                status, payload = stub.respond(match["resource"], int(match["id"]))
+            else:
+                status, payload = 404, {"detail": "Not found."}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def _named(kind, name, item_id, base_url):
+    return {"name": name, "url": f"{base_url}{kind}/{item_id}/"}
+
+
+def generate_pokemon(pokemon_id, base_url):
+    """Deterministic /pokemon/<id> payload with the fields the pipeline reads"""
+    type_ids = sorted({pokemon_id % len(TYPE_NAMES), (pokemon_id * 7) % len(TYPE_NAMES)})
+    return {
+        "id": pokemon_id,
+        "name": f"stubmon-{pokemon_id}",
+        "height": 3 + pokemon_id % 20,
+        "weight": 20 + (pokemon_id * 37) % 900,
+        "base_experience": 50 + (pokemon_id * 13) % 250,
+        "is_default": True,
+        "types": [
+            {"slot": slot, "type": _named("type", TYPE_NAMES[type_id], type_id + 1, base_url)}
+            for slot, type_id in enumerate(type_ids, start=1)
+        ],
+        "abilities": [
+            {
+                "slot": slot,
+                "is_hidden": slot == 2,
+                "ability": _named("ability", f"ability-{ability_id}", ability_id, base_url),
+            }
+            for slot, ability_id in enumerate(
+                sorted({1 + pokemon_id % 60, 1 + (pokemon_id * 11) % 60}), start=1
+            )
+        ],
+        "stats": [
+            {
+                "base_stat": 20 + (pokemon_id * 31 + index * 17) % 140,
+                "effort": 1 if index == pokemon_id % len(STAT_NAMES) else 0,
+                "stat": _named("stat", stat_name, index + 1, base_url),
+            }
+            for index, stat_name in enumerate(STAT_NAMES)
+        ],
+        "species": _named("pokemon-species", f"stubmon-{pokemon_id}", pokemon_id, base_url),
+    }
+
+
+def _chain_id(species_id, family_size):
+    return (species_id - 1) // family_size + 1
+
+
+def generate_species(species_id, base_url, family_size=3):
+    """Deterministic /pokemon-species/<id> payload pointing at its family's chain"""
+    return {
+        "id": species_id,
+        "name": f"stubmon-{species_id}",
+        "evolution_chain": {
+            "url": f"{base_url}evolution-chain/{_chain_id(species_id, family_size)}/"
+        },
+    }
+
+
+def generate_evolution_chain(chain_id, base_url, family_size=3):
+    """Deterministic linear /evolution-chain/<id> payload over `family_size` species"""
+    first = (chain_id - 1) * family_size + 1
+    link = None
+    for species_id in reversed(range(first, first + family_size)):
+        link = {
+            "is_baby": False,
+            "species": _named("pokemon-species", f"stubmon-{species_id}", species_id, base_url),
+            "evolution_details": [] if species_id == first else [{"min_level": 16}],
+            "evolves_to": [link] if link else [],
+        }
+    return {"id": chain_id, "baby_trigger_item": None, "chain": link}
@@ -1,11 +1,26 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
 
+# Name arrays are native on PostgreSQL; SQLite (tests) stores them as JSON lists
+NameArray = ARRAY(String(100)).with_variant(JSON(), "sqlite")
+
 
 class Pokemon(Base):
     __tablename__ = "pokemon"
+    __table_args__ = (Index("ix_pokemon_name", "name"),)
 
     pokemon_id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -40,6 +55,10 @@ class Ability(Base):
 
 class PokemonType(Base):
     __tablename__ = "pokemon_types"
+    __table_args__ = (
+        # The primary key leads with pokemon_id; type filters search from the type side
+        Index("ix_pokemon_types_type_id", "type_id"),
+    )
 
     pokemon_id = Column(Integer, ForeignKey("pokemon.pokemon_id"), primary_key=True)
     type_id = Column(Integer, ForeignKey("types.type_id"), primary_key=True)
@@ -50,6 +69,7 @@ class PokemonType(Base):
 
 class PokemonAbility(Base):
     __tablename__ = "pokemon_abilities"
+    __table_args__ = (Index("ix_pokemon_abilities_ability_id", "ability_id"),)
 
     pokemon_id = Column(Integer, ForeignKey("pokemon.pokemon_id"), primary_key=True)
     ability_id = Column(Integer, ForeignKey("abilities.ability_id"), primary_key=True)
@@ -60,6 +80,12 @@ class PokemonAbility(Base):
 
 class PokemonStat(Base):
     __tablename__ = "pokemon_stats"
+    __table_args__ = (
+        # Natural key used by the loader's upserts; also serves lookups by pokemon_id
+        Index("uq_pokemon_stats_pokemon_stat", "pokemon_id", "stat_name", unique=True),
+        # "Sort by <stat>" reads one stat's rows in base_stat order
+        Index("ix_pokemon_stats_stat_name_base_stat", "stat_name", "base_stat"),
+    )
 
     stat_id = Column(Integer, primary_key=True, autoincrement=True)
     pokemon_id = Column(Integer, ForeignKey("pokemon.pokemon_id"), nullable=False)
@@ -68,3 +94,130 @@ class PokemonStat(Base):
     effort = Column(Integer, default=0)
 
     pokemon = relationship("Pokemon", back_populates="stats")
+
+
+class PokemonContentHash(Base):
+    __tablename__ = "pokemon_content_hashes"
+
+    pokemon_id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PokemonSummary(Base):
+    """Denormalized read model: one row per Pokémon, maintained by the ETL after each load"""
+
+    __tablename__ = "pokemon_summary"
+    __table_args__ = (
+        Index("ix_pokemon_summary_name", "name"),
+        # GIN answers "has type X" (type_names @> ARRAY['X']) without a sequential scan
+        Index("ix_pokemon_summary_type_names", "type_names", postgresql_using="gin"),
+        Index("ix_pokemon_summary_stat_total", "stat_total"),
+    )
+
+    pokemon_id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    height = Column(Integer)
+    weight = Column(Integer)
+    base_experience = Column(Integer)
+    is_default = Column(Boolean)
+    type_names = Column(NameArray, nullable=False)
+    ability_names = Column(NameArray, nullable=False)
+    hp = Column(Integer)
+    attack = Column(Integer)
+    defense = Column(Integer)
+    special_attack = Column(Integer)
+    special_defense = Column(Integer)
+    speed = Column(Integer)
+    stat_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class EvolutionChain(Base):
+    __tablename__ = "evolution_chains"
+
+    chain_id = Column(Integer, primary_key=True)
+    root_species_id = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class EvolutionEdge(Base):
+    __tablename__ = "evolution_edges"
+
+    from_species_id = Column(Integer, primary_key=True)
+    to_species_id = Column(Integer, primary_key=True)
+    chain_id = Column(Integer, ForeignKey("evolution_chains.chain_id"), nullable=False, index=True)
+    trigger = Column(String(50))
+    min_level = Column(Integer)
+
+
+class EvolutionClosure(Base):
+    """Every (ancestor, descendant) species pair of a chain, self pairs at depth 0 included"""
+
+    __tablename__ = "evolution_closure"
+    __table_args__ = (
+        Index("ix_evolution_closure_descendant", "descendant_species_id"),
+    )
+
+    ancestor_species_id = Column(Integer, primary_key=True)
+    descendant_species_id = Column(Integer, primary_key=True)
+    chain_id = Column(Integer, ForeignKey("evolution_chains.chain_id"), nullable=False, index=True)
+    depth = Column(Integer, nullable=False)
+    descendant_name = Column(String(255))
+    descendant_is_final = Column(Boolean, nullable=False)
+
+
+class EtlRun(Base):
+    __tablename__ = "etl_runs"
+
+    run_id = Column(Integer, primary_key=True, autoincrement=True)
+    start_id = Column(Integer, nullable=False)
+    end_id = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="running")
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    checkpoints = relationship("EtlCheckpoint", back_populates="run")
+
+
+class EtlCheckpoint(Base):
+    __tablename__ = "etl_checkpoints"
+
+    run_id = Column(Integer, ForeignKey("etl_runs.run_id"), primary_key=True)
+    pokemon_id = Column(Integer, primary_key=True)
+    status = Column(String(20), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+    run = relationship("EtlRun", back_populates="checkpoints")
+
+
+class EtlWorkItem(Base):
+    __tablename__ = "etl_work_items"
+
+    item_id = Column(Integer, primary_key=True, autoincrement=True)
+    start_id = Column(Integer, nullable=False)
+    end_id = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    worker_id = Column(String(255))
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_expires_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class EtlDeadLetter(Base):
+    """A Pokémon with a resource the pipeline could not fetch, kept until a retry loads it"""
+
+    __tablename__ = "etl_dead_letters"
+
+    pokemon_id = Column(Integer, primary_key=True)
+    resource = Column(String(50), nullable=False)  # endpoint kind of the failed URL
+    url = Column(String(255), nullable=False)
+    error_class = Column(String(50), nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    run_id = Column(Integer)  # last run that failed it
+    first_failed_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_failed_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
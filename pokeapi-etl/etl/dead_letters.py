@@ -0,0 +1,135 @@
+from sqlalchemy import case, func, select, update
+from data_models.models import EtlDeadLetter
+from etl.load.loader import upsert_insert
+from utils.database import with_session
+from utils.config import Config
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DEAD_LETTER_MAX_ATTEMPTS = Config.DEAD_LETTER_MAX_ATTEMPTS
+
+# Keeps IN lists well under every driver's bound-parameter limit
+RESOLVE_CHUNK_SIZE = 1000
+
+
+def is_permanent(error_class):
+    """Whether retrying cannot help: client errors other than timeouts and rate limiting"""
+    if not error_class.startswith("http_"):
+        return False
+    status = int(error_class[len("http_"):])
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+def record_dead_letters(failures, run_id=None, max_attempts=DEAD_LETTER_MAX_ATTEMPTS, session=None):
+    """Upsert failed fetches (see `extract_pokemon`) as dead letters; returns the number stored
+
+    One row is kept per Pokémon, with the resource and error class of its latest failed
+    pass. Each failed pass adds an attempt; rows are 'abandoned' after `max_attempts`, or
+    at once for permanent errors such as a 404, and stay 'pending' for retries otherwise.
+    """
+    rows = {}
+    for failure in failures:
+        rows.setdefault(failure["pokemon_id"], failure)
+    if not rows:
+        return 0
+
+    def work(session):
+        insert = upsert_insert(session)
+        statement = insert(EtlDeadLetter).values(
+            [
+                {
+                    "pokemon_id": pokemon_id,
+                    "resource": failure["resource"],
+                    "url": failure["url"],
+                    "error_class": failure["error_class"],
+                    "attempts": 1,
+                    "status": "abandoned"
+                    if is_permanent(failure["error_class"]) or max_attempts <= 1
+                    else "pending",
+                    "run_id": run_id,
+                }
+                for pokemon_id, failure in sorted(rows.items())
+            ]
+        )
+        # A resolved Pokémon failing again starts a fresh attempt count
+        attempts = case(
+            (EtlDeadLetter.status == "resolved", 1), else_=EtlDeadLetter.attempts + 1
+        )
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["pokemon_id"],
+                set_={
+                    "resource": statement.excluded.resource,
+                    "url": statement.excluded.url,
+                    "error_class": statement.excluded.error_class,
+                    "attempts": attempts,
+                    "status": case(
+                        (statement.excluded.status == "abandoned", "abandoned"),
+                        (attempts >= max_attempts, "abandoned"),
+                        else_="pending",
+                    ),
+                    "run_id": statement.excluded.run_id,
+                    "last_failed_at": func.now(),
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        return len(rows)
+
+    stored = with_session(session, work)
+    logger.warning(f"Recorded {stored} Pokémon with failed fetches in the dead-letter table.")
+    return stored
+
+
+def resolve_dead_letters(pokemon_ids, session=None):
+    """Mark the dead letters of Pokémon that have since been loaded as 'resolved'; returns how many"""
+    pokemon_ids = sorted(set(pokemon_ids))
+
+    def work(session):
+        resolved = 0
+        for start in range(0, len(pokemon_ids), RESOLVE_CHUNK_SIZE):
+            resolved += session.execute(
+                update(EtlDeadLetter)
+                .where(
+                    EtlDeadLetter.pokemon_id.in_(pokemon_ids[start : start + RESOLVE_CHUNK_SIZE]),
+                    EtlDeadLetter.status != "resolved",
+                )
+                .values(status="resolved", updated_at=func.now())
+            ).rowcount
+        return resolved
+
+    if not pokemon_ids:
+        return 0
+    resolved = with_session(session, work)
+    if resolved:
+        logger.info(f"Resolved {resolved} dead-lettered Pokémon.")
+    return resolved
+
+
+def dead_letter_ids(statuses=("pending",), limit=None, session=None):
+    """Sorted pokemon_ids of the dead letters in `statuses`, at most `limit` of them"""
+
+    def work(session):
+        query = (
+            select(EtlDeadLetter.pokemon_id)
+            .where(EtlDeadLetter.status.in_(statuses))
+            .order_by(EtlDeadLetter.pokemon_id)
+        )
+        if limit:
+            query = query.limit(limit)
+        return list(session.execute(query).scalars())
+
+    return with_session(session, work)
+
+
+def dead_letter_counts(session=None):
+    """Count dead letters by status"""
+
+    def work(session):
+        rows = session.execute(
+            select(EtlDeadLetter.status, func.count()).group_by(EtlDeadLetter.status)
+        ).all()
+        return dict(rows)
+
+    return with_session(session, work)
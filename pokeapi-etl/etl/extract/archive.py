@@ -0,0 +1,152 @@
+import mmap
+import os
+import re
+import threading
+import zlib
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+ARCHIVE_MODES = ("off", "record", "replay")
+INDEX_FILE = "index.tsv"
+
+_RESOURCE = re.compile(r"/api/v2/([a-z-]+)/?(.*?)/?$")
+
+
+def resource_key(url):
+    """(resource type, ID) of a PokeAPI URL, independent of host and trailing slash
+
+    URLs that are not `<type>/<id>` (list pages with a query string, for instance)
+    use the rest of the path and query as their ID.
+    """
+    path, _, query = url.partition("?")
+    match = _RESOURCE.search(path)
+    if not match:
+        return "other", url
+    kind, resource_id = match.groups()
+    return kind, f"{resource_id}?{query}" if query else resource_id
+
+
+class PayloadArchive:
+    """Append-only store of raw response bodies in compressed segment files
+
+    Each body is zlib-compressed on its own and appended to the current
+    `segment-NNNNNN.seg` file; a line in `index.tsv` maps its resource type and ID to
+    (segment, offset, length). Bodies are written before their index line, so the index
+    never points past the data. Segments roll over at `segment_max_bytes`. Reads go
+    through read-only memory maps of the segments, and the latest copy of a resource wins.
+    Appending a body identical to the latest copy of its resource writes nothing.
+    """
+
+    def __init__(self, archive_dir, segment_max_bytes=64 * 1024 * 1024):
+        self.archive_dir = archive_dir
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.Lock()
+        self._index = {}
+        self._maps = {}
+        self._segment = None
+        self._segment_file = None
+        self._index_file = None
+        os.makedirs(archive_dir, exist_ok=True)
+        self._load_index()
+
+    def _segment_path(self, segment):
+        return os.path.join(self.archive_dir, f"segment-{segment:06d}.seg")
+
+    def _load_index(self):
+        path = os.path.join(self.archive_dir, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) != 5:
+                    continue  # torn final line from an interrupted write
+                kind, resource_id, segment, offset, length = fields
+                self._index[(kind, resource_id)] = (int(segment), int(offset), int(length))
+        logger.info(f"Payload archive at {self.archive_dir} indexes {len(self._index)} responses.")
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return list(self._index)
+
+    def _open_segment(self):
+        """Open the segment to append to, rolling over once it is full"""
+        if self._segment_file is not None:
+            if self._segment_file.tell() < self.segment_max_bytes:
+                return
+            self._segment_file.close()
+            self._segment += 1
+        else:
+            existing = [
+                int(name[len("segment-") : -len(".seg")])
+                for name in os.listdir(self.archive_dir)
+                if name.startswith("segment-") and name.endswith(".seg")
+            ]
+            self._segment = max(existing, default=1)
+            path = self._segment_path(self._segment)
+            if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+                self._segment += 1
+        self._segment_file = open(self._segment_path(self._segment), "ab")
+        if self._index_file is None:
+            self._index_file = open(
+                os.path.join(self.archive_dir, INDEX_FILE), "a", encoding="utf-8"
+            )
+
+    def append(self, kind, resource_id, content):
+        """Archive one raw response body under its resource type and ID; returns whether it was written"""
+        blob = zlib.compress(content)
+        with self._lock:
+            location = self._index.get((kind, str(resource_id)))
+            if location is not None and location[2] == len(blob):
+                segment, offset, length = location
+                if self._map(segment, offset + length)[offset : offset + length] == blob:
+                    return False
+            self._open_segment()
+            offset = self._segment_file.tell()
+            self._segment_file.write(blob)
+            self._segment_file.flush()
+            self._index_file.write(f"{kind}\t{resource_id}\t{self._segment}\t{offset}\t{len(blob)}\n")
+            self._index_file.flush()
+            self._index[(kind, str(resource_id))] = (self._segment, offset, len(blob))
+        return True
+
+    def append_url(self, url, content):
+        return self.append(*resource_key(url), content)
+
+    def _map(self, segment, end):
+        """Read-only memory map of a segment covering at least `end` bytes"""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            with open(self._segment_path(segment), "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def get(self, kind, resource_id):
+        """Return the archived raw body for a resource, or None"""
+        location = self._index.get((kind, str(resource_id)))
+        if location is None:
+            return None
+        segment, offset, length = location
+        with self._lock:
+            mapped = self._map(segment, offset + length)
+        return zlib.decompress(mapped[offset : offset + length])
+
+    def get_url(self, url):
+        return self.get(*resource_key(url))
+
+    def close(self):
+        with self._lock:
+            for handle in (self._segment_file, self._index_file):
+                if handle is not None:
+                    handle.close()
+            self._segment_file = self._index_file = None
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
@@ -0,0 +1,59 @@
+from etl.extract import extractor
+from utils.config import Config
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DISCOVERY_PAGE_SIZE = Config.DISCOVERY_PAGE_SIZE
+
+
+def list_page_url(offset, limit, resource="pokemon"):
+    return f"{extractor.POKEAPI_BASE_URL}{resource}?limit={limit}&offset={offset}"
+
+
+def page_ids(page):
+    """IDs of the resources listed on one page, parsed from their URLs"""
+    ids = []
+    for result in (page or {}).get("results") or ():
+        try:
+            ids.append(int(result["url"].rstrip("/").split("/")[-1]))
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Skipping list entry without a resource ID: {result}")
+    return ids
+
+
+def discover_pokemon_ids(page_size=None, workers=None, start_id=None, end_id=None):
+    """Enumerate the Pokémon IDs that exist, from the paginated `/pokemon` list endpoint
+
+    The first page gives the total count; the remaining pages are fetched concurrently
+    on `workers` threads under the usual request-rate cap. Alternate forms (IDs 10001+)
+    are included. IDs outside `start_id`..`end_id` are dropped when those are given.
+    Returns the sorted IDs, or None when any page could not be fetched, since a partial
+    listing would silently leave Pokémon out of the run.
+    """
+    page_size = page_size or DISCOVERY_PAGE_SIZE
+    first_page = extractor.fetch_data(list_page_url(0, page_size))
+    if not first_page or "count" not in first_page:
+        logger.error("Pokémon discovery failed: could not fetch the first list page.")
+        return None
+
+    offsets = range(page_size, first_page["count"], page_size)
+    pages = extractor.fetch_all(
+        [list_page_url(offset, page_size) for offset in offsets], workers=workers
+    )
+    missing = [offset for offset, page in zip(offsets, pages) if page is None]
+    if missing:
+        logger.error(f"Pokémon discovery failed: {len(missing)} list pages could not be fetched.")
+        return None
+
+    ids = {pokemon_id for page in [first_page, *pages] for pokemon_id in page_ids(page)}
+    ids = sorted(
+        pokemon_id
+        for pokemon_id in ids
+        if (start_id is None or pokemon_id >= start_id) and (end_id is None or pokemon_id <= end_id)
+    )
+    logger.info(
+        f"Discovered {len(ids)} Pokémon IDs from {len(offsets) + 1} list pages "
+        f"({first_page['count']} listed)."
+    )
+    return ids
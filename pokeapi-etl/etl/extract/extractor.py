@@ -2,80 +2,396 @@ import requests
 import logging
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from utils.helpers import get_request_delay
-from utils.logging_config import setup_logging
+from etl.extract.response_cache import ResponseCache, CACHE_MODES
+from etl.extract.archive import PayloadArchive, ARCHIVE_MODES
+from etl.extract.projection import decode_payload
+from utils.helpers import AdaptiveRateLimiter, SingleFlight, retry_after_seconds
+from utils.logging_config import setup_logging, SampledLogger
 from utils.config import Config
+from utils.metrics import metrics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 import os
+import re
 
 logger = setup_logging(__name__)
+sampled_logger = SampledLogger(logger)
 
 POKEAPI_BASE_URL = Config.POKEAPI_BASE_URL
 API_RETRIES = Config.API_RETRIES
 API_BACKOFF_FACTOR = Config.API_BACKOFF_FACTOR
+EXTRACT_WORKERS = Config.EXTRACT_WORKERS
+MAX_REQUESTS_PER_SECOND = Config.MAX_REQUESTS_PER_SECOND
+SHARED_FETCH_CACHE_SIZE = Config.SHARED_FETCH_CACHE_SIZE
+HTTP_TIMEOUT = (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
 
+# Process-wide pooled session shared by every fetch_data caller
+_http_session = None
+_http_session_lock = threading.Lock()
 
-def create_retry_session(retries=API_RETRIES, backoff_factor=API_BACKOFF_FACTOR):
-    """Creates a requests session with retry logic."""
+# On-disk response cache, configured from HTTP_CACHE_MODE on first use
+_response_cache = None
+_response_cache_mode = None
+
+# Raw-payload archive, configured from PAYLOAD_ARCHIVE_MODE on first use
+_payload_archive = None
+_payload_archive_mode = None
+
+# Run-scoped memo so shared species/evolution-chain URLs are fetched once per run
+_shared_fetches = None
+
+# Process-wide limiter every request goes through, built from the config on first use
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+# Why the calling thread's last fetch_data call returned None ('timeout', 'http_503', ...)
+_fetch_errors = threading.local()
+
+_ENDPOINT_KIND = re.compile(r"/api/v2/([a-z-]+)/?([^/?]*)")
+
+
+class MeteredRetry(Retry):
+    """urllib3 Retry that counts retries and the time spent backing off between them"""
+
+    def sleep(self, response=None):
+        if response is not None and response.status in (429, 503):
+            # Throttled responses retried here never reach fetch_data; slow every caller down
+            get_rate_limiter().throttle(self.get_retry_after(response))
+        started = time.perf_counter()
+        try:
+            super().sleep(response)
+        finally:
+            metrics.inc("etl_http_retries_total")
+            metrics.inc("etl_http_backoff_seconds_total", time.perf_counter() - started)
+
+
+def endpoint_kind(url):
+    """PokeAPI resource a URL points at ('pokemon', 'pokemon-species', 'pokemon-list', ...)"""
+    match = _ENDPOINT_KIND.search(url)
+    if not match:
+        return "other"
+    kind, resource_id = match.groups()
+    return kind if resource_id else f"{kind}-list"
+
+
+def create_retry_session(
+    retries=API_RETRIES,
+    backoff_factor=API_BACKOFF_FACTOR,
+    pool_connections=Config.HTTP_POOL_CONNECTIONS,
+    pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+):
+    """Creates a requests session with retry logic and a keep-alive connection pool."""
     session = requests.Session()
-    retry = Retry(
+    retry = MeteredRetry(
         total=retries,
         read=retries,
         connect=retries,
         backoff_factor=backoff_factor,
-        status_forcelist=(500, 502, 503, 504),
+        status_forcelist=(429, 500, 502, 503, 504),
         allowed_methods=frozenset(["GET", "POST"]),
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+    )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 
+def configure_rate_limiter(**overrides):
+    """(Re)build the shared rate limiter from the config, with keyword overrides"""
+    global _rate_limiter
+    options = dict(
+        rate=min(Config.INITIAL_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND)
+        if MAX_REQUESTS_PER_SECOND > 0
+        else None,
+        min_rate=Config.MIN_REQUESTS_PER_SECOND,
+        max_rate=MAX_REQUESTS_PER_SECOND,
+        concurrency=Config.MAX_CONCURRENT_REQUESTS,
+        adaptive=Config.RATE_LIMIT_ADAPTIVE,
+        latency_target=Config.RATE_LIMIT_LATENCY_TARGET,
+    )
+    options.update(overrides)
+    with _rate_limiter_lock:
+        _rate_limiter = AdaptiveRateLimiter(**options)
+    return _rate_limiter
+
+
+def get_rate_limiter():
+    """Return the shared rate limiter, creating it on first use"""
+    if _rate_limiter is None:
+        configure_rate_limiter()
+    return _rate_limiter
+
+
+def get_http_session():
+    """Return the long-lived pooled session, creating it on first use"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = create_retry_session()
+    return _http_session
+
+
+def close_http_session():
+    """Close the pooled session; the next fetch_data call opens a fresh one"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+        _http_session = None
+
+
+def configure_response_cache(mode=None, cache_dir=None):
+    """Select the response cache mode ('off', 'on' or 'offline') for this process"""
+    global _response_cache, _response_cache_mode
+    mode = (mode or Config.HTTP_CACHE_MODE).lower()
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown HTTP cache mode '{mode}', expected one of {CACHE_MODES}")
+
+    _response_cache_mode = mode
+    _response_cache = None
+    if mode != "off":
+        _response_cache = ResponseCache(
+            cache_dir or Config.HTTP_CACHE_DIR,
+            ttl=Config.HTTP_CACHE_TTL,
+            max_bytes=Config.HTTP_CACHE_MAX_BYTES,
+            offline=mode == "offline",
+        )
+        logger.info(f"HTTP response cache enabled ({mode}) at {_response_cache.cache_dir}")
+    return _response_cache
+
+
+def get_response_cache():
+    """Return the configured response cache, or None when caching is off"""
+    if _response_cache_mode is None:
+        configure_response_cache()
+    return _response_cache
+
+
+def configure_payload_archive(mode=None, archive_dir=None):
+    """Select the raw-payload archive mode ('off', 'record' or 'replay') for this process"""
+    global _payload_archive, _payload_archive_mode
+    mode = (mode or Config.PAYLOAD_ARCHIVE_MODE).lower()
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Unknown payload archive mode '{mode}', expected one of {ARCHIVE_MODES}")
+
+    if _payload_archive is not None:
+        _payload_archive.close()
+    _payload_archive_mode = mode
+    _payload_archive = None
+    if mode != "off":
+        _payload_archive = PayloadArchive(
+            archive_dir or Config.PAYLOAD_ARCHIVE_DIR,
+            segment_max_bytes=Config.PAYLOAD_ARCHIVE_SEGMENT_BYTES,
+        )
+        logger.info(f"Payload archive enabled ({mode}) at {_payload_archive.archive_dir}")
+    return _payload_archive
+
+
+def get_payload_archive():
+    """Return the configured payload archive, or None when archiving is off"""
+    if _payload_archive_mode is None:
+        configure_payload_archive()
+    return _payload_archive
+
+
+def _fetch_failed(error_class):
+    _fetch_errors.last = error_class
+    return None
+
+
+def last_fetch_error():
+    """Error class of the calling thread's last failed fetch_data call, or None if it succeeded"""
+    return getattr(_fetch_errors, "last", None)
+
+
+def _replay_archived(url, endpoint, archive):
+    """Serve a fetch from the archive in replay mode; a missing payload is a miss, not a fetch"""
+    content = archive.get_url(url)
+    if content is None:
+        metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="archive_miss")
+        logger.error(f"Payload archive has no response for {url}.")
+        return _fetch_failed("archive_miss")
+    metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="archive_hit")
+    try:
+        with metrics.timer("etl_http_decode_seconds", endpoint=endpoint):
+            return decode_payload(content, endpoint)
+    except ValueError as err:
+        logger.error(f"Invalid JSON archived for {url}: {err}")
+        return _fetch_failed("invalid_json")
+
+
+def _archive_cached(archive, url, entry):
+    """Archive the raw body of a response served from the cache
+
+    `PayloadArchive.append` skips bodies it already holds, so warm runs do not grow the archive.
+    """
+    if archive is None:
+        return
+    if entry.get("raw") is None:
+        logger.warning(f"Cached response for {url} has no raw body; not archived.")
+        return
+    archive.append_url(url, entry["raw"].encode("utf-8"))
+
+
+def get_connection_stats():
+    """Summarize connection reuse across the pooled session's host pools"""
+    stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0}
+    session = _http_session
+    if session is None:
+        return stats
+
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = getattr(adapter, "poolmanager", None)
+        if pools is None:
+            continue
+        for key in list(pools.pools.keys()):
+            pool = pools.pools.get(key)
+            if pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["connections_opened"] += pool.num_connections
+
+    stats["connections_reused"] = max(stats["requests"] - stats["connections_opened"], 0)
+    return stats
+
+
+def _limited_get(url, endpoint, headers):
+    """GET through the shared rate limiter, reporting the outcome back to it"""
+    session = get_http_session()
+    limiter = get_rate_limiter()
+    limiter.acquire()
+    status = retry_after = None
+    started = time.perf_counter()
+    try:
+        with metrics.timer("etl_http_request_seconds", endpoint=endpoint):
+            response = session.get(url, timeout=HTTP_TIMEOUT, headers=headers)
+        status = response.status_code
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        return response
+    finally:
+        limiter.release(time.perf_counter() - started, status, retry_after)
+        metrics.set_gauge("etl_http_rate_limit", limiter.current_rate or 0)
+        metrics.set_gauge("etl_http_concurrency_limit", limiter.concurrency)
+
+
 def fetch_data(url):
-    """Fetch data with retry logic and timeout"""
-    session = create_retry_session()
-    request_delay = get_request_delay()
+    """Fetch data with retry logic and timeout, served from the response cache when possible
+
+    Returns None once retries are exhausted; `last_fetch_error()` then tells why.
+    """
+    _fetch_errors.last = None
+    endpoint = endpoint_kind(url)
+    archive = get_payload_archive()
+    if archive is not None and _payload_archive_mode == "replay":
+        return _replay_archived(url, endpoint, archive)
+    cache = get_response_cache()
+    cached_entry = None
+    request_headers = None
+    if cache is not None:
+        cached_entry = cache.get(url)
+        if (
+            cached_entry is not None
+            and archive is not None
+            and cached_entry.get("raw") is None
+            and not cache.offline
+        ):
+            # Entries written before raw bodies were kept are refetched once so they can be archived
+            cached_entry = None
+        if cached_entry is not None and cache.is_fresh(cached_entry):
+            cache.record("hits")
+            metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="cache_hit")
+            _archive_cached(archive, url, cached_entry)
+            return cached_entry["body"]
+        if cache.offline:
+            cache.record("misses")
+            metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="cache_miss")
+            logger.error(f"Offline cache miss for {url}.")
+            return _fetch_failed("cache_miss")
+        request_headers = cache.conditional_headers(cached_entry)
 
     try:
-        response = session.get(url, timeout=(3.05, 10))
-        response.raise_for_status()
-        time.sleep(request_delay)
-        return response.json()
+        response = _limited_get(url, endpoint, request_headers)
+        metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome=str(response.status_code))
+        metrics.inc("etl_http_bytes_downloaded_total", len(response.content), endpoint=endpoint)
+        if cached_entry is not None and response.status_code == 304:
+            cache.record("revalidated")
+            cache.put(url, cached_entry["body"], response.headers, entry=cached_entry)
+            data = cached_entry["body"]
+            _archive_cached(archive, url, cached_entry)
+        else:
+            response.raise_for_status()
+            with metrics.timer("etl_http_decode_seconds", endpoint=endpoint):
+                data = decode_payload(response.content, endpoint)
+            if archive is not None:
+                archive.append_url(url, response.content)
+            if cache is not None:
+                cache.record("misses")
+                # The raw body is only kept for archiving; it would double every entry otherwise
+                raw = response.content if archive is not None else None
+                cache.put(url, data, response.headers, raw=raw)
+        return data
     except requests.exceptions.HTTPError as err:
         logger.error(
             f"HTTP error occurred for {url}: {err.response.status_code} - {err.response.text}"
         )
+        return _fetch_failed(f"http_{err.response.status_code}")
     except requests.exceptions.Timeout:
+        metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="error")
         logger.error(f"Request to {url} timed out.")
+        return _fetch_failed("timeout")
     except requests.exceptions.ConnectionError as err:
+        metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="error")
         logger.error(f"Connection error occurred for {url}: {err}")
+        return _fetch_failed("connection")
     except requests.exceptions.RequestException as err:
+        metrics.inc("etl_http_requests_total", endpoint=endpoint, outcome="error")
         logger.error(f"An unexpected request error occurred for {url}: {err}")
-    return None
+        return _fetch_failed("request")
+    except ValueError as err:
+        logger.error(f"Invalid JSON received from {url}: {err}")
+        return _fetch_failed("invalid_json")
+
+
+def pokemon_url(pokemon_id):
+    return f"{POKEAPI_BASE_URL}pokemon/{pokemon_id}"
 
 
 def fetch_pokemon_data(pokemon_id):
     """Fetch Pokémon data from PokeAPI by ID"""
-    url = f"{POKEAPI_BASE_URL}pokemon/{pokemon_id}"
-    return fetch_data(url)
+    return fetch_data(pokemon_url(pokemon_id))
+
+
+def _fetch_shared(url):
+    """Fetch a URL through the current run's single-flight memo, if one is active"""
+    shared_fetches = _shared_fetches
+    if shared_fetches is None:
+        return fetch_data(url)
+    return shared_fetches.do(url, fetch_data)
 
 
 def fetch_species_data(species_url):
     """Fetch species data from PokeAPI"""
-    return fetch_data(species_url)
+    return _fetch_shared(species_url)
 
 
 def fetch_evolution_chain(evolution_chain_url):
     """Fetch evolution chain data from PokeAPI"""
-    return fetch_data(evolution_chain_url)
+    return _fetch_shared(evolution_chain_url)
 
 
 def extract_poke_range(start_id, end_id):
     """Extract data for a range of Pokémon IDs"""
     pokemon_data = []
     for pokemon_id in range(start_id, end_id + 1):
-        logger.info(f"Extracting data for Pokémon ID: {pokemon_id}")
+        sampled_logger.info("extracting", "Extracting data for Pokémon ID: %s", pokemon_id)
         pokemon = fetch_pokemon_data(pokemon_id)
         if not pokemon:
             continue
@@ -99,41 +415,138 @@ def extract_poke_range(start_id, end_id):
     return pokemon_data
 
 
-def extract_pokemon_range(start_id, end_id):
-    """Extract data for a range of Pokémon IDs"""
-    pokemon_data = []
-    for pokemon_id in range(start_id, end_id + 1):
-        logger.info(f"Extracting data for Pokémon ID: {pokemon_id}")
+def _failure(pokemon_id, url):
+    """Dead-letter entry for a resource of `pokemon_id` that could not be fetched"""
+    return {
+        "pokemon_id": pokemon_id,
+        "resource": endpoint_kind(url),
+        "url": url,
+        # Followers of a shared species/chain fetch did not make the failing call themselves
+        "error_class": last_fetch_error() or "shared_fetch",
+    }
 
-        pokemon = fetch_pokemon_data(pokemon_id)
-        if not pokemon:
-            logger.warning(
-                f"Skipping Pokémon ID {pokemon_id} due to failed main data extraction."
-            )
-            continue
 
-        species = None
-        if "species" in pokemon and "url" in pokemon["species"]:
-            species = fetch_species_data(pokemon["species"]["url"])
-        else:
-            logger.warning(
-                f"Species URL not found for Pokémon ID {pokemon_id}. Skipping species data extraction."
-            )
+def extract_pokemon(pokemon_id, failures=None):
+    """Extract pokemon, species and evolution chain data for a single Pokémon ID
 
-        evolution_chain = None
-        if species and species.get("evolution_chain", {}).get("url"):
-            evolution_chain = fetch_evolution_chain(species["evolution_chain"]["url"])
-        else:
-            logger.warning(
-                f"Evolution chain URL not found for Pokémon ID {pokemon_id}. Skipping evolution chain extraction."
-            )
+    Resources that could not be fetched are appended to `failures` as dead-letter
+    entries: a failed main fetch skips the Pokémon, a failed species or evolution-chain
+    fetch leaves that part out of the record.
+    """
+    sampled_logger.info("extracting", "Extracting data for Pokémon ID: %s", pokemon_id)
 
-        pokemon_data.append(
-            {
-                "pokemon": pokemon,
-                "species": species,
-                "evolution_chain": evolution_chain,
-            }
+    pokemon = fetch_pokemon_data(pokemon_id)
+    if not pokemon:
+        logger.warning(
+            f"Skipping Pokémon ID {pokemon_id} due to failed main data extraction."
         )
+        if failures is not None:
+            failures.append(_failure(pokemon_id, pokemon_url(pokemon_id)))
+        return None
 
-    return pokemon_data
+    species = None
+    if "species" in pokemon and "url" in pokemon["species"]:
+        species = fetch_species_data(pokemon["species"]["url"])
+        if species is None and failures is not None:
+            failures.append(_failure(pokemon_id, pokemon["species"]["url"]))
+    else:
+        sampled_logger.warning(
+            "no_species",
+            "Species URL not found for Pokémon ID %s. Skipping species data extraction.",
+            pokemon_id,
+        )
+
+    evolution_chain = None
+    if species and species.get("evolution_chain", {}).get("url"):
+        evolution_chain = fetch_evolution_chain(species["evolution_chain"]["url"])
+        if evolution_chain is None and failures is not None:
+            failures.append(_failure(pokemon_id, species["evolution_chain"]["url"]))
+    else:
+        sampled_logger.warning(
+            "no_evolution_chain",
+            "Evolution chain URL not found for Pokémon ID %s. Skipping evolution chain extraction.",
+            pokemon_id,
+        )
+
+    return {
+        "pokemon": pokemon,
+        "species": species,
+        "evolution_chain": evolution_chain,
+    }
+
+
+def _extract_timed(pokemon_id, failures=None):
+    with metrics.timer("etl_stage_seconds", stage="extract"):
+        return extract_pokemon(pokemon_id, failures)
+
+
+def fetch_all(urls, workers=None):
+    """Fetch many URLs, in order, on a thread pool paced by the shared rate limiter"""
+    workers = EXTRACT_WORKERS if workers is None else workers
+    if workers <= 1:
+        return [fetch_data(url) for url in urls]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as executor:
+        return list(executor.map(fetch_data, urls))
+
+
+def iter_pokemon_ids(pokemon_ids, workers=None, failures=None):
+    """Yield extracted data for the given Pokémon IDs, in order, as it arrives
+
+    With `workers` > 1 the IDs are extracted concurrently on a thread pool; every request,
+    serial or not, is paced by the shared adaptive rate limiter. At most
+    `2 * workers` IDs are in flight so a slow consumer holds extraction back. Species
+    and evolution-chain URLs are fetched at most once per run, so family members share
+    one chain request. Resources that could not be fetched are appended to `failures`
+    (see `extract_pokemon`).
+    """
+    global _shared_fetches
+    workers = EXTRACT_WORKERS if workers is None else workers
+
+    _shared_fetches = shared_fetches = SingleFlight(max_entries=SHARED_FETCH_CACHE_SIZE)
+    try:
+        for pokemon_data in _iter_ids(pokemon_ids, workers, failures):
+            if pokemon_data:
+                yield pokemon_data
+    finally:
+        _shared_fetches = None
+        dedup_stats = shared_fetches.stats()
+        logger.info(
+            f"Species/evolution-chain fetches: {dedup_stats['misses']} fetched, "
+            f"{dedup_stats['hits']} served from the run memo."
+        )
+
+
+def iter_pokemon_range(start_id, end_id, workers=None):
+    """Yield extracted data for a range of Pokémon IDs, in ID order, as it arrives"""
+    return iter_pokemon_ids(range(start_id, end_id + 1), workers=workers)
+
+
+def extract_pokemon_range(start_id, end_id, workers=None):
+    """Extract data for a range of Pokémon IDs"""
+    return list(iter_pokemon_range(start_id, end_id, workers=workers))
+
+
+def _iter_ids(pokemon_ids, workers, failures=None):
+    """Run extract_pokemon over the IDs, serially or on a bounded worker pool"""
+    if workers <= 1:
+        for pokemon_id in pokemon_ids:
+            yield _extract_timed(pokemon_id, failures)
+        return
+
+    logger.info(
+        f"Extracting Pokémon IDs with {workers} workers "
+        f"(rate limit {get_rate_limiter().current_rate} requests/s, max {MAX_REQUESTS_PER_SECOND})"
+    )
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+        pending = deque()
+        try:
+            for pokemon_id in pokemon_ids:
+                pending.append(executor.submit(_extract_timed, pokemon_id, failures))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
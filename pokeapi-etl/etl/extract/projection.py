@@ -0,0 +1,102 @@
+import json
+from typing import Any, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # optional; decoding falls back to json.loads plus projection
+    msgspec = None
+
+# Declared field projection per endpoint kind: the only parts of each payload the
+# pipeline reads. A dict keeps the listed keys, [spec] applies spec to every list item
+# and None keeps a value whole. Endpoints without a projection are decoded in full.
+PROJECTIONS = {
+    "pokemon": {
+        "id": None,
+        "name": None,
+        "height": None,
+        "weight": None,
+        "base_experience": None,
+        "is_default": None,
+        "types": [{"slot": None, "type": {"name": None}}],
+        "abilities": [{"slot": None, "is_hidden": None, "ability": {"name": None}}],
+        "stats": [{"base_stat": None, "effort": None, "stat": {"name": None}}],
+        "species": {"name": None, "url": None},
+    },
+    "pokemon-species": {
+        "id": None,
+        "name": None,
+        "url": None,
+        "evolution_chain": {"url": None},
+    },
+}
+
+
+def project(value, spec):
+    """Keep only the parts of a decoded JSON value selected by `spec`"""
+    if spec is None:
+        return value
+    if isinstance(spec, list):
+        if not isinstance(value, list):
+            return value
+        return [project(item, spec[0]) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], sub_spec) for key, sub_spec in spec.items() if key in value}
+
+
+def _struct_type(spec, name):
+    """msgspec type decoding exactly the fields in `spec`; other fields are skipped unbuilt"""
+    if spec is None:
+        return Any
+    if isinstance(spec, list):
+        return List[_struct_type(spec[0], name)]
+    fields = [
+        (key, _field_type(sub_spec, f"{name}_{key}"), msgspec.UNSET)
+        for key, sub_spec in spec.items()
+    ]
+    return msgspec.defstruct(name.title().replace("-", "").replace("_", ""), fields, gc=False)
+
+
+def _field_type(spec, name):
+    """Struct field type: the projected type, null, or absent (UNSET, left out of the output)
+
+    Unions are built with `typing` rather than `|`, which types only support from 3.10.
+    """
+    if spec is None:
+        return Any
+    return Union[_struct_type(spec, name), None, msgspec.UnsetType]
+
+
+def _build_decoders():
+    if msgspec is None:
+        return {}
+    return {
+        endpoint: msgspec.json.Decoder(Optional[_struct_type(spec, endpoint)])
+        for endpoint, spec in PROJECTIONS.items()
+    }
+
+
+_decoders = _build_decoders()
+
+
+def decode_payload(content, endpoint):
+    """Decode a JSON response body, keeping only the fields projected for its endpoint
+
+    With msgspec installed the dropped parts (moves, sprites, game indices, flavor
+    texts...) are skipped by the parser and never become Python objects; otherwise the
+    body is decoded with `json` and pruned straight away. Either way the result is plain
+    dicts and lists holding only the projected fields. Raises ValueError on invalid JSON.
+    """
+    spec = PROJECTIONS.get(endpoint)
+    if spec is None:
+        return json.loads(content)
+    decoder = _decoders.get(endpoint)
+    if decoder is None:
+        return project(json.loads(content), spec)
+    try:
+        return msgspec.to_builtins(decoder.decode(content))
+    except msgspec.ValidationError:
+        # Unexpected shape for the declared projection; prune the generic decode instead
+        return project(json.loads(content), spec)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
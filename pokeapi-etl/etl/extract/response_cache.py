@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+CACHE_MODES = ("off", "on", "offline")
+
+
+class ResponseCache:
+    """On-disk store of PokeAPI JSON responses keyed by a hash of the request URL.
+
+    Entries keep the decoded response body, the raw body as received (for the payload
+    archive) and the ETag/Last-Modified validators. Fresh entries (younger than `ttl` seconds) are served directly, stale ones are
+    revalidated with a conditional GET. In offline mode entries are served regardless
+    of age and misses never reach the network.
+    """
+
+    def __init__(self, cache_dir, ttl=86400, max_bytes=512 * 1024 * 1024, offline=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def _entry_paths(self):
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+    def get(self, url):
+        """Return the cached entry for `url`, or None"""
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def is_fresh(self, entry):
+        return self.offline or time.time() - entry.get("stored_at", 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Build If-None-Match / If-Modified-Since headers from a cached entry"""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers or None
+
+    def put(self, url, body, headers=None, entry=None, raw=None):
+        """Store a response body and its `raw` bytes
+
+        Pass the previous `entry` to refresh it after a 304; its raw body is kept.
+        """
+        headers = headers or {}
+        if raw is None:
+            raw = (entry or {}).get("raw")
+        elif isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        record = {
+            "url": url,
+            "etag": headers.get("ETag") or (entry or {}).get("etag"),
+            "last_modified": headers.get("Last-Modified") or (entry or {}).get("last_modified"),
+            "stored_at": time.time(),
+            "body": body,
+            "raw": raw,
+        }
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(record, handle, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as err:
+            logger.warning(f"Could not write cache entry for {url}: {err}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._size += os.path.getsize(path) - previous_size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+        """Drop the oldest entries until the store is under 90% of `max_bytes`"""
+        with self._lock:
+            entries = []
+            for path in self._entry_paths():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            self._size = sum(size for _mtime, size, _path in entries)
+
+            target = self.max_bytes * 0.9
+            removed = 0
+            for _mtime, size, path in sorted(entries):
+                if self._size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._size -= size
+                removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} cached responses to stay under {self.max_bytes} bytes.")
+
+    def record(self, outcome):
+        """Count a lookup outcome: 'hits', 'misses' or 'revalidated'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "bytes": self._size,
+        }
@@ -0,0 +1,135 @@
+import hashlib
+import json
+from sqlalchemy import delete, select
+from data_models.models import EvolutionChain, EvolutionClosure, EvolutionEdge
+from utils.database import with_session
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def chain_hash(chain):
+    canonical = json.dumps(chain, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def closure_rows(chain):
+    """Ancestor/descendant pairs of a flattened chain with their distance in evolutions
+
+    Every species is its own ancestor at depth 0, so "the family of X" and "the final
+    evolutions reachable from X" are plain lookups on one indexed column.
+    """
+    children = {}
+    for edge in chain["edges"]:
+        children.setdefault(edge["from_species_id"], []).append(edge["to_species_id"])
+    names = {species["species_id"]: species["name"] for species in chain["species"]}
+
+    rows = []
+    for ancestor_id in names:
+        pending = [(ancestor_id, 0)]
+        seen = set()
+        while pending:
+            descendant_id, depth = pending.pop()
+            if descendant_id in seen:
+                continue
+            seen.add(descendant_id)
+            rows.append(
+                {
+                    "ancestor_species_id": ancestor_id,
+                    "descendant_species_id": descendant_id,
+                    "chain_id": chain["chain_id"],
+                    "depth": depth,
+                    "descendant_name": names.get(descendant_id),
+                    "descendant_is_final": not children.get(descendant_id),
+                }
+            )
+            pending.extend((child_id, depth + 1) for child_id in children.get(descendant_id, ()))
+    return rows
+
+
+def write_evolution_chains(session, chains, skip_unchanged=True):
+    """Replace the edges and closure rows of each changed chain; returns rows written per table
+
+    `chains` maps chain_id to a flattened chain (see `flatten_evolution_chain`). Chains
+    whose hash matches the stored one are left alone unless `skip_unchanged` is False;
+    the others are rebuilt one chain at a time, so a run never touches unrelated chains.
+    """
+    written = {"evolution_chains": 0, "evolution_edges": 0, "evolution_closure": 0}
+    if not chains:
+        return written
+    hashes = {chain_id: chain_hash(chain) for chain_id, chain in chains.items()}
+    stored = dict(
+        session.execute(
+            select(EvolutionChain.chain_id, EvolutionChain.content_hash).where(
+                EvolutionChain.chain_id.in_(list(chains))
+            )
+        ).all()
+    )
+    changed = [
+        chain_id
+        for chain_id in sorted(chains)
+        if not skip_unchanged or stored.get(chain_id) != hashes[chain_id]
+    ]
+    for chain_id in changed:
+        chain = chains[chain_id]
+        session.execute(delete(EvolutionClosure).where(EvolutionClosure.chain_id == chain_id))
+        session.execute(delete(EvolutionEdge).where(EvolutionEdge.chain_id == chain_id))
+        session.merge(
+            EvolutionChain(
+                chain_id=chain_id,
+                root_species_id=chain["root_species_id"],
+                content_hash=hashes[chain_id],
+            )
+        )
+        session.flush()
+        edge_rows = [dict(edge, chain_id=chain_id) for edge in chain["edges"]]
+        if edge_rows:
+            session.execute(EvolutionEdge.__table__.insert(), edge_rows)
+        rows = closure_rows(chain)
+        session.execute(EvolutionClosure.__table__.insert(), rows)
+        written["evolution_chains"] += 1
+        written["evolution_edges"] += len(edge_rows)
+        written["evolution_closure"] += len(rows)
+    if changed:
+        logger.info(f"Rebuilt {len(changed)} evolution chains ({len(chains) - len(changed)} unchanged).")
+    return written
+
+
+def load_evolution_chains(chains, session=None, skip_unchanged=True):
+    """Write evolution chains in their own transaction; returns rows written per table"""
+    return with_session(
+        session, lambda session: write_evolution_chains(session, chains, skip_unchanged=skip_unchanged)
+    )
+
+
+def _lookup(query, session):
+    return with_session(session, lambda session: [tuple(row) for row in session.execute(query).all()])
+
+
+def evolution_family(species_id, session=None):
+    """(species_id, name) of every species in the same evolution chain as `species_id`"""
+    chain_id = (
+        select(EvolutionClosure.chain_id)
+        .where(EvolutionClosure.descendant_species_id == species_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return _lookup(
+        select(EvolutionClosure.descendant_species_id, EvolutionClosure.descendant_name)
+        .where(EvolutionClosure.chain_id == chain_id, EvolutionClosure.depth == 0)
+        .order_by(EvolutionClosure.descendant_species_id),
+        session,
+    )
+
+
+def final_evolutions(species_id, session=None):
+    """(species_id, name) of the final evolutions reachable from `species_id` (itself if final)"""
+    return _lookup(
+        select(EvolutionClosure.descendant_species_id, EvolutionClosure.descendant_name)
+        .where(
+            EvolutionClosure.ancestor_species_id == species_id,
+            EvolutionClosure.descendant_is_final.is_(True),
+        )
+        .order_by(EvolutionClosure.descendant_species_id),
+        session,
+    )
@@ -0,0 +1,286 @@
+import csv
+import io
+import re
+from sqlalchemy.orm import Session
+from etl.load.loader import (
+    ability_ids_cache,
+    dimension_names,
+    frame_dimension_names,
+    table_frames,
+    table_rows,
+    type_ids_cache,
+    valid_records,
+)
+from etl.transform.batch_transformer import content_hashes
+from etl.transform.transformer import content_hash
+from utils.database import get_database_engine
+from utils.logging_config import setup_logging
+from utils.metrics import metrics
+
+logger = setup_logging(__name__)
+
+STAGING_SUFFIX = "_staging"
+
+# Tables rebuilt from the transformed records, parents first, with the columns COPY fills
+POKEMON_TABLES = {
+    "pokemon": ["pokemon_id", "name", "height", "weight", "base_experience", "is_default"],
+    "pokemon_types": ["pokemon_id", "type_id"],
+    "pokemon_abilities": ["pokemon_id", "ability_id"],
+    "pokemon_stats": ["pokemon_id", "stat_name", "base_stat", "effort"],
+}
+HASH_TABLE = "pokemon_content_hashes"
+
+# Every table a full refresh swaps. The content hashes are swapped with the data, so a
+# Pokémon left out of the refresh cannot keep a hash that marks it unchanged later.
+REFRESH_TABLES = {**POKEMON_TABLES, HASH_TABLE: ["pokemon_id", "content_hash"]}
+
+
+class CsvRowStream(io.TextIOBase):
+    """Read-only file object rendering row dicts as CSV lines on demand, for COPY FROM STDIN"""
+
+    def __init__(self, rows, columns):
+        self._rows = iter(rows)
+        self._columns = columns
+        self._buffer = ""
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line, lineterminator="\n")
+
+    def readable(self):
+        return True
+
+    def _render(self, row):
+        self._line.seek(0)
+        self._line.truncate()
+        values = []
+        for column in self._columns:
+            value = row.get(column)
+            if isinstance(value, bool):
+                value = "t" if value else "f"
+            values.append("" if value is None else value)
+        self._writer.writerow(values)
+        return self._line.getvalue()
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer += self._render(row)
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _staging(table):
+    return f"{table}{STAGING_SUFFIX}"
+
+
+def _rewrite_references(definition):
+    """Point references to refreshed tables at their staging copies"""
+    for table in REFRESH_TABLES:
+        definition = re.sub(
+            rf"REFERENCES (\w+\.)?{table}\(",
+            f"REFERENCES \\g<1>{_staging(table)}(",
+            definition,
+        )
+    return definition
+
+
+def _live_constraints(cursor, table):
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass ORDER BY contype DESC",
+        (table,),
+    )
+    return cursor.fetchall()
+
+
+def _live_indexes(cursor, table):
+    """Indexes on `table` that do not back a constraint"""
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+        (table, table),
+    )
+    return cursor.fetchall()
+
+
+def _owned_sequences(cursor, table):
+    """Serial sequences owned by columns of `table`, which DROP TABLE would take with it"""
+    cursor.execute(
+        "SELECT d.objid::regclass::text, a.attname FROM pg_depend d "
+        "JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S' "
+        "JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid "
+        "WHERE d.refobjid = %s::regclass AND d.deptype = 'a'",
+        (table,),
+    )
+    return cursor.fetchall()
+
+
+def _build_staging(cursor, sources):
+    """Create unlogged staging tables, COPY each table's CSV source in, then add constraints and indexes"""
+    renames = []
+    for table in reversed(list(REFRESH_TABLES)):
+        cursor.execute(f"DROP TABLE IF EXISTS {_staging(table)}")
+
+    for table, columns in REFRESH_TABLES.items():
+        cursor.execute(
+            f"CREATE UNLOGGED TABLE {_staging(table)} (LIKE {table} INCLUDING DEFAULTS)"
+        )
+        cursor.copy_expert(
+            f"COPY {_staging(table)} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            sources[table],
+        )
+
+    for table in REFRESH_TABLES:
+        for name, definition in _live_constraints(cursor, table):
+            cursor.execute(
+                f"ALTER TABLE {_staging(table)} ADD CONSTRAINT {_staging(name)} "
+                f"{_rewrite_references(definition)}"
+            )
+            renames.append(("constraint", table, name))
+        for name, definition in _live_indexes(cursor, table):
+            definition = definition.replace(f"INDEX {name} ", f"INDEX {_staging(name)} ", 1)
+            definition = re.sub(
+                rf" ON (ONLY )?(\w+\.)?{table} ",
+                f" ON \\g<2>{_staging(table)} ",
+                definition,
+                count=1,
+            )
+            cursor.execute(definition)
+            renames.append(("index", table, name))
+
+    # Unlogged tables are truncated after a crash; make them durable before the swap
+    for table in REFRESH_TABLES:
+        cursor.execute(f"ALTER TABLE {_staging(table)} SET LOGGED")
+        cursor.execute(f"ANALYZE {_staging(table)}")
+    return renames
+
+
+def _swap_in(cursor, renames):
+    """Replace the live tables with their staging copies in the current transaction"""
+    tables = list(REFRESH_TABLES)
+    cursor.execute(f"LOCK TABLE {', '.join(tables)} IN ACCESS EXCLUSIVE MODE")
+
+    sequences = []
+    for table in tables:
+        for sequence, column in _owned_sequences(cursor, table):
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+            sequences.append((sequence, table, column))
+
+    for table in reversed(tables):
+        cursor.execute(f"DROP TABLE {table}")
+    for table in tables:
+        cursor.execute(f"ALTER TABLE {_staging(table)} RENAME TO {table}")
+    for kind, table, name in renames:
+        if kind == "constraint":
+            cursor.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {_staging(name)} TO {name}")
+        else:
+            cursor.execute(f"ALTER INDEX {_staging(name)} RENAME TO {name}")
+    for sequence, table, column in sequences:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}")
+
+
+def _resolve_dimensions(engine, type_names, ability_names):
+    """Look up (or create) type and ability ids, committed before the staging tables exist"""
+    with Session(bind=engine) as session:
+        type_ids, new_type_ids = type_ids_cache.resolve(session, type_names)
+        ability_ids, new_ability_ids = ability_ids_cache.resolve(session, ability_names)
+        session.commit()
+        type_ids_cache.remember(session, new_type_ids)
+        ability_ids_cache.remember(session, new_ability_ids)
+    return type_ids, ability_ids
+
+
+def _refresh(engine, sources, row_counts, hashes):
+    """Stage the CSV sources of the Pokémon tables and the content hashes, then swap them in"""
+    sources = {
+        **sources,
+        HASH_TABLE: CsvRowStream(
+            [{"pokemon_id": p, "content_hash": h} for p, h in sorted(hashes.items())],
+            REFRESH_TABLES[HASH_TABLE],
+        ),
+    }
+    row_counts = {**row_counts, HASH_TABLE: len(hashes)}
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        try:
+            renames = _build_staging(cursor, sources)
+            connection.commit()
+            logger.info(
+                "Staged full refresh: "
+                + ", ".join(f"{row_counts[table]} {table}" for table in REFRESH_TABLES)
+            )
+            _swap_in(cursor, renames)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            for table in reversed(list(REFRESH_TABLES)):
+                cursor.execute(f"DROP TABLE IF EXISTS {_staging(table)}")
+            connection.commit()
+            raise
+        finally:
+            cursor.close()
+    finally:
+        connection.close()
+
+    for table in REFRESH_TABLES:
+        metrics.inc("etl_rows_written_total", row_counts[table], table=table)
+    metrics.inc("etl_records_loaded_total", len(hashes), outcome="inserted")
+
+    logger.info(f"Full refresh swapped in {len(hashes)} Pokémon.")
+    return list(hashes)
+
+
+def _postgres_engine(engine):
+    engine = engine or get_database_engine()
+    if engine.dialect.name != "postgresql":
+        raise NotImplementedError("Full refresh loads require PostgreSQL")
+    return engine
+
+
+def full_refresh_load(transformed_records, engine=None):
+    """Replace the Pokémon tables wholesale with `transformed_records` (PostgreSQL only)
+
+    Rows are streamed with COPY FROM STDIN into unlogged staging tables, constraints and
+    indexes are built afterwards, and the staging tables replace the live ones in a
+    single rename transaction, so readers see either the old or the new dataset.
+    `pokemon_content_hashes` is replaced in the same swap, so Pokémon missing from the
+    refresh lose their hash along with their rows and are reloaded by the next run.
+    `types` and `abilities` are kept and extended. Returns the list of loaded pokemon_ids.
+    """
+    engine = _postgres_engine(engine)
+    records = valid_records(transformed_records)
+    if not records:
+        logger.warning("No valid transformed data for full refresh; live tables left untouched.")
+        return []
+
+    type_ids, ability_ids = _resolve_dimensions(engine, *dimension_names(records))
+    rows = table_rows(records, type_ids, ability_ids)
+    sources = {table: CsvRowStream(rows[table], columns) for table, columns in POKEMON_TABLES.items()}
+    hashes = {record["pokemon"]["pokemon_id"]: content_hash(record) for record in records}
+    return _refresh(engine, sources, {table: len(rows[table]) for table in rows}, hashes)
+
+
+def full_refresh_load_frames(frames, engine=None):
+    """`full_refresh_load` for the columnar frames of `transform_batch`
+
+    Each table is rendered to CSV for COPY by pandas in one call instead of row by row.
+    """
+    engine = _postgres_engine(engine)
+    if frames["pokemon"].empty:
+        logger.warning("No valid transformed data for full refresh; live tables left untouched.")
+        return []
+
+    type_ids, ability_ids = _resolve_dimensions(engine, *frame_dimension_names(frames))
+    tables = table_frames(frames, type_ids, ability_ids)
+    sources = {
+        table: io.StringIO(tables[table].to_csv(columns=columns, header=False, index=False))
+        for table, columns in POKEMON_TABLES.items()
+    }
+    return _refresh(
+        engine, sources, {table: len(tables[table]) for table in tables}, content_hashes(frames)
+    )
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+from data_models.models import Base
+from utils.config import Config
+from utils.database import get_database_engine
+from utils.logging_config import setup_logging
+from utils.metrics import metrics
+
+logger = setup_logging(__name__)
+
+# Tables the loader writes, in the order they are analyzed
+LOAD_TABLES = (
+    "pokemon",
+    "pokemon_types",
+    "pokemon_abilities",
+    "pokemon_stats",
+    "pokemon_summary",
+    "evolution_chains",
+    "evolution_edges",
+    "evolution_closure",
+)
+
+
+def secondary_indexes(tables=LOAD_TABLES):
+    """Declared non-unique indexes of `tables`
+
+    Unique indexes are left out: the loader's ON CONFLICT upserts need them in place.
+    """
+    return [
+        index
+        for table in tables
+        for index in sorted(Base.metadata.tables[table].indexes, key=lambda index: index.name)
+        if not index.unique
+    ]
+
+
+def _existing_index_names(engine, tables):
+    inspector = inspect(engine)
+    return {index["name"] for table in tables for index in inspector.get_indexes(table)}
+
+
+def ensure_indexes(engine=None, tables=LOAD_TABLES):
+    """Create the declared secondary indexes missing from `tables`; returns their names
+
+    `create_all` only indexes tables it creates, so indexes declared after a table
+    was first deployed (or dropped by `deferred_indexes`) are built here.
+    """
+    engine = engine or get_database_engine()
+    existing = _existing_index_names(engine, tables)
+    missing = [index for index in secondary_indexes(tables) if index.name not in existing]
+    if not missing:
+        return []
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql" and Config.INDEX_BUILD_MEMORY:
+            connection.exec_driver_sql(
+                f"SET LOCAL maintenance_work_mem = '{Config.INDEX_BUILD_MEMORY}'"
+            )
+        for index in missing:
+            index.create(connection)
+    logger.info(f"Built {len(missing)} indexes: {', '.join(index.name for index in missing)}.")
+    return [index.name for index in missing]
+
+
+def drop_secondary_indexes(engine=None, tables=LOAD_TABLES):
+    """Drop the declared secondary indexes of `tables` that exist; returns their names"""
+    engine = engine or get_database_engine()
+    existing = _existing_index_names(engine, tables)
+    present = [index for index in secondary_indexes(tables) if index.name in existing]
+    with engine.begin() as connection:
+        for index in present:
+            index.drop(connection)
+    return [index.name for index in present]
+
+
+@contextmanager
+def deferred_indexes(engine=None, tables=LOAD_TABLES):
+    """Drop the secondary indexes of `tables` for the duration of a bulk load
+
+    Every row written then skips the index maintenance, and each index is rebuilt once,
+    in bulk, when the block exits (whether or not the load succeeded). Yields the names
+    of the dropped indexes. Meant for single-writer runs: concurrent readers and loaders
+    go without these indexes until the rebuild.
+    """
+    engine = engine or get_database_engine()
+    try:
+        dropped = drop_secondary_indexes(engine, tables)
+        logger.info(f"Dropped {len(dropped)} secondary indexes for the bulk load.")
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not drop secondary indexes; loading with them in place: {e}")
+        dropped = []
+    try:
+        yield dropped
+    finally:
+        try:
+            with metrics.timer("etl_stage_seconds", stage="index_rebuild"):
+                ensure_indexes(engine, tables)
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to rebuild secondary indexes; the next run will retry: {e}")
+
+
+def analyze_tables(engine=None, tables=LOAD_TABLES):
+    """Refresh the planner statistics of `tables` after a load"""
+    engine = engine or get_database_engine()
+    with metrics.timer("etl_stage_seconds", stage="analyze"):
+        with engine.begin() as connection:
+            for table in tables:
+                connection.exec_driver_sql(f"ANALYZE {table}")
+    logger.info(f"Analyzed {len(tables)} tables.")
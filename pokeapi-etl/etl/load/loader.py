@@ -1,3 +1,5 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError
 from data_models.models import (
     Pokemon,
@@ -6,12 +8,26 @@ from data_models.models import (
     PokemonType,
     PokemonAbility,
     PokemonStat,
+    PokemonContentHash,
 )
-from utils.database import create_database_session
+from etl.transform.transformer import content_hash
+from etl.load.evolution import write_evolution_chains
+from etl.load.read_model import refresh_pokemon_summary
+from utils.database import with_session
+from utils.config import Config
+from utils.metrics import metrics
 import logging
-from utils.logging_config import setup_logging
+import threading
+import weakref
+from utils.logging_config import setup_logging, SampledLogger
 
 logger = setup_logging(__name__)
+sampled_logger = SampledLogger(logger)
+
+LOAD_BATCH_SIZE = Config.LOAD_BATCH_SIZE
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 def load_transformed_data(transformed_data, session=None):
     """Load transformed data into the database"""
@@ -19,157 +35,461 @@ def load_transformed_data(transformed_data, session=None):
         logger.warning("No valid transformed data to load.")
         return False
 
-    own_session = False
-    if session is None:
-        session = create_database_session()
-        own_session = True
-
-    try:
-        pokemon_data = transformed_data["pokemon"]
-        pokemon_id = pokemon_data.get('pokemon_id')
-
-        if pokemon_id is None:
-            logger.error("Attempted to load Pokémon with missing pokemon_id.")
-            return False
+    pokemon_data = transformed_data["pokemon"]
+    pokemon_id = pokemon_data.get('pokemon_id')
+    if pokemon_id is None:
+        logger.error("Attempted to load Pokémon with missing pokemon_id.")
+        return False
 
+    def work(session):
         pokemon = Pokemon(**pokemon_data)
         session.merge(pokemon)
 
         # Types
+        type_names = []
         for type_data in transformed_data.get('types', []):
             type_name = type_data.get('type_name')
             if not type_name:
                 logger.warning(f"Skipping type for Pokémon {pokemon_id}.")
                 continue
+            type_names.append(type_name)
 
-            type_record = session.query(Type).filter_by(type_name=type_name).first()
-            if not type_record:
-                type_record = Type(type_name=type_name)
-                session.add(type_record)
-                session.flush()
-
-            session.merge(PokemonType(pokemon_id=pokemon_id, type_id=type_record.type_id))
+        type_ids, new_type_ids = type_ids_cache.resolve(session, type_names)
+        for type_name in type_names:
+            session.merge(PokemonType(pokemon_id=pokemon_id, type_id=type_ids[type_name]))
 
         # Abilities
+        ability_names = []
         for ability_data in transformed_data.get('abilities', []):
             ability_name = ability_data.get('ability_name')
             if not ability_name:
                 logger.warning(f"Skipping ability for Pokémon {pokemon_id}.")
                 continue
+            ability_names.append(ability_name)
 
-            ability_record = session.query(Ability).filter_by(ability_name=ability_name).first()
-            if not ability_record:
-                ability_record = Ability(ability_name=ability_name)
-                session.add(ability_record)
-                session.flush()
-
-            session.merge(PokemonAbility(pokemon_id=pokemon_id, ability_id=ability_record.ability_id))
+        ability_ids, new_ability_ids = ability_ids_cache.resolve(session, ability_names)
+        for ability_name in ability_names:
+            session.merge(
+                PokemonAbility(pokemon_id=pokemon_id, ability_id=ability_ids[ability_name])
+            )
 
         # Stats
+        stat_rows = []
         for stat_data in transformed_data.get('stats', []):
             if not stat_data.get('stat_name') or stat_data.get('base_stat') is None:
                 logger.warning(f"Skipping stat for Pokémon {pokemon_id}: {stat_data}")
                 continue
 
-            stat_data['pokemon_id'] = pokemon_id
-            session.merge(PokemonStat(**stat_data))
+            stat_rows.append(
+                {
+                    "pokemon_id": pokemon_id,
+                    "stat_name": stat_data["stat_name"],
+                    "base_stat": stat_data["base_stat"],
+                    "effort": stat_data.get("effort", 0),
+                }
+            )
+        session.flush()
+        upsert_stats(session, stat_rows)
+        refresh_pokemon_summary(session, [pokemon_id])
 
-        session.commit()
-        logger.info(f"Successfully loaded Pokémon {pokemon_id}")
-        return True
+        # The session comes back so the new dimension ids are cached only once committed
+        return session, {"types": new_type_ids, "abilities": new_ability_ids}
 
+    try:
+        loaded_session, new_ids = with_session(session, work)
     except SQLAlchemyError as e:
-        session.rollback()
         logger.error(f"Database error for Pokémon {pokemon_id}: {e}")
         return False
-
     except Exception as e:
-        session.rollback()
         logger.error(f"Unexpected error for Pokémon {pokemon_id}: {e}")
         return False
 
-    finally:
-        if own_session:
-            session.close()
+    _remember_dimension_ids(loaded_session, new_ids)
+    sampled_logger.info("loaded", "Successfully loaded Pokémon %s", pokemon_id)
+    return True
 
 def load_transformation(transformed_data):
-    """Load transformed data into the database"""
+    """Load one transformed record through `load_transformed_batch`; returns whether it loaded"""
     if not transformed_data or transformed_data.get('pokemon') is None:
         logger.warning("No valid transformed data to load.")
         return False
+    return bool(load_transformed_batch([transformed_data]))
 
-    session = create_database_session()
 
+def upsert_insert(session):
+    """Return the dialect's INSERT construct, which supports ON CONFLICT clauses"""
+    dialect = session.get_bind().dialect.name
     try:
-        pokemon_data = transformed_data["pokemon"]
-        
-        pokemon_id = pokemon_data.get('pokemon_id')
+        return _UPSERT_INSERTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"Bulk upserts are not supported on '{dialect}'")
+
+
+class DimensionCache:
+    """Process-wide name -> id map for a dimension table such as `types` or `abilities`
+
+    The map is filled from the table on first use (or by `preload`) per database engine.
+    Missing names are bulk-inserted with ON CONFLICT DO NOTHING and their ids read back in
+    one query, so concurrent loaders converge on the same ids. Ids created inside a
+    transaction only become visible to other callers once `remember` is called after
+    that transaction commits.
+    """
+
+    def __init__(self, model, name_attr, id_attr):
+        self.model = model
+        self.name_attr = name_attr
+        self.name_column = getattr(model, name_attr)
+        self.id_column = getattr(model, id_attr)
+        self._lock = threading.Lock()
+        self._ids_by_engine = weakref.WeakKeyDictionary()
+
+    def _ids(self, session):
+        engine = session.get_bind().engine
+        with self._lock:
+            ids = self._ids_by_engine.get(engine)
+        if ids is None:
+            ids = self.preload(session)
+        return ids
+
+    def preload(self, session):
+        """(Re)load the whole dimension table into the cache"""
+        ids = dict(session.execute(select(self.name_column, self.id_column)).all())
+        with self._lock:
+            self._ids_by_engine[session.get_bind().engine] = ids
+        return ids
+
+    def resolve(self, session, names):
+        """Return (name -> id for `names`, newly resolved ids to `remember` after commit)"""
+        known_ids = self._ids(session)
+        resolved = {name: known_ids[name] for name in names if name in known_ids}
+        missing = sorted(set(names) - resolved.keys())
+        if not missing:
+            return resolved, {}
+
+        insert = upsert_insert(session)
+        session.execute(
+            insert(self.model)
+            .values([{self.name_attr: name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[self.name_attr])
+        )
+        new_ids = dict(
+            session.execute(
+                select(self.name_column, self.id_column).where(self.name_column.in_(missing))
+            ).all()
+        )
+        resolved.update(new_ids)
+        return resolved, new_ids
+
+    def remember(self, session, new_ids):
+        if not new_ids:
+            return
+        engine = session.get_bind().engine
+        with self._lock:
+            self._ids_by_engine.setdefault(engine, {}).update(new_ids)
+
+    def clear(self):
+        with self._lock:
+            self._ids_by_engine.clear()
+
+
+type_ids_cache = DimensionCache(Type, "type_name", "type_id")
+ability_ids_cache = DimensionCache(Ability, "ability_name", "ability_id")
+
+
+def preload_dimension_caches(session=None):
+    """Fill the type and ability caches from the database"""
+
+    def work(session):
+        type_ids_cache.preload(session)
+        ability_ids_cache.preload(session)
+
+    with_session(session, work)
+
+
+def existing_pokemon_ids(session=None):
+    """Return the set of pokemon_ids already in the pokemon table"""
+    return with_session(session, lambda session: set(session.execute(select(Pokemon.pokemon_id)).scalars()))
+
+
+def _remember_dimension_ids(session, new_ids):
+    type_ids_cache.remember(session, new_ids.get("types"))
+    ability_ids_cache.remember(session, new_ids.get("abilities"))
+
+
+def dimension_names(records):
+    """Return the sorted type and ability names referenced by transformed records"""
+    type_names = sorted(
+        {t["type_name"] for r in records for t in r.get("types", []) if t.get("type_name")}
+    )
+    ability_names = sorted(
+        {
+            a["ability_name"]
+            for r in records
+            for a in r.get("abilities", [])
+            if a.get("ability_name")
+        }
+    )
+    return type_names, ability_names
+
+
+def table_rows(records, type_ids, ability_ids):
+    """Flatten transformed records into row dicts for each Pokémon table"""
+    pokemon_rows = [dict(record["pokemon"]) for record in records]
+    type_links = {
+        (record["pokemon"]["pokemon_id"], type_ids[type_data["type_name"]])
+        for record in records
+        for type_data in record.get("types", [])
+        if type_data.get("type_name")
+    }
+    ability_links = {
+        (record["pokemon"]["pokemon_id"], ability_ids[ability_data["ability_name"]])
+        for record in records
+        for ability_data in record.get("abilities", [])
+        if ability_data.get("ability_name")
+    }
+    # Keyed on (pokemon_id, stat_name) so a repeated stat cannot hit ON CONFLICT twice
+    stat_rows = {
+        (record["pokemon"]["pokemon_id"], stat_data["stat_name"]): {
+            "pokemon_id": record["pokemon"]["pokemon_id"],
+            "stat_name": stat_data["stat_name"],
+            "base_stat": stat_data["base_stat"],
+            "effort": stat_data.get("effort", 0),
+        }
+        for record in records
+        for stat_data in record.get("stats", [])
+        if stat_data.get("stat_name") and stat_data.get("base_stat") is not None
+    }
+    return {
+        "pokemon": pokemon_rows,
+        "pokemon_types": [{"pokemon_id": p, "type_id": t} for p, t in sorted(type_links)],
+        "pokemon_abilities": [
+            {"pokemon_id": p, "ability_id": a} for p, a in sorted(ability_links)
+        ],
+        "pokemon_stats": list(stat_rows.values()),
+    }
+
+
+def table_frames(frames, type_ids, ability_ids):
+    """Columnar counterpart of `table_rows` for frames from `transform_batch`"""
+    type_links = frames["pokemon_types"]
+    ability_links = frames["pokemon_abilities"]
+    return {
+        "pokemon": frames["pokemon"],
+        "pokemon_types": type_links.assign(
+            type_id=type_links["type_name"].map(type_ids).astype("int64")
+        ),
+        "pokemon_abilities": ability_links.assign(
+            ability_id=ability_links["ability_name"].map(ability_ids).astype("int64")
+        ),
+        "pokemon_stats": frames["pokemon_stats"],
+    }
+
+
+def frame_dimension_names(frames):
+    """Return the sorted type and ability names referenced by batch-transformed frames"""
+    return (
+        sorted(frames["pokemon_types"]["type_name"].dropna().unique()),
+        sorted(frames["pokemon_abilities"]["ability_name"].dropna().unique()),
+    )
+
+
+def valid_records(batch):
+    """Drop entries without a pokemon_id and keep the last copy of each Pokémon
+
+    ON CONFLICT cannot touch the same row twice in one statement, so duplicates
+    must not reach a bulk write.
+    """
+    records_by_id = {}
+    for transformed_data in batch:
+        pokemon_id = ((transformed_data or {}).get("pokemon") or {}).get("pokemon_id")
         if pokemon_id is None:
-            logger.error("Attempted to load Pokémon with missing pokemon_id.")
-            return False
-
-        pokemon = Pokemon(**pokemon_data)
-        session.merge(pokemon)
-
-        for type_data in transformed_data.get('types', []):
-            type_name = type_data.get('type_name')
-            if not type_name:
-                logger.warning(f"Skipping type association for Pokémon {pokemon_id} due to missing type name.")
-                continue
-
-            type_record = session.query(Type).filter_by(type_name=type_name).first()
-            if not type_record:
-                type_record = Type(type_name=type_name)
-                session.add(type_record)
-                session.flush()
-
-            association = PokemonType(
-                pokemon_id=pokemon_id, type_id=type_record.type_id
-            )
-            session.merge(association)
-
-        for ability_data in transformed_data.get('abilities', []):
-            ability_name = ability_data.get('ability_name')
-            if not ability_name:
-                logger.warning(f"Skipping ability association for Pokémon {pokemon_id} due to missing ability name.")
-                continue
-
-            ability_record = (
-                session.query(Ability).filter_by(ability_name=ability_name).first()
-            )
-            if not ability_record:
-                ability_record = Ability(ability_name=ability_name)
-                session.add(ability_record)
-                session.flush()
-
-            association = PokemonAbility(
-                pokemon_id=pokemon_id, ability_id=ability_record.ability_id
-            )
-            session.merge(association)
+            sampled_logger.warning("invalid_entry", "Skipping batch entry without valid transformed data.")
+            continue
+        records_by_id[pokemon_id] = transformed_data
+    return list(records_by_id.values())
+
+
+def upsert_stats(session, stat_rows):
+    """Insert or update stat rows on their (pokemon_id, stat_name) natural key"""
+    if not stat_rows:
+        return
+    insert = upsert_insert(session)
+    statement = insert(PokemonStat).values(stat_rows)
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["pokemon_id", "stat_name"],
+            set_={
+                "base_stat": statement.excluded.base_stat,
+                "effort": statement.excluded.effort,
+            },
+        )
+    )
 
-        for stat_data in transformed_data.get('stats', []):
-            if stat_data.get('stat_name') is None or stat_data.get('base_stat') is None:
-                logger.warning(f"Skipping malformed stat entry for Pokémon {pokemon_id}: {stat_data}")
-                continue
 
-            stat_data['pokemon_id'] = pokemon_id
-            stat = PokemonStat(**stat_data)
-            session.merge(stat)
+def stored_hashes(session, pokemon_ids):
+    """Return the stored content hash for each of `pokemon_ids` that has one"""
+    if not pokemon_ids:
+        return {}
+    rows = session.execute(
+        select(PokemonContentHash.pokemon_id, PokemonContentHash.content_hash).where(
+            PokemonContentHash.pokemon_id.in_(pokemon_ids)
+        )
+    )
+    return dict(rows.all())
+
+
+def save_hashes(session, hashes):
+    """Upsert pokemon_id -> content hash pairs"""
+    if not hashes:
+        return
+    insert = upsert_insert(session)
+    statement = insert(PokemonContentHash).values(
+        [{"pokemon_id": p, "content_hash": h} for p, h in sorted(hashes.items())]
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["pokemon_id"],
+            set_={"content_hash": statement.excluded.content_hash, "updated_at": func.now()},
+        )
+    )
+
+
+def _write_batch(session, records, hashes=None):
+    """Write a list of valid transformed records with one multi-row statement per table
+
+    `hashes` (pokemon_id -> content hash) are stored alongside, and the written Pokémon's
+    pokemon_summary rows are refreshed, in the same transaction. Returns the dimension ids
+    created along the way, to be cached once committed.
+    """
+    insert = upsert_insert(session)
+    type_names, ability_names = dimension_names(records)
+    type_ids, new_type_ids = type_ids_cache.resolve(session, type_names)
+    ability_ids, new_ability_ids = ability_ids_cache.resolve(session, ability_names)
+    rows = table_rows(records, type_ids, ability_ids)
+
+    pokemon_insert = insert(Pokemon).values(rows["pokemon"])
+    session.execute(
+        pokemon_insert.on_conflict_do_update(
+            index_elements=["pokemon_id"],
+            set_={
+                column: pokemon_insert.excluded[column]
+                for column in rows["pokemon"][0]
+                if column != "pokemon_id"
+            },
+        )
+    )
 
-        session.commit()
-        logger.info(
-            f"Successfully loaded data for Pokémon ID: {pokemon_id}"
+    if rows["pokemon_types"]:
+        session.execute(
+            insert(PokemonType).values(rows["pokemon_types"]).on_conflict_do_nothing()
+        )
+    if rows["pokemon_abilities"]:
+        session.execute(
+            insert(PokemonAbility).values(rows["pokemon_abilities"]).on_conflict_do_nothing()
         )
-        return True
 
-    except SQLAlchemyError as e:
-        session.rollback()
-        logger.error(f"Database error occurred during load for Pokémon ID {pokemon_id}: {e}")
-        return False
-    except Exception as e:
-        session.rollback()
-        logger.error(f"An unexpected error occurred during load for Pokémon ID {pokemon_id}: {e}")
-        return False
-    finally:
-        session.close()
+    upsert_stats(session, rows["pokemon_stats"])
+
+    pokemon_ids = [row["pokemon_id"] for row in rows["pokemon"]]
+    if hashes:
+        save_hashes(session, {pokemon_id: hashes[pokemon_id] for pokemon_id in pokemon_ids})
+
+    written = {table: len(values) for table, values in rows.items()}
+    written["pokemon_summary"] = refresh_pokemon_summary(session, pokemon_ids)
+    if hashes:
+        written["pokemon_content_hashes"] = len(pokemon_ids)
+    return {"types": new_type_ids, "abilities": new_ability_ids, "rows": written}
+
+
+def load_transformed_batch(batch, session=None, skip_unchanged=True, stats=None):
+    """Load a batch of transformed records in a single transaction
+
+    Each table is written with one multi-row INSERT ... ON CONFLICT statement. If the
+    batch fails, it is retried record by record under savepoints so that a bad record
+    is skipped without aborting the rest. Records whose content hash matches the stored
+    one are not written at all unless `skip_unchanged` is False. Outcome counts
+    ('inserted', 'updated', 'unchanged') are added to the optional `stats` Counter.
+    Evolution chains carried by the records are rebuilt in the same transaction, each
+    only when its own hash changed. Returns the list of loaded (or already up to date)
+    pokemon_ids.
+    """
+    records = valid_records(batch)
+    if not records:
+        return []
+
+    def work(session):
+        new_ids = []
+        hashes = {record["pokemon"]["pokemon_id"]: content_hash(record) for record in records}
+        previous = stored_hashes(session, list(hashes))
+        unchanged_ids = [
+            pokemon_id
+            for pokemon_id, record_hash in hashes.items()
+            if skip_unchanged and previous.get(pokemon_id) == record_hash
+        ]
+        skipped = set(unchanged_ids)
+        changed = [r for r in records if r["pokemon"]["pokemon_id"] not in skipped]
+
+        written_ids = []
+        if changed:
+            try:
+                with session.begin_nested():
+                    new_ids.append(_write_batch(session, changed, hashes))
+                written_ids = [record["pokemon"]["pokemon_id"] for record in changed]
+            except SQLAlchemyError as e:
+                logger.warning(
+                    f"Batch of {len(changed)} Pokémon failed ({e.__class__.__name__}); retrying one by one."
+                )
+                for record in changed:
+                    pokemon_id = record["pokemon"]["pokemon_id"]
+                    try:
+                        with session.begin_nested():
+                            new_ids.append(_write_batch(session, [record], hashes))
+                        written_ids.append(pokemon_id)
+                    except SQLAlchemyError as record_error:
+                        logger.error(f"Database error for Pokémon {pokemon_id}: {record_error}")
+
+        chains = {
+            record["evolution"]["chain_id"]: record["evolution"]
+            for record in records
+            if record.get("evolution")
+        }
+        if chains:
+            try:
+                with session.begin_nested():
+                    new_ids.append(
+                        {"rows": write_evolution_chains(session, chains, skip_unchanged)}
+                    )
+            except SQLAlchemyError as e:
+                logger.error(f"Database error while writing {len(chains)} evolution chains: {e}")
+
+        inserted = sum(1 for pokemon_id in written_ids if pokemon_id not in previous)
+        outcomes = {
+            "inserted": inserted,
+            "updated": len(written_ids) - inserted,
+            "unchanged": len(unchanged_ids),
+            "failed": len(changed) - len(written_ids),
+        }
+        # The session comes back so the new dimension ids are cached only once committed
+        return session, new_ids, outcomes, unchanged_ids + written_ids
 
+    try:
+        loaded_session, new_ids, outcomes, loaded_ids = with_session(session, work)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error while committing batch: {e}")
+        return []
+
+    for created in new_ids:
+        _remember_dimension_ids(loaded_session, created)
+        for table, count in created["rows"].items():
+            metrics.inc("etl_rows_written_total", count, table=table)
+    for outcome, count in outcomes.items():
+        metrics.inc("etl_records_loaded_total", count, outcome=outcome)
+    if stats is not None:
+        for outcome in ("inserted", "updated", "unchanged"):
+            stats[outcome] += outcomes[outcome]
+    written = outcomes["inserted"] + outcomes["updated"]
+    logger.info(
+        f"Loaded batch of {written}/{written + outcomes['failed']} changed Pokémon "
+        f"({outcomes['unchanged']} unchanged)."
+    )
+    return loaded_ids
@@ -0,0 +1,46 @@
+from sqlalchemy import delete, func, inspect, select
+from data_models.models import PokemonStat
+from utils.database import get_database_engine
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+STATS_KEY_INDEX = next(
+    index
+    for index in PokemonStat.__table__.indexes
+    if index.name == "uq_pokemon_stats_pokemon_stat"
+)
+
+
+def compact_pokemon_stats(engine=None):
+    """Deduplicate pokemon_stats on (pokemon_id, stat_name) and add its unique index
+
+    Deployments created before stats had a natural key accumulated a fresh set of stat
+    rows on every run. The newest row (highest stat_id) of each pair is kept. Safe to run
+    repeatedly; returns the number of rows removed.
+    """
+    engine = engine or get_database_engine()
+    keep = (
+        select(func.max(PokemonStat.stat_id))
+        .group_by(PokemonStat.pokemon_id, PokemonStat.stat_name)
+        .scalar_subquery()
+    )
+    with engine.begin() as connection:
+        removed = connection.execute(
+            delete(PokemonStat).where(PokemonStat.stat_id.not_in(keep))
+        ).rowcount
+        STATS_KEY_INDEX.create(connection, checkfirst=True)
+
+    logger.info(f"Compacted pokemon_stats: removed {removed} duplicate rows.")
+    return removed
+
+
+def ensure_pokemon_stats_key(engine=None):
+    """Run the one-shot stats compaction if the natural-key index is still missing"""
+    engine = engine or get_database_engine()
+    indexes = {index["name"] for index in inspect(engine).get_indexes(PokemonStat.__tablename__)}
+    if STATS_KEY_INDEX.name in indexes:
+        return False
+    logger.info("pokemon_stats has no natural-key index yet; compacting existing rows.")
+    compact_pokemon_stats(engine)
+    return True
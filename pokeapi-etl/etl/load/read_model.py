@@ -0,0 +1,108 @@
+from sqlalchemy import delete, select
+from data_models.models import (
+    Ability,
+    Pokemon,
+    PokemonAbility,
+    PokemonStat,
+    PokemonSummary,
+    PokemonType,
+    Type,
+)
+from utils.database import with_session
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+# pokemon_stats.stat_name -> pokemon_summary column
+STAT_COLUMNS = {
+    "hp": "hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special-attack": "special_attack",
+    "special-defense": "special_defense",
+    "speed": "speed",
+}
+
+# Keeps IN lists well under every driver's bound-parameter limit
+REFRESH_CHUNK_SIZE = 1000
+
+
+def _summary_rows(session, pokemon_ids):
+    """Build pokemon_summary rows from the normalized tables for the given Pokémon"""
+    rows = {}
+    for pokemon in session.execute(
+        select(
+            Pokemon.pokemon_id,
+            Pokemon.name,
+            Pokemon.height,
+            Pokemon.weight,
+            Pokemon.base_experience,
+            Pokemon.is_default,
+        ).where(Pokemon.pokemon_id.in_(pokemon_ids))
+    ).mappings():
+        rows[pokemon["pokemon_id"]] = dict(
+            pokemon,
+            type_names=[],
+            ability_names=[],
+            stat_total=0,
+            **dict.fromkeys(STAT_COLUMNS.values()),
+        )
+
+    for pokemon_id, type_name in session.execute(
+        select(PokemonType.pokemon_id, Type.type_name)
+        .join(Type, Type.type_id == PokemonType.type_id)
+        .where(PokemonType.pokemon_id.in_(pokemon_ids))
+        .order_by(PokemonType.pokemon_id, Type.type_name)
+    ):
+        if pokemon_id in rows:
+            rows[pokemon_id]["type_names"].append(type_name)
+    for pokemon_id, ability_name in session.execute(
+        select(PokemonAbility.pokemon_id, Ability.ability_name)
+        .join(Ability, Ability.ability_id == PokemonAbility.ability_id)
+        .where(PokemonAbility.pokemon_id.in_(pokemon_ids))
+        .order_by(PokemonAbility.pokemon_id, Ability.ability_name)
+    ):
+        if pokemon_id in rows:
+            rows[pokemon_id]["ability_names"].append(ability_name)
+    for pokemon_id, stat_name, base_stat in session.execute(
+        select(PokemonStat.pokemon_id, PokemonStat.stat_name, PokemonStat.base_stat).where(
+            PokemonStat.pokemon_id.in_(pokemon_ids)
+        )
+    ):
+        row = rows.get(pokemon_id)
+        if row is None:
+            continue
+        row["stat_total"] += base_stat
+        column = STAT_COLUMNS.get(stat_name)
+        if column:
+            row[column] = base_stat
+    return list(rows.values())
+
+
+def refresh_pokemon_summary(session, pokemon_ids=None):
+    """Rebuild the pokemon_summary rows of the given Pokémon (all of them when None)
+
+    Rows are deleted and re-inserted in the caller's transaction, so readers see the old
+    or the new version of a Pokémon, never a partial one. Pokémon no longer in `pokemon`
+    lose their summary row. Returns the number of rows written.
+    """
+    if pokemon_ids is None:
+        session.execute(delete(PokemonSummary))
+        pokemon_ids = list(session.execute(select(Pokemon.pokemon_id)).scalars())
+    written = 0
+    pokemon_ids = sorted(set(pokemon_ids))
+    for start in range(0, len(pokemon_ids), REFRESH_CHUNK_SIZE):
+        chunk = pokemon_ids[start : start + REFRESH_CHUNK_SIZE]
+        session.execute(delete(PokemonSummary).where(PokemonSummary.pokemon_id.in_(chunk)))
+        rows = _summary_rows(session, chunk)
+        if rows:
+            session.execute(PokemonSummary.__table__.insert(), rows)
+        written += len(rows)
+    return written
+
+
+def rebuild_pokemon_summary(session=None):
+    """Rebuild the whole read model in its own transaction; returns the rows written"""
+    written = with_session(session, refresh_pokemon_summary)
+    logger.info(f"Rebuilt pokemon_summary: {written} rows.")
+    return written
@@ -1,62 +1,800 @@
-from etl.extract.extractor import extract_pokemon_range
+from etl.extract.extractor import (
+    iter_pokemon_ids,
+    get_connection_stats,
+    get_response_cache,
+    configure_response_cache,
+    get_payload_archive,
+    configure_payload_archive,
+    get_rate_limiter,
+)
+from etl.extract.response_cache import CACHE_MODES
+from etl.extract.archive import ARCHIVE_MODES
+from etl.extract.discovery import discover_pokemon_ids
 from etl.transform.transformer import transform_pokemon_data
-from etl.load.loader import load_transformed_data
+from etl.transform.batch_transformer import evolution_chains, transform_batch
+from etl.load.loader import (
+    existing_pokemon_ids,
+    load_transformed_batch,
+    preload_dimension_caches,
+)
+from etl.load.full_refresh import full_refresh_load_frames
+from etl.load.evolution import load_evolution_chains
+from etl.load.read_model import rebuild_pokemon_summary
+from etl.load.maintenance import compact_pokemon_stats, ensure_pokemon_stats_key
+from etl.load.indexes import analyze_tables, deferred_indexes, ensure_indexes
+from etl.run_state import (
+    CheckpointWriter,
+    find_resumable_run,
+    finish_run,
+    pending_ids,
+    start_run,
+)
+from etl.dead_letters import (
+    dead_letter_counts,
+    dead_letter_ids,
+    is_permanent,
+    record_dead_letters,
+    resolve_dead_letters,
+)
+from etl.work_queue import (
+    LeaseHeartbeat,
+    claim_work_item,
+    complete_work_item,
+    default_worker_id,
+    seed_work_items,
+    seed_work_items_for_ids,
+    work_progress,
+)
+from utils.metrics import metrics, start_metrics_server, write_json, write_prometheus_file
 from utils.database import create_database_session, get_database_engine, create_tables
-from utils.logging_config import setup_logging
+from utils.logging_config import setup_logging, report_sampled_logs, SampledLogger
 from utils.config import Config
+from collections import Counter
+from contextlib import nullcontext
+import argparse
 import logging
+import queue
+import threading
+import time
 
 logger = setup_logging(__name__)
+sampled_logger = SampledLogger(logger)
 
 
-def run_etl_pipeline(start_id=1, end_id=20):
-    """Main ETL orchestration function"""
+# Marks the end of a stream between pipeline stages
+_END_OF_STREAM = object()
+
+
+class PipelineRun:
+    """Settings and bookkeeping shared by the stages of one pipeline run"""
+
+    def __init__(self, run_id, workers=None, batch_size=None, force=False, progress=None):
+        self.run_id = run_id
+        self.workers = workers
+        self.batch_size = batch_size or Config.LOAD_BATCH_SIZE
+        self.force = force
+        self.checkpoints = CheckpointWriter(run_id)
+        self.load_stats = Counter()
+        self.loaded_ids = set()
+        # Failed fetches of the latest extraction pass (see `extract_pokemon`)
+        self.failures = []
+        self.ids_requested = 0
+        self.progress = progress
+
+    def report_progress(self):
+        if self.progress is not None:
+            self.progress(
+                {
+                    "run_id": self.run_id,
+                    "ids_requested": self.ids_requested,
+                    "loaded": len(self.loaded_ids),
+                }
+            )
+
+
+def _transform_record(raw_data):
+    """Transform one raw record; returns (pokemon_id, transformed data or None)"""
+    pokemon_id_for_log = (raw_data.get("pokemon") or {}).get("id", "N/A")
+    with metrics.timer("etl_stage_seconds", stage="transform"):
+        transformed_data = transform_pokemon_data(raw_data)
+
+    if not transformed_data or transformed_data.get("pokemon") is None:
+        sampled_logger.warning(
+            "invalid_transform",
+            "Skipping transformation or loading for Pokémon ID %s due to invalid transformed data.",
+            pokemon_id_for_log,
+        )
+        return pokemon_id_for_log, None
+    return pokemon_id_for_log, transformed_data
+
+
+def _load_batch(batch, run):
+    """Load a batch of (pokemon_id, transformed data) pairs; returns the number loaded"""
+    if not batch:
+        return 0
+    with metrics.timer("etl_stage_seconds", stage="load"):
+        loaded_ids = set(
+            load_transformed_batch(
+                [transformed_data for _, transformed_data in batch],
+                skip_unchanged=not run.force,
+                stats=run.load_stats,
+            )
+        )
+    failed_ids = []
+    for pokemon_id_for_log, _ in batch:
+        if pokemon_id_for_log not in loaded_ids:
+            logger.error(f"Failed to load data for Pokémon ID: {pokemon_id_for_log}")
+            failed_ids.append(pokemon_id_for_log)
+    run.loaded_ids.update(loaded_ids)
+    run.report_progress()
+    run.checkpoints.record(sorted(loaded_ids), "loaded")
+    run.checkpoints.record(failed_ids, "failed")
+    return len(loaded_ids)
+
+
+def _run_batch(pokemon_ids, run, workers=None):
+    """Extract every ID first, then transform and load them in batches"""
+    raw_data_list = list(
+        iter_pokemon_ids(pokemon_ids, workers=workers or run.workers, failures=run.failures)
+    )
+
+    success_count = 0
+    total_to_process = len(raw_data_list)
+    batch = []
+    for i, raw_data in enumerate(raw_data_list):
+        pokemon_id_for_log, transformed_data = _transform_record(raw_data)
+        sampled_logger.info(
+            "processing",
+            "Processing Pokémon ID %s (%d/%d)",
+            pokemon_id_for_log,
+            i + 1,
+            total_to_process,
+        )
+        if transformed_data is not None:
+            batch.append((pokemon_id_for_log, transformed_data))
+        if len(batch) >= run.batch_size:
+            success_count += _load_batch(batch, run)
+            batch = []
+    success_count += _load_batch(batch, run)
+    return success_count, total_to_process
+
+
+def _run_streaming(pokemon_ids, run, queue_size=None):
+    """Overlap extract, transform and load, connected by bounded queues
+
+    Extraction and transformation run on their own threads and loading on the calling
+    thread. A full queue blocks the stage feeding it, so at most `queue_size` records
+    are buffered between two stages whatever the size of the range. The load stage
+    writes up to `run.batch_size` records at a time, flushing early whenever it has caught
+    up with the transform stage.
+
+    If loading fails, the producers are told to stop and the queues are drained until
+    each stage has ended, so no thread is left blocked on a full queue.
+    """
+    queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+    raw_queue = queue.Queue(maxsize=queue_size)
+    transformed_queue = queue.Queue(maxsize=queue_size)
+    extracted = [0]
+    stopping = threading.Event()
+
+    def extract_stage():
+        try:
+            for raw_data in iter_pokemon_ids(
+                pokemon_ids, workers=run.workers, failures=run.failures
+            ):
+                if stopping.is_set():
+                    break
+                extracted[0] += 1
+                raw_queue.put(raw_data)
+        except Exception as e:
+            logger.error(f"Extraction stage failed: {e}")
+        finally:
+            raw_queue.put(_END_OF_STREAM)
+
+    def transform_stage():
+        try:
+            while True:
+                raw_data = raw_queue.get()
+                if raw_data is _END_OF_STREAM:
+                    break
+                if stopping.is_set():
+                    continue
+                try:
+                    transformed_queue.put(_transform_record(raw_data))
+                except Exception as e:
+                    logger.error(f"Transformation failed for a record: {e}")
+        finally:
+            transformed_queue.put(_END_OF_STREAM)
+
+    stages = [
+        threading.Thread(target=extract_stage, name="etl-extract", daemon=True),
+        threading.Thread(target=transform_stage, name="etl-transform", daemon=True),
+    ]
+    for stage in stages:
+        stage.start()
+
+    success_count = 0
+    processed = 0
+    batch = []
+    ended = False
+    try:
+        while True:
+            item = transformed_queue.get()
+            if item is _END_OF_STREAM:
+                ended = True
+                break
+            processed += 1
+            pokemon_id_for_log, transformed_data = item
+            for name, stage_queue in (("raw", raw_queue), ("transformed", transformed_queue)):
+                depth = stage_queue.qsize()
+                metrics.set_gauge("etl_queue_depth", depth, queue=name)
+                metrics.observe("etl_queue_depth_observed", depth, queue=name)
+            sampled_logger.info(
+                "processing",
+                "Processing Pokémon ID %s (%d streamed, %d waiting for transform, %d waiting for load)",
+                pokemon_id_for_log,
+                processed,
+                raw_queue.qsize(),
+                transformed_queue.qsize(),
+            )
+            if transformed_data is not None:
+                batch.append(item)
+            if len(batch) >= run.batch_size or (batch and transformed_queue.empty()):
+                success_count += _load_batch(batch, run)
+                batch = []
+        success_count += _load_batch(batch, run)
+    finally:
+        if not ended:
+            # The transform stage drains the raw queue once stopping is set
+            stopping.set()
+            while transformed_queue.get() is not _END_OF_STREAM:
+                pass
+        for stage in stages:
+            stage.join()
+    return success_count, extracted[0]
+
+
+def _run_full_refresh(pokemon_ids, run):
+    """Transform every ID into columnar frames in one pass, then replace the live tables in one swap"""
+    raw_data_list = list(
+        iter_pokemon_ids(pokemon_ids, workers=run.workers, failures=run.failures)
+    )
+    total_to_process = len(raw_data_list)
+    if not raw_data_list:
+        return 0, total_to_process
+
+    with metrics.timer("etl_stage_seconds", stage="transform_batch"):
+        frames = transform_batch(raw_data_list)
+        chains = evolution_chains(raw_data_list)
+    del raw_data_list
+    try:
+        loaded_ids = full_refresh_load_frames(frames)
+        run.loaded_ids.update(loaded_ids)
+        run.checkpoints.record(loaded_ids, "loaded")
+        run.load_stats["inserted"] += len(loaded_ids)
+    except Exception as e:
+        logger.error(f"Full refresh failed; live tables left unchanged: {e}")
+        return 0, total_to_process
+    try:
+        load_evolution_chains(chains, skip_unchanged=not run.force)
+    except Exception as e:
+        logger.error(f"Failed to write {len(chains)} evolution chains: {e}")
+    try:
+        rebuild_pokemon_summary()
+    except Exception as e:
+        logger.error(f"Failed to rebuild pokemon_summary after the full refresh: {e}")
+    return len(loaded_ids), total_to_process
+
+
+def _retry_failures(run, rounds=None, delays=None, workers=None):
+    """End-of-run pass over the run's failed fetches; returns the pokemon_ids still failing
+
+    Each round waits the next of `delays` seconds (the last one repeats), then re-extracts
+    and loads the failed Pokémon on `workers` threads of their own, and records the round's
+    failures in the dead-letter table. Permanent errors such as a 404 are dropped before
+    waiting, so they never hold the run up.
+    """
+    rounds = Config.DEAD_LETTER_RETRY_ROUNDS if rounds is None else rounds
+    delays = Config.DEAD_LETTER_RETRY_DELAYS if delays is None else delays
+    workers = workers or Config.DEAD_LETTER_WORKERS
+    failing = {failure["pokemon_id"] for failure in run.failures}
+    for attempt in range(rounds):
+        permanent = {
+            failure["pokemon_id"] for failure in run.failures if is_permanent(failure["error_class"])
+        }
+        retryable = sorted({failure["pokemon_id"] for failure in run.failures} - permanent)
+        if permanent:
+            logger.info(f"Not retrying {len(permanent)} Pokémon with permanent fetch errors.")
+        if not retryable:
+            break
+        wait = delays[min(attempt, len(delays) - 1)] if delays else 0
+        logger.info(
+            f"Retrying {len(retryable)} Pokémon with failed fetches in {wait:g} s "
+            f"(round {attempt + 1}/{rounds})."
+        )
+        if wait > 0:
+            time.sleep(wait)
+        run.failures = []
+        with metrics.timer("etl_stage_seconds", stage="retry"):
+            _run_batch(retryable, run, workers=workers)
+        record_dead_letters(run.failures, run.run_id)
+        failing = (failing - set(retryable)) | {failure["pokemon_id"] for failure in run.failures}
+    return failing
+
+
+def _settle_failures(run):
+    """Dead-letter the run's failed fetches, retry them and resolve whatever got loaded
+
+    Returns a summary of the failed, recovered and still failing Pokémon counts.
+    """
+    failed_ids = {failure["pokemon_id"] for failure in run.failures}
+    failing = failed_ids
+    try:
+        record_dead_letters(run.failures, run.run_id)
+        failing = _retry_failures(run)
+        resolve_dead_letters(run.loaded_ids - failing)
+    except Exception as e:
+        logger.error(f"Failed to update the dead-letter table: {e}")
+    return {
+        "failed": len(failed_ids),
+        "recovered": len(failed_ids - failing),
+        "still_failing": len(failing),
+    }
+
+
+def _select_ids(start_id, end_id, discover, only_new, workers):
+    """IDs for a new run: discovered or the whole range, minus loaded ones with `only_new`"""
+    if discover:
+        pokemon_ids = discover_pokemon_ids(workers=workers, start_id=start_id, end_id=end_id)
+        if pokemon_ids is None:
+            return None
+    else:
+        pokemon_ids = range(start_id, end_id + 1)
+    if only_new:
+        existing = existing_pokemon_ids()
+        pokemon_ids = [pokemon_id for pokemon_id in pokemon_ids if pokemon_id not in existing]
+        logger.info(
+            f"{len(pokemon_ids)} Pokémon IDs are new since the last run "
+            f"({len(existing)} already loaded)."
+        )
+    return pokemon_ids
+
+
+def run_etl_pipeline(
+    start_id=1,
+    end_id=20,
+    workers=None,
+    streaming=None,
+    batch_size=None,
+    full_refresh=False,
+    resume=False,
+    resume_run_id=None,
+    force=False,
+    summary_file=None,
+    metrics_file=None,
+    archive_mode=None,
+    discover=False,
+    only_new=False,
+    defer_indexes=None,
+    pokemon_ids=None,
+    progress=None,
+):
+    """Main ETL orchestration function
+
+    Every run is recorded in `etl_runs` with per-ID checkpoints. With `resume`, the
+    given (or latest unfinished) run is continued with only its IDs not loaded yet.
+    Pokémon whose transformed content hash is unchanged are not rewritten unless `force`.
+    A JSON run summary and the Prometheus metrics are written to `summary_file` and
+    `metrics_file` (default `RUN_SUMMARY_FILE` and `METRICS_FILE`) when set.
+    `archive_mode` switches the raw-payload archive for this process: "record" appends
+    every response to it and "replay" extracts from it instead of the network.
+    With `discover`, the IDs come from the paginated `/pokemon` list instead of the whole
+    range, which then only bounds them (None leaves that end open). `only_new` skips IDs
+    already in the `pokemon` table.
+    `defer_indexes` drops the secondary indexes of the loaded tables during the load and
+    rebuilds them afterwards; by default that happens for runs of at least
+    `INDEX_DEFER_MIN_IDS` IDs (a full refresh builds its indexes after COPY anyway).
+    The loaded tables are analyzed once the load has written anything.
+    Resources that could not be fetched go to the `etl_dead_letters` table and get an
+    end-of-run retry pass (`DEAD_LETTER_RETRY_ROUNDS`). An explicit `pokemon_ids` list,
+    such as the pending dead letters, replaces the range. `progress`, when given, is
+    called with the loaded and requested ID counts after each load batch and with the
+    run summary at the end.
+    """
+    if archive_mode is not None:
+        configure_payload_archive(archive_mode)
+    streaming = Config.PIPELINE_STREAMING if streaming is None else streaming
+    summary_file = summary_file or Config.RUN_SUMMARY_FILE
+    metrics_file = metrics_file or Config.METRICS_FILE
+    metrics_before = metrics.snapshot()
+    started = time.perf_counter()
     logger.info("Starting ETL pipeline...")
 
     try:
         create_tables()
+        ensure_pokemon_stats_key()
+        ensure_indexes()
+        preload_dimension_caches()
         logger.info("Database tables ensured.")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
         return False
-    
-    # Extract data
-    logger.info(f"Extracting data for Pokémon IDs {start_id} to {end_id}")
-    raw_data_list = extract_pokemon_range(start_id, end_id)
 
-    if not raw_data_list:
+    if resume:
+        resumable = find_resumable_run(resume_run_id)
+        if resumable is None:
+            logger.error("No unfinished ETL run to resume.")
+            return False
+        run_id, start_id, end_id = resumable
+        candidates = None
+        if discover:
+            candidates = discover_pokemon_ids(workers=workers, start_id=start_id, end_id=end_id)
+            if candidates is None:
+                return False
+        pokemon_ids = pending_ids(run_id, start_id, end_id, candidates=candidates)
+        logger.info(f"Resuming ETL run {run_id}: {len(pokemon_ids)} Pokémon IDs left to load.")
+        if not pokemon_ids:
+            finish_run(run_id, "completed")
+            return True
+    else:
+        if pokemon_ids is not None:
+            pokemon_ids = sorted(set(pokemon_ids))
+        else:
+            pokemon_ids = _select_ids(start_id, end_id, discover, only_new, workers)
+        if pokemon_ids is None:
+            return False
+        if not pokemon_ids:
+            logger.info("No Pokémon IDs left to load.")
+            return True
+        start_id, end_id = pokemon_ids[0], pokemon_ids[-1]
+        run_id = start_run(start_id, end_id)
+    run = PipelineRun(run_id, workers=workers, batch_size=batch_size, force=force, progress=progress)
+    run.ids_requested = len(pokemon_ids)
+
+    mode = "full refresh" if full_refresh else "streaming" if streaming else "batch"
+    if defer_indexes is None:
+        defer_indexes = 0 < Config.INDEX_DEFER_MIN_IDS <= len(pokemon_ids)
+    logger.info(f"Extracting data for Pokémon IDs {start_id} to {end_id} ({mode})")
+    try:
+        with deferred_indexes() if defer_indexes and not full_refresh else nullcontext():
+            if full_refresh:
+                success_count, total_to_process = _run_full_refresh(pokemon_ids, run)
+            elif streaming:
+                success_count, total_to_process = _run_streaming(pokemon_ids, run)
+            else:
+                success_count, total_to_process = _run_batch(pokemon_ids, run)
+        loaded_before_retry = len(run.loaded_ids)
+        dead_letters = _settle_failures(run)
+        retried = len(run.loaded_ids) - loaded_before_retry
+        success_count += retried
+        total_to_process += retried
+    finally:
+        run.checkpoints.flush()
+
+    if run.load_stats["inserted"] or run.load_stats["updated"]:
+        try:
+            analyze_tables()
+        except Exception as e:
+            logger.error(f"Failed to analyze the loaded tables: {e}")
+
+    completed = total_to_process > 0 and success_count == len(pokemon_ids)
+    status = "completed" if completed else "failed"
+    finish_run(run_id, status)
+
+    summary = {
+        "run_id": run_id,
+        "mode": mode,
+        "status": status,
+        "start_id": start_id,
+        "end_id": end_id,
+        "ids_requested": len(pokemon_ids),
+        "extracted": total_to_process,
+        "loaded": success_count,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "load": {outcome: run.load_stats[outcome] for outcome in ("inserted", "updated", "unchanged")},
+        "http_connections": get_connection_stats(),
+        "http_cache": None,
+        "payload_archive": None,
+        "rate_limiter": get_rate_limiter().stats(),
+        "dead_letters": dead_letters,
+    }
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        summary["http_cache"] = response_cache.stats()
+    payload_archive = get_payload_archive()
+    if payload_archive is not None:
+        summary["payload_archive"] = {
+            "dir": payload_archive.archive_dir,
+            "responses": len(payload_archive),
+        }
+    summary["metrics"] = metrics.summary(since=metrics_before)
+    report_sampled_logs(logger)
+    _write_run_outputs(summary, summary_file, metrics_file)
+    if progress is not None:
+        progress(summary)
+
+    if not total_to_process:
         logger.error("No data extracted. Exiting pipeline.")
         return False
 
-    success_count = 0
-    total_to_process = len(raw_data_list)
-    for i, raw_data in enumerate(raw_data_list):
-        pokemon_id_for_log = raw_data.get("pokemon", {}).get("id", "N/A")
+    logger.info(
+        f"ETL pipeline completed. Successfully processed {success_count}/{total_to_process} Pokémon "
+        f"in {summary['duration_seconds']} s."
+    )
+    load_report = summary["load"]
+    logger.info(
+        f"Load report: {load_report['inserted']} inserted, {load_report['updated']} updated, "
+        f"{load_report['unchanged']} unchanged."
+    )
+    connection_stats = summary["http_connections"]
+    logger.info(
+        f"HTTP connections: {connection_stats['connections_opened']} opened, "
+        f"{connection_stats['connections_reused']} reused over {connection_stats['requests']} requests."
+    )
+    limiter_stats = summary["rate_limiter"]
+    logger.info(
+        f"Rate limiter: {limiter_stats['rate']} requests/s, {limiter_stats['concurrency']} in flight "
+        f"allowed, {limiter_stats['throttled']} throttling signals."
+    )
+    if dead_letters["failed"]:
+        logger.warning(
+            f"Dead letters: {dead_letters['failed']} Pokémon with failed fetches, "
+            f"{dead_letters['recovered']} recovered by the retry pass, "
+            f"{dead_letters['still_failing']} left for --drain-dead-letters."
+        )
+    cache_stats = summary["http_cache"]
+    if cache_stats is not None:
         logger.info(
-            f"Processing Pokémon ID {pokemon_id_for_log} ({i+1}/{total_to_process})"
+            f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+            f"{cache_stats['misses']} misses."
         )
+    return success_count > 0
 
-        # Transform data
-        transformed_data = transform_pokemon_data(raw_data)
 
-        if not transformed_data or transformed_data.get("pokemon") is None:
-            logger.warning(
-                f"Skipping transformation or loading for Pokémon ID {pokemon_id_for_log} due to invalid transformed data."
-            )
+def _write_run_outputs(summary, summary_file, metrics_file):
+    """Write the JSON run summary and the Prometheus text metrics, where configured"""
+    try:
+        if summary_file:
+            write_json(summary_file, summary)
+            logger.info(f"Run summary written to {summary_file}")
+        if metrics_file:
+            write_prometheus_file(metrics_file)
+            logger.info(f"Metrics written to {metrics_file}")
+    except OSError as e:
+        logger.error(f"Failed to write run metrics: {e}")
+
+
+def run_worker(worker_id=None, wait=False, lease_seconds=None, **pipeline_options):
+    """Claim shards from the `etl_work_items` queue and run the pipeline on each
+
+    Any number of workers, on any number of hosts, can share one queue. A shard's lease
+    is renewed while it runs; if the worker dies the lease expires and another worker
+    picks the shard up. Returns when the queue is drained, or keeps polling with `wait`.
+    Returns the number of shards processed.
+    """
+    worker_id = worker_id or default_worker_id()
+    # Workers share the tables, so none of them may drop indexes under the others
+    pipeline_options.setdefault("defer_indexes", False)
+    lease_seconds = lease_seconds or Config.WORK_LEASE_SECONDS
+    try:
+        create_tables()
+    except Exception as e:
+        logger.error(f"Failed to create database tables: {e}")
+        return 0
+
+    logger.info(f"Worker {worker_id} started.")
+    processed = 0
+    while True:
+        claimed = claim_work_item(worker_id, lease_seconds)
+        if claimed is None:
+            if not wait:
+                break
+            time.sleep(Config.WORK_POLL_SECONDS)
             continue
 
-        # Load data
-        if load_transformed_data(transformed_data):
-            success_count += 1
-        else:
-            logger.error(f"Failed to load data for Pokémon ID: {pokemon_id_for_log}")
+        item_id, start_id, end_id = claimed
+        logger.info(f"Worker {worker_id} claimed work item {item_id} (IDs {start_id}-{end_id}).")
+        succeeded = False
+        try:
+            with LeaseHeartbeat(item_id, worker_id, lease_seconds):
+                succeeded = run_etl_pipeline(start_id=start_id, end_id=end_id, **pipeline_options)
+        except Exception as e:
+            logger.error(f"Work item {item_id} failed: {e}")
+        complete_work_item(item_id, worker_id, succeeded)
+        processed += 1
 
-    logger.info(
-        f"ETL pipeline completed. Successfully processed {success_count}/{total_to_process} Pokémon."
+    logger.info(f"Worker {worker_id} finished after {processed} work items.")
+    return processed
+
+
+def report_queue_progress():
+    """Log work-queue progress by status and return it"""
+    progress = work_progress()
+    total_ids = sum(counts["ids"] for counts in progress.values())
+    done_ids = progress.get("done", {}).get("ids", 0)
+    summary = ", ".join(
+        f"{counts['items']} {status} ({counts['ids']} IDs)"
+        for status, counts in sorted(progress.items())
     )
-    return success_count > 0
+    logger.info(f"Work queue: {summary or 'empty'}; {done_ids}/{total_ids} IDs done.")
+    return progress
 
 
-if __name__ == "__main__":
-    run_etl_pipeline(start_id=1, end_id=Config.API_RETRIES * 5)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the PokeAPI ETL pipeline")
+    parser.add_argument("--start-id", type=int, default=1)
+    parser.add_argument(
+        "--end-id",
+        type=int,
+        default=None,
+        help=f"Last Pokémon ID (default {Config.API_RETRIES * 5}; open-ended with --discover)",
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="Enumerate existing Pokémon IDs from the paginated /pokemon list endpoint",
+    )
+    parser.add_argument(
+        "--only-new",
+        action="store_true",
+        help="Skip Pokémon IDs already in the pokemon table",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=Config.EXTRACT_WORKERS,
+        help="Number of Pokémon IDs extracted concurrently (1 = serial)",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=None,
+        help="HTTP response cache mode (defaults to HTTP_CACHE_MODE)",
+    )
+    parser.add_argument(
+        "--archive-mode",
+        choices=ARCHIVE_MODES,
+        default=None,
+        help="Record raw responses to, or replay them from, the payload archive "
+        "(defaults to PAYLOAD_ARCHIVE_MODE)",
+    )
+    parser.add_argument("--archive-dir", help="Payload archive directory (PAYLOAD_ARCHIVE_DIR)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=Config.LOAD_BATCH_SIZE,
+        help="Transformed Pokémon written per load transaction",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=Config.PIPELINE_STREAMING,
+        help="Overlap extract, transform and load through bounded queues",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Rebuild the Pokémon tables via COPY into staging tables and swap them in",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the latest unfinished run (or --run-id) with only the IDs not yet loaded",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rewrite every Pokémon even when its content hash is unchanged",
+    )
+    parser.add_argument(
+        "--compact-stats",
+        action="store_true",
+        help="Deduplicate pokemon_stats on (pokemon_id, stat_name) and exit",
+    )
+    parser.add_argument(
+        "--rebuild-summary",
+        action="store_true",
+        help="Rebuild the whole pokemon_summary read model from the normalized tables and exit",
+    )
+    parser.add_argument(
+        "--drain-dead-letters",
+        action="store_true",
+        help="Run the pipeline over the pending dead-lettered Pokémon only",
+    )
+    parser.add_argument(
+        "--include-abandoned",
+        action="store_true",
+        help="With --drain-dead-letters, also retry Pokémon abandoned after too many attempts",
+    )
+    parser.add_argument(
+        "--seed-queue",
+        action="store_true",
+        help="Coordinator: split --start-id..--end-id into work items for --worker processes",
+    )
+    parser.add_argument("--shard-size", type=int, default=Config.WORK_SHARD_SIZE)
+    parser.add_argument(
+        "--queue-status", action="store_true", help="Coordinator: report work-queue progress"
+    )
+    parser.add_argument(
+        "--worker", action="store_true", help="Process shards claimed from the work queue"
+    )
+    parser.add_argument(
+        "--wait", action="store_true", help="Keep a --worker polling once the queue is empty"
+    )
+    parser.add_argument("--summary-file", help="Write a JSON run summary here (RUN_SUMMARY_FILE)")
+    parser.add_argument(
+        "--metrics-file", help="Write Prometheus text metrics here after each run (METRICS_FILE)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=Config.METRICS_PORT,
+        help="Serve Prometheus metrics on http://0.0.0.0:PORT/metrics while running (METRICS_PORT)",
+    )
+    parser.add_argument("--run-id", type=int, default=None, help="Run to continue with --resume")
+    return parser.parse_args(argv)
 
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.end_id is None and not args.discover:
+        args.end_id = Config.API_RETRIES * 5
+    if args.compact_stats:
+        create_tables()
+        compact_pokemon_stats()
+        raise SystemExit(0)
+    if args.rebuild_summary:
+        create_tables()
+        rebuild_pokemon_summary()
+        raise SystemExit(0)
+    configure_response_cache(args.cache_mode)
+    configure_payload_archive(args.archive_mode, args.archive_dir)
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+        logger.info(f"Serving metrics on port {args.metrics_port} at /metrics")
+    pipeline_options = dict(
+        workers=args.workers,
+        streaming=args.stream,
+        batch_size=args.batch_size,
+        force=args.force,
+        summary_file=args.summary_file,
+        metrics_file=args.metrics_file,
+    )
+    if args.seed_queue:
+        create_tables()
+        if args.discover or args.only_new:
+            pokemon_ids = _select_ids(
+                args.start_id, args.end_id, args.discover, args.only_new, args.workers
+            )
+            if pokemon_ids is not None:
+                seed_work_items_for_ids(pokemon_ids, args.shard_size)
+        else:
+            seed_work_items(args.start_id, args.end_id, args.shard_size)
+        report_queue_progress()
+    elif args.queue_status:
+        report_queue_progress()
+    elif args.drain_dead_letters:
+        create_tables()
+        statuses = ("pending", "abandoned") if args.include_abandoned else ("pending",)
+        pokemon_ids = dead_letter_ids(statuses)
+        if pokemon_ids:
+            logger.info(f"Draining {len(pokemon_ids)} dead-lettered Pokémon.")
+            run_etl_pipeline(pokemon_ids=pokemon_ids, **pipeline_options)
+        counts = dead_letter_counts()
+        logger.info(
+            "Dead letters: "
+            + (", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "none")
+        )
+    elif args.worker:
+        run_worker(wait=args.wait, **pipeline_options)
+    else:
+        run_etl_pipeline(
+            start_id=args.start_id,
+            end_id=args.end_id,
+            full_refresh=args.full_refresh,
+            resume=args.resume,
+            resume_run_id=args.run_id,
+            discover=args.discover,
+            only_new=args.only_new,
+            **pipeline_options,
+        )
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from sqlalchemy import select
+from data_models.models import EtlRun, EtlCheckpoint
+from etl.load.loader import upsert_insert
+from utils.database import with_session
+from utils.config import Config
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+CHECKPOINT_BATCH_SIZE = Config.CHECKPOINT_BATCH_SIZE
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def start_run(start_id, end_id, session=None):
+    """Record a new ETL run over an ID range and return its run_id"""
+
+    def work(session):
+        run = EtlRun(start_id=start_id, end_id=end_id, status="running")
+        session.add(run)
+        session.flush()
+        return run.run_id
+
+    run_id = with_session(session, work)
+    logger.info(f"Started ETL run {run_id} for Pokémon IDs {start_id} to {end_id}.")
+    return run_id
+
+
+def find_resumable_run(run_id=None, session=None):
+    """Return (run_id, start_id, end_id) of the given or latest unfinished run, or None"""
+
+    def work(session):
+        query = select(EtlRun.run_id, EtlRun.start_id, EtlRun.end_id)
+        if run_id is not None:
+            query = query.where(EtlRun.run_id == run_id)
+        else:
+            query = query.where(EtlRun.status != "completed").order_by(EtlRun.run_id.desc())
+        row = session.execute(query.limit(1)).first()
+        return tuple(row) if row else None
+
+    return with_session(session, work)
+
+
+def pending_ids(run_id, start_id, end_id, session=None, candidates=None):
+    """IDs in the run's range (or in `candidates`, such as discovered IDs) not loaded yet"""
+
+    def work(session):
+        loaded = set(
+            session.execute(
+                select(EtlCheckpoint.pokemon_id).where(
+                    EtlCheckpoint.run_id == run_id, EtlCheckpoint.status == "loaded"
+                )
+            ).scalars()
+        )
+        ids = range(start_id, end_id + 1) if candidates is None else candidates
+        return [
+            pokemon_id
+            for pokemon_id in ids
+            if start_id <= pokemon_id <= end_id and pokemon_id not in loaded
+        ]
+
+    return with_session(session, work)
+
+
+def finish_run(run_id, status, session=None):
+    """Mark a run as 'completed' or 'failed'"""
+
+    def work(session):
+        run = session.get(EtlRun, run_id)
+        run.status = status
+        run.finished_at = _utcnow()
+
+    with_session(session, work)
+    logger.info(f"ETL run {run_id} finished with status '{status}'.")
+
+
+class CheckpointWriter:
+    """Buffers per-ID statuses for a run and upserts them `flush_every` at a time"""
+
+    def __init__(self, run_id, flush_every=CHECKPOINT_BATCH_SIZE, session=None):
+        self.run_id = run_id
+        self.flush_every = flush_every
+        self.session = session
+        self._pending = {}
+
+    def record(self, pokemon_ids, status):
+        now = _utcnow()
+        for pokemon_id in pokemon_ids:
+            self._pending[pokemon_id] = (status, now)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        rows = [
+            {"run_id": self.run_id, "pokemon_id": pokemon_id, "status": status, "updated_at": at}
+            for pokemon_id, (status, at) in sorted(self._pending.items())
+        ]
+
+        def work(session):
+            insert = upsert_insert(session)
+            statement = insert(EtlCheckpoint).values(rows)
+            session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["run_id", "pokemon_id"],
+                    set_={
+                        "status": statement.excluded.status,
+                        "updated_at": statement.excluded.updated_at,
+                    },
+                )
+            )
+
+        try:
+            with_session(self.session, work)
+            self._pending.clear()
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} checkpoints for run {self.run_id}: {e}")
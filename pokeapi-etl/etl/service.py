@@ -0,0 +1,445 @@
+from etl.extract.extractor import configure_response_cache, get_http_session
+from etl.load.loader import preload_dimension_caches
+from etl.orchestrate import run_etl_pipeline
+from utils.metrics import metrics
+from utils.database import create_tables
+from utils.logging_config import setup_logging
+from utils.config import Config
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import itertools
+import json
+import signal
+import threading
+
+logger = setup_logging(__name__)
+
+# Keys of the pipeline's progress reports and run summary exposed on a job
+PROGRESS_KEYS = (
+    "run_id",
+    "ids_requested",
+    "extracted",
+    "loaded",
+    "load",
+    "dead_letters",
+    "duration_seconds",
+)
+
+FINISHED_STATUSES = ("succeeded", "failed", "merged")
+
+# Paths that queue a job: the service's own and the one the frontend's API route posts to
+TRIGGER_PATHS = ("/jobs", "/trigger-etl")
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _isoformat(moment):
+    return moment.isoformat() if moment else None
+
+
+class Job:
+    """A triggered pipeline run over an ID range, with the triggers folded into it"""
+
+    def __init__(self, job_id, start_id, end_id, full_refresh=False, force=False):
+        self.job_id = job_id
+        self.start_id = start_id
+        self.end_id = end_id
+        self.full_refresh = full_refresh
+        self.force = force
+        self.status = "queued"
+        self.triggers = 1
+        self.merged_into = None
+        self.error = None
+        self.progress = {}
+        self.created_at = _utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def kind(self):
+        return "refresh" if self.full_refresh else "range"
+
+    def same_options(self, full_refresh, force):
+        return self.full_refresh == full_refresh and self.force == force
+
+    def absorbs(self, start_id, end_id):
+        """Whether running this job already does what a trigger for start_id..end_id asks
+
+        A range job loads every ID it covers; a full refresh leaves exactly its range in
+        the tables, so only an identical refresh is a duplicate of it.
+        """
+        if self.full_refresh:
+            return (self.start_id, self.end_id) == (start_id, end_id)
+        return self.start_id <= start_id and end_id <= self.end_id
+
+    def touches(self, start_id, end_id):
+        """Whether start_id..end_id overlaps or adjoins this job's range"""
+        return start_id <= self.end_id + 1 and end_id >= self.start_id - 1
+
+    def update_progress(self, report):
+        updates = {key: report[key] for key in PROGRESS_KEYS if key in report}
+        self.progress = {**self.progress, **updates}
+
+    def to_dict(self):
+        progress = dict(self.progress)
+        if progress.get("ids_requested"):
+            loaded = progress.get("loaded", 0)
+            progress["percent"] = round(100 * loaded / progress["ids_requested"], 1)
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "start_id": self.start_id,
+            "end_id": self.end_id,
+            "full_refresh": self.full_refresh,
+            "force": self.force,
+            "status": self.status,
+            "triggers": self.triggers,
+            "merged_into": self.merged_into,
+            "error": self.error,
+            "progress": progress,
+            "created_at": _isoformat(self.created_at),
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(self.finished_at),
+        }
+
+
+class JobQueue:
+    """Jobs waiting for, held by and finished on the service's single worker
+
+    Triggers coalesce instead of queueing duplicate work. A trigger the running job
+    already covers returns that job. A range trigger overlapping or adjoining queued
+    range jobs with the same options widens the oldest of them to the union and merges
+    the others into it; jobs queued before a refresh are left alone, since moving IDs
+    ahead of the refresh would have it wipe them. A refresh trigger supersedes a refresh
+    queued last with the same options, since only the later one would survive.
+    """
+
+    def __init__(self, history=None):
+        self.history = Config.ETL_SERVICE_JOB_HISTORY if history is None else history
+        self._condition = threading.Condition()
+        self._job_ids = itertools.count(1)
+        self._jobs = {}
+        self._queued = []
+        self._running = None
+
+    def submit(self, start_id, end_id, full_refresh=False, force=False):
+        """Queue a job for start_id..end_id or fold the trigger into one
+
+        Returns the job's state and whether the trigger was coalesced into an existing job.
+        """
+        with self._condition:
+            running = self._running
+            if (
+                running is not None
+                and running.same_options(full_refresh, force)
+                and running.absorbs(start_id, end_id)
+            ):
+                running.triggers += 1
+                return running.to_dict(), True
+
+            if full_refresh:
+                last = self._queued[-1] if self._queued else None
+                if last is not None and last.same_options(full_refresh, force):
+                    last.start_id, last.end_id = start_id, end_id
+                    last.triggers += 1
+                    return last.to_dict(), True
+            else:
+                refreshes = [i for i, job in enumerate(self._queued) if job.full_refresh]
+                after_refresh = self._queued[refreshes[-1] + 1 :] if refreshes else self._queued
+                touching = [
+                    job
+                    for job in after_refresh
+                    if job.same_options(full_refresh, force) and job.touches(start_id, end_id)
+                ]
+                if touching:
+                    target = touching[0]
+                    target.start_id = min([start_id] + [job.start_id for job in touching])
+                    target.end_id = max([end_id] + [job.end_id for job in touching])
+                    target.triggers += 1
+                    for job in touching[1:]:
+                        self._queued.remove(job)
+                        job.status = "merged"
+                        job.merged_into = target.job_id
+                        job.finished_at = _utcnow()
+                        target.triggers += job.triggers
+                    return target.to_dict(), True
+
+            job = Job(next(self._job_ids), start_id, end_id, full_refresh, force)
+            self._jobs[job.job_id] = job
+            self._queued.append(job)
+            self._trim()
+            self._condition.notify()
+            return job.to_dict(), False
+
+    def next_job(self, timeout=None):
+        """Take the oldest queued job and mark it running; None if none arrives within `timeout`"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._queued, timeout):
+                return None
+            job = self._running = self._queued.pop(0)
+            job.status = "running"
+            job.started_at = _utcnow()
+            return job
+
+    def finish(self, job, succeeded, error=None):
+        with self._condition:
+            job.status = "succeeded" if succeeded else "failed"
+            job.error = error
+            job.finished_at = _utcnow()
+            if self._running is job:
+                self._running = None
+
+    def get(self, job_id):
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def jobs(self):
+        """Every job kept, newest first"""
+        with self._condition:
+            return [job.to_dict() for job in reversed(list(self._jobs.values()))]
+
+    def stats(self):
+        with self._condition:
+            return {
+                "queued": len(self._queued),
+                "running": self._running.job_id if self._running else None,
+            }
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond `history`"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[: max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+
+def parse_id_range(text):
+    """Parse a "START-END" ID range such as "1-151"; returns (start_id, end_id)"""
+    start, separator, end = text.strip().partition("-")
+    if not separator or not start.isdigit() or not end.isdigit():
+        raise ValueError(f"Expected an ID range like 1-151, got '{text}'")
+    start_id, end_id = int(start), int(end)
+    if start_id < 1 or end_id < start_id:
+        raise ValueError(f"Invalid ID range '{text}'")
+    return start_id, end_id
+
+
+def _parse_trigger(body):
+    """Validate a trigger body; returns (start_id, end_id, full_refresh, force)"""
+    try:
+        trigger = json.loads(body or b"{}")
+    except ValueError:
+        raise ValueError("Request body is not valid JSON")
+    if not isinstance(trigger, dict):
+        raise ValueError("Request body must be a JSON object")
+    start_id = trigger.get("start_id", 1)
+    end_id = trigger.get("end_id")
+    for name, value in (("start_id", start_id), ("end_id", end_id)):
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"{name} must be a positive integer")
+    if end_id < start_id:
+        raise ValueError("end_id must not be below start_id")
+    options = []
+    for name in ("full_refresh", "force"):
+        value = trigger.get(name, False)
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be a boolean")
+        options.append(value)
+    return (start_id, end_id, *options)
+
+
+class EtlService:
+    """HTTP trigger API in front of one warm worker running `run_etl_pipeline` jobs
+
+    The process stays up between runs, so the pooled HTTP session, the database engine
+    and its connection pool, the adaptive rate limiter's learned rate and the dimension
+    caches carry over from one job to the next. Jobs run one at a time, so triggers can
+    never start overlapping runs.
+
+    Routes: POST /jobs ({"start_id", "end_id", "full_refresh", "force"}) queues a job
+    (202) and returns it, as does POST /trigger-etl for the frontend, GET /jobs lists jobs, GET /jobs/<id> reports one job's
+    state and progress, GET /health reports the queue and GET /metrics serves the
+    pipeline metrics.
+    """
+
+    def __init__(self, host=None, port=None, queue=None, **pipeline_options):
+        self.host = Config.ETL_SERVICE_HOST if host is None else host
+        self.port = Config.ETL_SERVICE_PORT if port is None else port
+        self.queue = queue or JobQueue()
+        self.pipeline_options = pipeline_options
+        self.server = None
+        self._stop = threading.Event()
+        self._worker = None
+
+    def warm_up(self):
+        """Create the tables and open the resources every job reuses"""
+        create_tables()
+        preload_dimension_caches()
+        get_http_session()
+
+    def run_job(self, job):
+        logger.info(
+            f"Running job {job.job_id}: {job.kind} of Pokémon IDs {job.start_id} to {job.end_id} "
+            f"({job.triggers} triggers)."
+        )
+        succeeded, error = False, None
+        try:
+            succeeded = run_etl_pipeline(
+                start_id=job.start_id,
+                end_id=job.end_id,
+                full_refresh=job.full_refresh,
+                force=job.force,
+                progress=job.update_progress,
+                **self.pipeline_options,
+            )
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+            logger.error(f"Job {job.job_id} failed: {error}")
+        self.queue.finish(job, succeeded, error)
+        metrics.inc("etl_service_jobs_total", status=job.status)
+        logger.info(f"Job {job.job_id} {job.status}.")
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.queue.next_job(timeout=1)
+            if job is not None:
+                self.run_job(job)
+
+    def _handler(self):
+        service = self
+
+        class TriggerHandler(BaseHTTPRequestHandler):
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path == "/health":
+                    self._reply(200, {"status": "ok", **service.queue.stats()})
+                elif path == "/jobs":
+                    self._reply(200, {"jobs": service.queue.jobs()})
+                elif path.startswith("/jobs/") and path[len("/jobs/"):].isdigit():
+                    job = service.queue.get(int(path[len("/jobs/"):]))
+                    if job is None:
+                        self._reply(404, {"error": "Unknown job"})
+                    else:
+                        self._reply(200, job)
+                elif path == "/metrics":
+                    body = metrics.to_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._reply(404, {"error": "Not found"})
+
+            def do_POST(self):
+                if self.path.split("?", 1)[0].rstrip("/") not in TRIGGER_PATHS:
+                    self._reply(404, {"error": "Not found"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    start_id, end_id, full_refresh, force = _parse_trigger(self.rfile.read(length))
+                except ValueError as e:
+                    metrics.inc("etl_service_triggers_total", outcome="rejected")
+                    self._reply(400, {"error": str(e)})
+                    return
+                job, coalesced = service.queue.submit(start_id, end_id, full_refresh, force)
+                metrics.inc(
+                    "etl_service_triggers_total", outcome="coalesced" if coalesced else "queued"
+                )
+                self._reply(202, {**job, "coalesced": coalesced})
+
+            def log_message(self, format, *args):
+                pass
+
+        return TriggerHandler
+
+    def start(self):
+        """Bind the HTTP server and start the worker; returns the bound (host, port)"""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._work, name="etl-service-worker", daemon=True)
+        self._worker.start()
+        threading.Thread(
+            target=self.server.serve_forever, name="etl-service-http", daemon=True
+        ).start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"ETL trigger service listening on http://{host}:{port}")
+        return host, port
+
+    def stop(self):
+        """Stop accepting triggers and let the worker finish the job it holds"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the PokeAPI ETL trigger API")
+    parser.add_argument("--host", default=Config.ETL_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=Config.ETL_SERVICE_PORT)
+    parser.add_argument(
+        "--initial-job",
+        default=Config.ETL_SERVICE_INITIAL_JOB,
+        help="START-END range queued as soon as the service is up (ETL_SERVICE_INITIAL_JOB)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=Config.EXTRACT_WORKERS,
+        help="Number of Pokémon IDs extracted concurrently per job (1 = serial)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=Config.LOAD_BATCH_SIZE,
+        help="Transformed Pokémon written per load transaction",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=Config.PIPELINE_STREAMING,
+        help="Overlap extract, transform and load through bounded queues",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    initial_job = parse_id_range(args.initial_job) if args.initial_job else None
+    configure_response_cache()
+    service = EtlService(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        streaming=args.stream,
+    )
+    service.warm_up()
+    service.start()
+    if initial_job is not None:
+        job, _ = service.queue.submit(*initial_job)
+        logger.info(f"Queued initial job {job['job_id']} for Pokémon IDs {job['start_id']} to {job['end_id']}.")
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        while not stopping.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    logger.info("Shutting down the ETL trigger service.")
+    service.stop()
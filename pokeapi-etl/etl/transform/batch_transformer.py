@@ -0,0 +1,175 @@
+import pandas as pd
+from etl.transform.transformer import _resource_id, content_hash, flatten_evolution_chain
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+# Columns and dtypes of the frame built for each target table. Nullable dtypes keep the
+# nulls transform_pokemon_data passes through as nulls, so the content hashes agree.
+FRAME_SCHEMAS = {
+    "pokemon": {
+        "pokemon_id": "int64",
+        "name": "string",
+        "height": "Int64",
+        "weight": "Int64",
+        "base_experience": "Int64",
+        "is_default": "boolean",
+        "species_id": "Int64",
+        "evolution_chain_id": "Int64",
+    },
+    # Dimension names repeat across thousands of rows, so they are stored as categoricals
+    "pokemon_types": {"pokemon_id": "int64", "type_name": "category"},
+    "pokemon_abilities": {"pokemon_id": "int64", "ability_name": "category"},
+    "pokemon_stats": {
+        "pokemon_id": "int64",
+        "stat_name": "category",
+        "base_stat": "int64",
+        "effort": "Int64",
+    },
+}
+
+# Natural key of each link table; duplicates within a batch collapse onto it
+FRAME_KEYS = {
+    "pokemon_types": ["pokemon_id", "type_name"],
+    "pokemon_abilities": ["pokemon_id", "ability_name"],
+    "pokemon_stats": ["pokemon_id", "stat_name"],
+}
+
+
+def _frame(table, rows, extra_columns=()):
+    """Build a typed frame from row tuples"""
+    schema = dict.fromkeys(extra_columns, "int64") | FRAME_SCHEMAS[table]
+    return pd.DataFrame.from_records(rows, columns=list(schema)).astype(schema)
+
+
+def transform_batch(raw_records):
+    """Transform many raw payloads into one typed, deduplicated DataFrame per target table
+
+    The batch counterpart of `transform_pokemon_data`: payloads are flattened straight into
+    column tuples, with no per-record dicts and one summary warning instead of a log line
+    per malformed entry. When a Pokémon appears more than once, its last copy wins, as in
+    `valid_records`. Returns {"pokemon", "pokemon_types", "pokemon_abilities",
+    "pokemon_stats"}; link tables carry names, resolved to ids by the loader.
+    """
+    pokemon_rows, type_rows, ability_rows, stat_rows = [], [], [], []
+    add_pokemon, add_type = pokemon_rows.append, type_rows.append
+    add_ability, add_stat = ability_rows.append, stat_rows.append
+    skipped = malformed = 0
+
+    for position, raw_data in enumerate(raw_records):
+        pokemon = (raw_data or {}).get("pokemon")
+        pokemon_id = pokemon.get("id") if pokemon else None
+        if pokemon_id is None:
+            skipped += 1
+            continue
+
+        add_pokemon(
+            (
+                position,
+                pokemon_id,
+                pokemon.get("name"),
+                pokemon.get("height"),
+                pokemon.get("weight"),
+                pokemon.get("base_experience"),
+                pokemon.get("is_default", False),
+                _resource_id(raw_data.get("species"), "species_id"),
+                _resource_id(raw_data.get("evolution_chain"), "evolution_chain_id"),
+            )
+        )
+        for type_entry in pokemon.get("types") or ():
+            name = (type_entry.get("type") or {}).get("name")
+            if name:
+                add_type((position, pokemon_id, name))
+            else:
+                malformed += 1
+        for ability_entry in pokemon.get("abilities") or ():
+            name = (ability_entry.get("ability") or {}).get("name")
+            if name:
+                add_ability((position, pokemon_id, name))
+            else:
+                malformed += 1
+        for stat_entry in pokemon.get("stats") or ():
+            name = (stat_entry.get("stat") or {}).get("name")
+            base_stat = stat_entry.get("base_stat")
+            if name and base_stat is not None:
+                add_stat((position, pokemon_id, name, base_stat, stat_entry.get("effort", 0)))
+            else:
+                malformed += 1
+
+    if skipped or malformed:
+        logger.warning(
+            f"Batch transform skipped {skipped} payloads without Pokémon data and "
+            f"{malformed} malformed type/ability/stat entries."
+        )
+
+    pokemon_frame = _frame("pokemon", pokemon_rows, ["position"])
+    pokemon_frame = pokemon_frame.drop_duplicates("pokemon_id", keep="last")
+    # Children of an overridden copy of a Pokémon are dropped along with it
+    kept_positions = pokemon_frame["position"]
+    frames = {"pokemon": pokemon_frame.drop(columns="position").reset_index(drop=True)}
+    for table, rows in (
+        ("pokemon_types", type_rows),
+        ("pokemon_abilities", ability_rows),
+        ("pokemon_stats", stat_rows),
+    ):
+        frame = _frame(table, rows, ["position"])
+        frame = frame[frame["position"].isin(kept_positions)]
+        frame = frame.drop_duplicates(FRAME_KEYS[table], keep="last")
+        frames[table] = frame.drop(columns="position").reset_index(drop=True)
+    return frames
+
+
+def evolution_chains(raw_records):
+    """Flattened evolution chains of a batch of raw payloads, one per chain_id"""
+    chains = {}
+    for raw_data in raw_records:
+        chain_data = (raw_data or {}).get("evolution_chain")
+        if not chain_data or _resource_id(chain_data, "evolution_chain_id") in chains:
+            continue
+        chain = flatten_evolution_chain(chain_data)
+        if chain is not None:
+            chains[chain["chain_id"]] = chain
+    return chains
+
+
+def _python(value):
+    """Plain Python value of a frame cell (numpy scalars and pd.NA are not JSON/DB friendly)"""
+    if value is pd.NA or value is None:
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def frame_records(frames, table):
+    """Rows of one frame as plain-Python dicts, ready for a bulk INSERT"""
+    frame = frames[table]
+    columns = list(frame.columns)
+    return [
+        {column: _python(value) for column, value in zip(columns, row)}
+        for row in frame.itertuples(index=False, name=None)
+    ]
+
+
+def content_hashes(frames):
+    """Per-Pokémon content hashes equal to `content_hash(transform_pokemon_data(...))`"""
+    records = {}
+    for row in frame_records(frames, "pokemon"):
+        pokemon_id = row["pokemon_id"]
+        records[pokemon_id] = {
+            "pokemon": {
+                column: row[column]
+                for column in ("pokemon_id", "name", "height", "weight", "base_experience", "is_default")
+            },
+            "types": [],
+            "abilities": [],
+            "stats": [],
+            "species_id": row["species_id"],
+            "evolution_chain_id": row["evolution_chain_id"],
+        }
+    for table, key in (
+        ("pokemon_types", "types"),
+        ("pokemon_abilities", "abilities"),
+        ("pokemon_stats", "stats"),
+    ):
+        for row in frame_records(frames, table):
+            records[row["pokemon_id"]][key].append(row)
+    return {pokemon_id: content_hash(record) for pokemon_id, record in records.items()}
@@ -1,7 +1,10 @@
+import hashlib
+import json
 import logging
-from utils.logging_config import setup_logging
+from utils.logging_config import setup_logging, SampledLogger
 
 logger = setup_logging(__name__)
+sampled_logger = SampledLogger(logger)
 
 
 def transform_pokemon_data(raw_data):
@@ -13,6 +16,7 @@ def transform_pokemon_data(raw_data):
         "stats": [],
         "species_id": None,
         "evolution_chain_id": None,
+        "evolution": None,
     }
     if not raw_data or "pokemon" not in raw_data or raw_data["pokemon"] is None:
         logger.warning("No valid 'pokemon' data found in raw_data for transformation.")
@@ -29,25 +33,11 @@ def transform_pokemon_data(raw_data):
         "is_default": pokemon.get("is_default", False),
     }
 
-    if raw_data.get("species") and raw_data["species"].get("url"):
-        try:
-            transformed["species_id"] = int(
-                raw_data["species"]["url"].rstrip("/").split("/")[-1]
-            )
-        except (ValueError, IndexError):
-            logger.warning(
-                f"Could not parse species_id from URL: {raw_data['species']['url']}"
-            )
-
-    if raw_data.get("evolution_chain") and raw_data["evolution_chain"].get("url"):
-        try:
-            transformed["evolution_chain_id"] = int(
-                raw_data["evolution_chain"]["url"].rstrip("/").split("/")[-1]
-            )
-        except (ValueError, IndexError):
-            logger.warning(
-                f"Could not parse evolution_chain_id from URL: {raw_data['evolution_chain']['url']}"
-            )
+    transformed["species_id"] = _resource_id(raw_data.get("species"), "species_id")
+    transformed["evolution_chain_id"] = _resource_id(
+        raw_data.get("evolution_chain"), "evolution_chain_id"
+    )
+    transformed["evolution"] = flatten_evolution_chain(raw_data.get("evolution_chain"))
 
     # Types
     if "types" in pokemon and isinstance(pokemon["types"], list):
@@ -58,11 +48,14 @@ def transform_pokemon_data(raw_data):
                     {"type_name": type_data["name"], "pokemon_id": pokemon["id"]}
                 )
             else:
-                logger.warning(
-                    f"Malformed type entry for Pokémon ID {pokemon.get('id')}: {type_entry}"
+                sampled_logger.warning(
+                    "malformed_type",
+                    "Malformed type entry for Pokémon ID %s: %s",
+                    pokemon.get("id"),
+                    type_entry,
                 )
     else:
-        logger.info(f"No 'types' data found for Pokémon ID {pokemon.get('id')}.")
+        sampled_logger.info("no_types", "No 'types' data found for Pokémon ID %s.", pokemon.get("id"))
 
     # Abilities
     if "abilities" in pokemon and isinstance(pokemon["abilities"], list):
@@ -73,11 +66,14 @@ def transform_pokemon_data(raw_data):
                     {"ability_name": ability_data["name"], "pokemon_id": pokemon["id"]}
                 )
             else:
-                logger.warning(
-                    f"Malformed ability entry for Pokémon ID {pokemon.get('id')}: {ability_entry}"
+                sampled_logger.warning(
+                    "malformed_ability",
+                    "Malformed ability entry for Pokémon ID %s: %s",
+                    pokemon.get("id"),
+                    ability_entry,
                 )
     else:
-        logger.info(f"No 'abilities' data found for Pokémon ID {pokemon.get('id')}.")
+        sampled_logger.info("no_abilities", "No 'abilities' data found for Pokémon ID %s.", pokemon.get("id"))
 
     # Stats
     if "stats" in pokemon and isinstance(pokemon["stats"], list):
@@ -97,10 +93,80 @@ def transform_pokemon_data(raw_data):
                     }
                 )
             else:
-                logger.warning(
-                    f"Malformed stat entry for Pokémon ID {pokemon.get('id')}: {stat_entry}"
+                sampled_logger.warning(
+                    "malformed_stat",
+                    "Malformed stat entry for Pokémon ID %s: %s",
+                    pokemon.get("id"),
+                    stat_entry,
                 )
     else:
-        logger.info(f"No 'stats' data found for Pokémon ID {pokemon.get('id')}.")
+        sampled_logger.info("no_stats", "No 'stats' data found for Pokémon ID %s.", pokemon.get("id"))
 
     return transformed
+
+
+def _resource_id(resource, field):
+    """ID of a fetched resource: parsed from its `url` when present, else its own `id`"""
+    if not resource:
+        return None
+    if resource.get("url"):
+        try:
+            return int(resource["url"].rstrip("/").split("/")[-1])
+        except (ValueError, IndexError):
+            logger.warning(f"Could not parse {field} from URL: {resource['url']}")
+            return None
+    return resource.get("id")
+
+
+def flatten_evolution_chain(chain_data):
+    """Flatten an evolution-chain payload's recursive `chain.evolves_to` tree
+
+    Returns {"chain_id", "root_species_id", "species": [{"species_id", "name", "depth"}],
+    "edges": [{"from_species_id", "to_species_id", "trigger", "min_level"}]}, species in
+    tree order, or None when the payload has no usable chain.
+    """
+    if not chain_data or not chain_data.get("chain"):
+        return None
+    chain_id = _resource_id(chain_data, "evolution_chain_id")
+    species, edges = [], []
+    pending = [(chain_data["chain"], None, 0)]
+    while pending:
+        link, parent_id, depth = pending.pop()
+        species_id = _resource_id(link.get("species"), "species_id")
+        if species_id is None:
+            sampled_logger.warning(
+                "malformed_chain_link", "Skipping evolution chain %s link without a species.", chain_id
+            )
+            continue
+        species.append({"species_id": species_id, "name": link["species"].get("name"), "depth": depth})
+        if parent_id is not None:
+            details = (link.get("evolution_details") or [{}])[0] or {}
+            edges.append(
+                {
+                    "from_species_id": parent_id,
+                    "to_species_id": species_id,
+                    "trigger": (details.get("trigger") or {}).get("name"),
+                    "min_level": details.get("min_level"),
+                }
+            )
+        for child in reversed(link.get("evolves_to") or []):
+            pending.append((child, species_id, depth + 1))
+    if chain_id is None or not species:
+        return None
+    return {
+        "chain_id": chain_id,
+        "root_species_id": species[0]["species_id"],
+        "species": species,
+        "edges": edges,
+    }
+
+
+def content_hash(transformed_data):
+    """Stable SHA-256 of a transformed record, used to skip unchanged Pokémon on load
+
+    The flattened evolution chain is shared by a whole family and carries a hash of its
+    own, so it is left out.
+    """
+    record = {key: value for key, value in transformed_data.items() if key != "evolution"}
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,205 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, or_, select, update
+from data_models.models import EtlWorkItem
+from utils.database import with_session
+from utils.config import Config
+from utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+WORK_SHARD_SIZE = Config.WORK_SHARD_SIZE
+WORK_LEASE_SECONDS = Config.WORK_LEASE_SECONDS
+WORK_MAX_ATTEMPTS = Config.WORK_MAX_ATTEMPTS
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def seed_work_items(start_id, end_id, shard_size=WORK_SHARD_SIZE, session=None):
+    """Split an ID range into pending work items; returns the number created"""
+
+    def work(session):
+        shards = [
+            EtlWorkItem(
+                start_id=first, end_id=min(first + shard_size - 1, end_id), status="pending"
+            )
+            for first in range(start_id, end_id + 1, shard_size)
+        ]
+        session.add_all(shards)
+        return len(shards)
+
+    seeded = with_session(session, work)
+    logger.info(f"Seeded {seeded} work items for Pokémon IDs {start_id} to {end_id}.")
+    return seeded
+
+
+def id_shards(pokemon_ids, shard_size=WORK_SHARD_SIZE):
+    """(start_id, end_id) ranges covering sorted IDs, split at gaps and every `shard_size` IDs"""
+    shards = []
+    for pokemon_id in pokemon_ids:
+        if shards:
+            start_id, end_id = shards[-1]
+            if pokemon_id == end_id + 1 and pokemon_id - start_id < shard_size:
+                shards[-1] = (start_id, pokemon_id)
+                continue
+        shards.append((pokemon_id, pokemon_id))
+    return shards
+
+
+def seed_work_items_for_ids(pokemon_ids, shard_size=WORK_SHARD_SIZE, session=None):
+    """Seed work items covering only the given (e.g. discovered) IDs; returns the number created"""
+
+    def work(session):
+        shards = [
+            EtlWorkItem(start_id=start_id, end_id=end_id, status="pending")
+            for start_id, end_id in id_shards(sorted(pokemon_ids), shard_size)
+        ]
+        session.add_all(shards)
+        return len(shards)
+
+    seeded = with_session(session, work)
+    logger.info(f"Seeded {seeded} work items for {len(pokemon_ids)} Pokémon IDs.")
+    return seeded
+
+
+def claim_work_item(
+    worker_id, lease_seconds=WORK_LEASE_SECONDS, max_attempts=WORK_MAX_ATTEMPTS, session=None
+):
+    """Lease the next pending (or abandoned) work item; returns (item_id, start_id, end_id)
+
+    The candidate row is locked with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+    workers never wait on each other or claim the same item. Items whose lease has
+    expired, because their worker stopped heartbeating, are claimable again; one that
+    has already used `max_attempts` claims is marked failed instead, so a shard that
+    keeps killing its worker is given up like one that keeps failing.
+    """
+
+    def work(session):
+        while True:
+            now = _utcnow()
+            item = session.execute(
+                select(EtlWorkItem)
+                .where(
+                    or_(
+                        EtlWorkItem.status == "pending",
+                        (EtlWorkItem.status == "claimed") & (EtlWorkItem.lease_expires_at < now),
+                    )
+                )
+                .order_by(EtlWorkItem.item_id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar_one_or_none()
+            if item is None:
+                return None
+
+            if item.status != "claimed":
+                break
+            if item.attempts < max_attempts:
+                logger.warning(f"Reclaiming work item {item.item_id} abandoned by {item.worker_id}.")
+                break
+            logger.error(
+                f"Giving up work item {item.item_id} after {item.attempts} abandoned attempts."
+            )
+            item.status = "failed"
+            item.lease_expires_at = None
+            session.commit()
+
+        item.status = "claimed"
+        item.worker_id = worker_id
+        item.attempts += 1
+        item.heartbeat_at = now
+        item.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        return item.item_id, item.start_id, item.end_id
+
+    return with_session(session, work)
+
+
+def renew_lease(item_id, worker_id, lease_seconds=WORK_LEASE_SECONDS, session=None):
+    """Extend a held lease; returns False if the item is no longer leased to `worker_id`"""
+
+    def work(session):
+        now = _utcnow()
+        result = session.execute(
+            update(EtlWorkItem)
+            .where(
+                EtlWorkItem.item_id == item_id,
+                EtlWorkItem.worker_id == worker_id,
+                EtlWorkItem.status == "claimed",
+            )
+            .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+        )
+        return result.rowcount == 1
+
+    return with_session(session, work)
+
+
+def complete_work_item(item_id, worker_id, succeeded, max_attempts=WORK_MAX_ATTEMPTS, session=None):
+    """Mark a leased item done, or release it for another attempt (failed after the last)"""
+
+    def work(session):
+        item = session.get(EtlWorkItem, item_id)
+        if item is None or item.worker_id != worker_id:
+            logger.warning(f"Work item {item_id} is no longer leased to {worker_id}.")
+            return
+        if succeeded:
+            item.status = "done"
+        else:
+            item.status = "pending" if item.attempts < max_attempts else "failed"
+        item.lease_expires_at = None
+
+    with_session(session, work)
+
+
+def work_progress(session=None):
+    """Count work items and Pokémon IDs by status"""
+
+    def work(session):
+        rows = session.execute(
+            select(
+                EtlWorkItem.status,
+                func.count(),
+                func.sum(EtlWorkItem.end_id - EtlWorkItem.start_id + 1),
+            ).group_by(EtlWorkItem.status)
+        ).all()
+        return {status: {"items": items, "ids": int(ids or 0)} for status, items, ids in rows}
+
+    return with_session(session, work)
+
+
+class LeaseHeartbeat:
+    """Context manager renewing a work item's lease on a background thread"""
+
+    def __init__(self, item_id, worker_id, lease_seconds=WORK_LEASE_SECONDS):
+        self.item_id = item_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"lease-{item_id}", daemon=True)
+
+    def _beat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not renew_lease(self.item_id, self.worker_id, self.lease_seconds):
+                    self.lost = True
+                    logger.warning(f"Lost the lease on work item {self.item_id}.")
+                    return
+            except Exception as e:
+                logger.error(f"Heartbeat for work item {self.item_id} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
@@ -2,6 +2,7 @@ import pytest
 import os
 import sys
 import logging
+import tempfile
 from unittest.mock import patch, MagicMock
 
 from sqlalchemy import create_engine
@@ -9,12 +10,34 @@ from sqlalchemy.orm import sessionmaker
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# Test runs log to a scratch file, not the working tree; set before utils.config is imported
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="pokeapi_etl_tests_"), "pokeapi_etl.log"))
+
 from data_models.models import Base
 from utils.logging_config import setup_logging
+from etl.extract.extractor import (
+    close_http_session,
+    configure_payload_archive,
+    configure_rate_limiter,
+    configure_response_cache,
+)
 
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def fresh_http_session():
+    """Ensures each test builds (or mocks) its own pooled HTTP session, uncached, unarchived
+    and with a fresh rate limiter."""
+    close_http_session()
+    configure_response_cache("off")
+    configure_payload_archive("off")
+    configure_rate_limiter()
+    yield
+    close_http_session()
+    configure_payload_archive("off")
+
+
 @pytest.fixture(scope="session")
 def test_engine():
     engine = create_engine(TEST_DATABASE_URL)
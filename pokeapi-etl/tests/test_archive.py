@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+from etl.extract.archive import PayloadArchive, resource_key
+from etl.extract.extractor import fetch_data, configure_payload_archive, configure_response_cache
+
+URL = "https://pokeapi.co/api/v2/pokemon/1"
+BODY = b'{"id": 1, "name": "bulbasaur", "moves": []}'
+
+
+def test_resource_key_ignores_host_and_trailing_slash():
+    assert resource_key(URL) == ("pokemon", "1")
+    assert resource_key("http://127.0.0.1:8000/api/v2/evolution-chain/7/") == ("evolution-chain", "7")
+    assert resource_key("https://pokeapi.co/api/v2/pokemon?limit=20&offset=40") == (
+        "pokemon",
+        "?limit=20&offset=40",
+    )
+
+
+def test_archive_round_trip_and_reopen(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+    archive.append("pokemon", 1, BODY)
+    archive.append("pokemon", 2, b'{"id": 2}')
+    archive.append("pokemon", 1, b'{"id": 1, "name": "bulbasaur"}')
+
+    assert archive.get("pokemon", 1) == b'{"id": 1, "name": "bulbasaur"}'
+    assert archive.get("pokemon", 3) is None
+    archive.close()
+
+    # A torn index line left by an interrupted write is ignored
+    with open(tmp_path / "index.tsv", "a", encoding="utf-8") as f:
+        f.write("pokemon\t3\t1")
+    reopened = PayloadArchive(str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.get_url(URL + "/") == b'{"id": 1, "name": "bulbasaur"}'
+    assert reopened.get("pokemon", 2) == b'{"id": 2}'
+    reopened.close()
+
+
+def test_archive_skips_unchanged_bodies(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+
+    assert archive.append("pokemon", 1, BODY) is True
+    size = (tmp_path / "segment-000001.seg").stat().st_size
+    assert archive.append("pokemon", 1, BODY) is False
+    assert (tmp_path / "segment-000001.seg").stat().st_size == size
+    assert archive.append("pokemon", 1, b'{"id": 1}') is True
+    assert archive.get("pokemon", 1) == b'{"id": 1}'
+    archive.close()
+
+
+def test_archive_rolls_segments_over(tmp_path):
+    archive = PayloadArchive(str(tmp_path), segment_max_bytes=64)
+    for pokemon_id in range(1, 11):
+        archive.append("pokemon", pokemon_id, b'{"id": %d, "name": "%s"}' % (pokemon_id, b"x" * 80))
+
+    segments = sorted(path.name for path in tmp_path.glob("segment-*.seg"))
+    assert len(segments) > 1
+    assert archive.get("pokemon", 10).startswith(b'{"id": 10')
+    archive.close()
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_fetch_data_records_then_replays_without_network(mock_session, tmp_path):
+    mock_response = mock_session.return_value.get.return_value
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.content = BODY
+
+    configure_payload_archive("record", archive_dir=str(tmp_path))
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+    assert mock_session.return_value.get.call_count == 1
+
+    archive = configure_payload_archive("replay", archive_dir=str(tmp_path))
+    assert archive.get_url(URL) == BODY
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+    assert fetch_data("https://pokeapi.co/api/v2/pokemon/2") is None
+    assert mock_session.return_value.get.call_count == 1
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_cache_hits_and_revalidations_archive_the_raw_body(mock_session, tmp_path):
+    mock_response = mock_session.return_value.get.return_value
+    mock_response.status_code = 200
+    mock_response.headers = {"ETag": '"v1"'}
+    mock_response.content = BODY
+    cache = configure_response_cache("on", cache_dir=str(tmp_path / "cache"))
+    archive = configure_payload_archive("record", archive_dir=str(tmp_path / "archive"))
+
+    fetch_data(URL)
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+    cache.ttl = 0
+    mock_response.status_code = 304
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+
+    assert cache.stats()["hits"] == 1 and cache.stats()["revalidated"] == 1
+    assert archive.get_url(URL) == BODY
+    # The unchanged body was archived once, not once per hit
+    assert (tmp_path / "archive" / "index.tsv").read_text().count("\n") == 1
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_cache_entries_without_a_raw_body_are_refetched_for_the_archive(mock_session, tmp_path):
+    mock_response = mock_session.return_value.get.return_value
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.content = BODY
+    cache = configure_response_cache("on", cache_dir=str(tmp_path / "cache"))
+    cache.put(URL, {"id": 1, "name": "bulbasaur"})
+    archive = configure_payload_archive("record", archive_dir=str(tmp_path / "archive"))
+
+    fetch_data(URL)
+
+    _, kwargs = mock_session.return_value.get.call_args
+    assert kwargs["headers"] is None
+    assert archive.get_url(URL) == BODY
+    assert cache.get(URL)["raw"] == BODY.decode("utf-8")
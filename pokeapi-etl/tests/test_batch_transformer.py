@@ -0,0 +1,77 @@
+from etl.load.loader import frame_dimension_names, table_frames
+from etl.transform.batch_transformer import content_hashes, frame_records, transform_batch
+from etl.transform.transformer import content_hash, transform_pokemon_data
+
+
+def _raw(pokemon_id, name=None, stats=None):
+    return {
+        "pokemon": {
+            "id": pokemon_id,
+            "name": name or f"mon-{pokemon_id}",
+            "height": 7,
+            "weight": 69,
+            "base_experience": None,
+            "is_default": True,
+            "types": [{"type": {"name": "grass"}}, {"type": {"name": "poison"}}],
+            "abilities": [{"ability": {"name": "overgrow"}}, {"ability": {}}],
+            "stats": stats
+            or [
+                {"stat": {"name": "hp"}, "base_stat": 45, "effort": 0},
+                {"stat": {"name": "speed"}, "base_stat": 45},
+            ],
+        },
+        "species": {"url": f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}/"},
+        "evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/1/"},
+    }
+
+
+def test_transform_batch_builds_typed_deduplicated_frames():
+    renamed = _raw(1, name="renamed", stats=[{"stat": {"name": "hp"}, "base_stat": 50}])
+    frames = transform_batch([_raw(1), _raw(2), {"pokemon": None}, renamed])
+
+    pokemon = frames["pokemon"]
+    assert list(pokemon["pokemon_id"]) == [2, 1]
+    assert list(pokemon["name"]) == ["mon-2", "renamed"]
+    assert str(pokemon["base_experience"].dtype) == "Int64"
+    assert list(pokemon["species_id"]) == [2, 1]
+    assert len(frames["pokemon_types"]) == 4
+    assert len(frames["pokemon_abilities"]) == 2
+    # Only the stats of the last copy of Pokémon 1 are kept
+    assert frame_records(frames, "pokemon_stats") == [
+        {"pokemon_id": 2, "stat_name": "hp", "base_stat": 45, "effort": 0},
+        {"pokemon_id": 2, "stat_name": "speed", "base_stat": 45, "effort": 0},
+        {"pokemon_id": 1, "stat_name": "hp", "base_stat": 50, "effort": 0},
+    ]
+
+
+def test_content_hashes_match_per_record_transform():
+    raw_records = [_raw(1), _raw(2)]
+
+    hashes = content_hashes(transform_batch(raw_records))
+
+    assert hashes == {
+        raw["pokemon"]["id"]: content_hash(transform_pokemon_data(raw)) for raw in raw_records
+    }
+
+
+def test_content_hashes_match_per_record_transform_with_null_fields():
+    raw = _raw(3, stats=[{"stat": {"name": "hp"}, "base_stat": 45, "effort": None}])
+    raw["pokemon"].update(is_default=None, height=None, name=None)
+    raw["species"] = None
+    raw_records = [raw, _raw(4)]
+
+    frames = transform_batch(raw_records)
+
+    assert frame_records(frames, "pokemon_stats")[0]["effort"] is None
+    assert content_hashes(frames) == {
+        raw["pokemon"]["id"]: content_hash(transform_pokemon_data(raw)) for raw in raw_records
+    }
+
+
+def test_table_frames_resolve_dimension_ids():
+    frames = transform_batch([_raw(1)])
+
+    assert frame_dimension_names(frames) == (["grass", "poison"], ["overgrow"])
+    tables = table_frames(frames, {"grass": 10, "poison": 11}, {"overgrow": 20})
+    assert list(tables["pokemon_types"]["type_id"]) == [10, 11]
+    assert list(tables["pokemon_abilities"]["ability_id"]) == [20]
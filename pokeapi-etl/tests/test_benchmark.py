@@ -0,0 +1,54 @@
+import requests
+
+from benchmarks.run_benchmark import compare_to_baseline, percentile, run_benchmark
+from benchmarks.stub_server import PokeApiStub
+
+
+def test_stub_serves_families_and_injects_errors():
+    with PokeApiStub() as stub:
+        pokemon = requests.get(f"{stub.base_url}pokemon/4/").json()
+        species = requests.get(pokemon["species"]["url"]).json()
+        chain = requests.get(species["evolution_chain"]["url"]).json()
+        missing = requests.get(f"{stub.base_url}berry/1/")
+
+    assert pokemon["id"] == 4 and len(pokemon["stats"]) == 6
+    assert chain["id"] == 2
+    assert chain["chain"]["species"]["name"] == "stubmon-4"
+    assert chain["chain"]["evolves_to"][0]["evolves_to"][0]["species"]["name"] == "stubmon-6"
+    assert missing.status_code == 404
+
+    with PokeApiStub(error_rate=1.0) as stub:
+        assert requests.get(f"{stub.base_url}pokemon/1/").status_code == 503
+        assert stub.requests["errors"] == 1
+
+
+def test_run_benchmark_end_to_end_on_sqlite(tmp_path):
+    result = run_benchmark(f"sqlite:///{tmp_path / 'bench.db'}", count=12, workers=2, batch_size=5)
+
+    assert result["database"] == "sqlite"
+    assert result["records"] == 12
+    assert result["stages"]["extract"]["count"] == 12
+    assert result["stages"]["load"]["p99_ms"] >= result["stages"]["load"]["p50_ms"]
+    # Four families of three share one evolution-chain request each
+    assert result["http_requests"]["evolution-chain"] == 4
+    assert result["peak_rss_mb"] > 0
+
+
+def test_compare_to_baseline_flags_only_real_regressions():
+    baseline = {
+        "records_per_sec": 100.0,
+        "peak_rss_mb": 100.0,
+        "stages": {"extract": {"p99_ms": 10.0}, "transform": {"p99_ms": 0.1}},
+    }
+    result = {
+        "records_per_sec": 70.0,
+        "peak_rss_mb": 110.0,
+        "stages": {"extract": {"p99_ms": 20.0}, "transform": {"p99_ms": 0.5}},
+    }
+
+    regressions = compare_to_baseline(result, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("throughput")
+    assert regressions[1].startswith("extract p99")
+    assert percentile([3, 1, 2, 4], 50) == 2
@@ -0,0 +1,54 @@
+from data_models.models import EtlDeadLetter
+from etl.dead_letters import (
+    dead_letter_counts,
+    dead_letter_ids,
+    is_permanent,
+    record_dead_letters,
+    resolve_dead_letters,
+)
+
+
+def _failure(pokemon_id, error_class="timeout"):
+    return {
+        "pokemon_id": pokemon_id,
+        "resource": "pokemon",
+        "url": f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}",
+        "error_class": error_class,
+    }
+
+
+def test_is_permanent_only_for_client_errors_retrying_cannot_fix():
+    assert is_permanent("http_404")
+    assert not is_permanent("http_429")
+    assert not is_permanent("http_503")
+    assert not is_permanent("timeout")
+
+
+def test_failures_accumulate_attempts_until_abandoned(db_session):
+    record_dead_letters(
+        [_failure(1), _failure(2, "http_404")], run_id=1, max_attempts=3, session=db_session
+    )
+    record_dead_letters([_failure(1, "connection")], run_id=2, max_attempts=3, session=db_session)
+
+    row = db_session.get(EtlDeadLetter, 1)
+    assert (row.attempts, row.error_class, row.status, row.run_id) == (2, "connection", "pending", 2)
+    assert db_session.get(EtlDeadLetter, 2).status == "abandoned"
+    assert dead_letter_ids(session=db_session) == [1]
+
+    record_dead_letters([_failure(1)], max_attempts=3, session=db_session)
+    db_session.expire_all()
+    assert db_session.get(EtlDeadLetter, 1).status == "abandoned"
+    assert dead_letter_ids(("pending", "abandoned"), session=db_session) == [1, 2]
+
+
+def test_loaded_pokemon_resolve_and_restart_their_count(db_session):
+    record_dead_letters([_failure(1), _failure(2)], session=db_session)
+    record_dead_letters([_failure(1)], session=db_session)
+
+    assert resolve_dead_letters([1, 3], session=db_session) == 1
+    assert dead_letter_counts(session=db_session) == {"pending": 1, "resolved": 1}
+
+    record_dead_letters([_failure(1)], session=db_session)
+    db_session.expire_all()
+    row = db_session.get(EtlDeadLetter, 1)
+    assert (row.attempts, row.status) == (1, "pending")
@@ -0,0 +1,42 @@
+from etl.extract import discovery, extractor
+from etl.extract.extractor import endpoint_kind
+
+BASE_URL = "https://pokeapi.co/api/v2/"
+LISTED_IDS = [1, 2, 3, 4, 5, 10001, 10002]
+
+
+def _fake_list_endpoint(url):
+    query = dict(part.split("=") for part in url.split("?", 1)[1].split("&"))
+    offset, limit = int(query["offset"]), int(query["limit"])
+    return {
+        "count": len(LISTED_IDS),
+        "results": [
+            {"name": f"mon-{pokemon_id}", "url": f"{BASE_URL}pokemon/{pokemon_id}/"}
+            for pokemon_id in LISTED_IDS[offset : offset + limit]
+        ],
+    }
+
+
+def test_list_pages_have_their_own_endpoint_kind():
+    assert endpoint_kind(f"{BASE_URL}pokemon?limit=20&offset=40") == "pokemon-list"
+    assert endpoint_kind(f"{BASE_URL}pokemon/25/") == "pokemon"
+
+
+def test_discover_pokemon_ids_walks_every_page(mocker):
+    fetch = mocker.patch.object(extractor, "fetch_data", side_effect=_fake_list_endpoint)
+
+    assert discovery.discover_pokemon_ids(page_size=2, workers=3) == LISTED_IDS
+    assert fetch.call_count == 4
+    assert discovery.discover_pokemon_ids(page_size=3, start_id=3, end_id=10001) == [
+        3, 4, 5, 10001
+    ]
+
+
+def test_discover_pokemon_ids_fails_on_a_missing_page(mocker):
+    mocker.patch.object(
+        extractor,
+        "fetch_data",
+        side_effect=lambda url: None if "offset=4" in url else _fake_list_endpoint(url),
+    )
+
+    assert discovery.discover_pokemon_ids(page_size=2) is None
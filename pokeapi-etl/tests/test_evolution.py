@@ -0,0 +1,92 @@
+from etl.load.evolution import (
+    closure_rows,
+    evolution_family,
+    final_evolutions,
+    load_evolution_chains,
+)
+from etl.load.loader import load_transformed_batch
+from etl.transform.transformer import flatten_evolution_chain, transform_pokemon_data
+from data_models.models import EvolutionClosure, EvolutionEdge
+
+BASE_URL = "https://pokeapi.co/api/v2/"
+
+
+def _link(species_id, name, evolves_to=(), min_level=None):
+    return {
+        "species": {"name": name, "url": f"{BASE_URL}pokemon-species/{species_id}/"},
+        "evolution_details": [{"trigger": {"name": "level-up"}, "min_level": min_level}],
+        "evolves_to": list(evolves_to),
+    }
+
+
+# oddish -> gloom -> (vileplume | bellossom)
+CHAIN = {
+    "id": 18,
+    "chain": _link(
+        43,
+        "oddish",
+        [_link(44, "gloom", [_link(45, "vileplume"), _link(182, "bellossom")], min_level=21)],
+    ),
+}
+
+
+def test_flatten_evolution_chain_walks_the_tree():
+    chain = flatten_evolution_chain(CHAIN)
+
+    assert chain["chain_id"] == 18
+    assert chain["root_species_id"] == 43
+    assert [(s["species_id"], s["depth"]) for s in chain["species"]] == [
+        (43, 0), (44, 1), (45, 2), (182, 2)
+    ]
+    assert chain["edges"][0] == {
+        "from_species_id": 43, "to_species_id": 44, "trigger": "level-up", "min_level": 21
+    }
+    assert flatten_evolution_chain({"id": 1, "chain": None}) is None
+
+
+def test_closure_rows_cover_every_ancestor_descendant_pair():
+    pairs = {
+        (row["ancestor_species_id"], row["descendant_species_id"]): row["depth"]
+        for row in closure_rows(flatten_evolution_chain(CHAIN))
+    }
+
+    assert len(pairs) == 4 + 3 + 1 + 1
+    assert pairs[(43, 45)] == 2
+    assert (45, 43) not in pairs
+
+
+def test_chains_are_queried_by_lookup_and_rebuilt_only_when_changed(db_session):
+    chains = {18: flatten_evolution_chain(CHAIN)}
+    assert load_evolution_chains(chains, session=db_session)["evolution_closure"] == 9
+    assert load_evolution_chains(chains, session=db_session)["evolution_chains"] == 0
+
+    assert evolution_family(45, session=db_session) == [
+        (43, "oddish"), (44, "gloom"), (45, "vileplume"), (182, "bellossom")
+    ]
+    assert final_evolutions(43, session=db_session) == [(45, "vileplume"), (182, "bellossom")]
+    assert final_evolutions(182, session=db_session) == [(182, "bellossom")]
+
+    # Gloom now also evolves straight from the root; only chain 18 is rewritten
+    CHANGED = {"id": 18, "chain": _link(43, "oddish", [_link(44, "gloom")])}
+    chains = {18: flatten_evolution_chain(CHANGED)}
+    assert load_evolution_chains(chains, session=db_session)["evolution_chains"] == 1
+    assert db_session.query(EvolutionEdge).count() == 1
+    assert db_session.query(EvolutionClosure).count() == 3
+
+
+def test_load_transformed_batch_writes_the_chain_once_per_family(db_session):
+    records = [
+        transform_pokemon_data(
+            {
+                "pokemon": {"id": species_id, "name": name, "types": [], "abilities": [], "stats": []},
+                "species": {"id": species_id, "name": name},
+                "evolution_chain": CHAIN,
+            }
+        )
+        for species_id, name in ((43, "oddish"), (44, "gloom"))
+    ]
+
+    assert records[0]["species_id"] == 43
+    assert records[0]["evolution_chain_id"] == 18
+    assert load_transformed_batch(records, session=db_session) == [43, 44]
+    assert db_session.query(EvolutionEdge).count() == 3
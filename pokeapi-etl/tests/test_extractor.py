@@ -1,11 +1,16 @@
 import pytest
+import requests
 from unittest.mock import patch
 
 from etl.extract.extractor import (
     fetch_data,
+    get_rate_limiter,
     fetch_pokemon_data,
     fetch_species_data,
     fetch_evolution_chain,
+    extract_pokemon_range,
+    iter_pokemon_ids,
+    last_fetch_error,
 )
 
 from utils.config import Config
@@ -15,12 +20,38 @@ from utils.config import Config
 def test_fetch_data_success(mock_session):
     mock_response = mock_session.return_value.get.return_value
     mock_response.status_code = 200
-    mock_response.json.return_value = {"id": 1, "name": "bulbasaur"}
+    mock_response.content = b'{"id": 1, "name": "bulbasaur", "moves": [{"move": {}}]}'
 
     result = fetch_data("https://pokeapi.co/api/v2/pokemon/1")
     assert result == {"id": 1, "name": "bulbasaur"}
 
 
+@patch("etl.extract.extractor.requests.Session")
+def test_fetch_data_reuses_one_session(mock_session):
+    mock_session.return_value.get.return_value.content = b'{"id": 1}'
+
+    fetch_data("https://pokeapi.co/api/v2/pokemon/1")
+    fetch_data("https://pokeapi.co/api/v2/pokemon/2")
+
+    assert mock_session.call_count == 1
+    assert mock_session.return_value.get.call_count == 2
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_fetch_data_feeds_throttling_back_to_the_rate_limiter(mock_session):
+    mock_response = mock_session.return_value.get.return_value
+    mock_response.status_code = 429
+    mock_response.headers = {"Retry-After": "0"}
+    mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        response=mock_response
+    )
+    rate_before = get_rate_limiter().current_rate
+
+    assert fetch_data("https://pokeapi.co/api/v2/pokemon/1") is None
+    assert get_rate_limiter().current_rate < rate_before
+    assert get_rate_limiter().stats()["throttled"] == 1
+
+
 @pytest.fixture
 def mock_fetch_data(mocker):
     """Fixture to mock the internal fetch_data call within extractor."""
@@ -59,3 +90,57 @@ def test_fetch_evolution_chain_calls_fetch_data(mock_fetch_data):
 
     mock_fetch_data.assert_called_once_with(evolution_url)
     assert result == {"id": 1, "chain": {}}
+
+
+def _fake_fetch(url):
+    """Serves deterministic pokemon/species/chain payloads keyed by URL."""
+    if "/pokemon/" in url:
+        pokemon_id = int(url.rstrip("/").split("/")[-1])
+        if pokemon_id == 3:
+            return None
+        return {
+            "id": pokemon_id,
+            "species": {"url": f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_id}/"},
+        }
+    if "/pokemon-species/" in url:
+        return {"evolution_chain": {"url": "https://pokeapi.co/api/v2/evolution-chain/1/"}}
+    return {"id": 1, "chain": {}}
+
+
+def test_extract_pokemon_range_concurrent_matches_serial(mocker):
+    mocker.patch("etl.extract.extractor.fetch_data", side_effect=_fake_fetch)
+
+    serial = extract_pokemon_range(1, 8, workers=1)
+    concurrent = extract_pokemon_range(1, 8, workers=4)
+
+    assert concurrent == serial
+    assert [entry["pokemon"]["id"] for entry in concurrent] == [1, 2, 4, 5, 6, 7, 8]
+
+
+def test_extract_pokemon_range_fetches_shared_chain_once(mocker):
+    mock_fetch = mocker.patch("etl.extract.extractor.fetch_data", side_effect=_fake_fetch)
+
+    extract_pokemon_range(1, 8, workers=4)
+
+    chain_calls = [
+        call for call in mock_fetch.call_args_list if "evolution-chain" in call.args[0]
+    ]
+    assert len(chain_calls) == 1
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_failed_fetches_are_reported_with_their_error_class(mock_session):
+    mock_session.return_value.get.side_effect = requests.exceptions.Timeout()
+    failures = []
+
+    assert list(iter_pokemon_ids([7], workers=1, failures=failures)) == []
+
+    assert last_fetch_error() == "timeout"
+    assert failures == [
+        {
+            "pokemon_id": 7,
+            "resource": "pokemon",
+            "url": f"{Config.POKEAPI_BASE_URL}pokemon/7",
+            "error_class": "timeout",
+        }
+    ]
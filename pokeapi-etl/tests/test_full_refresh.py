@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+from etl.load.full_refresh import POKEMON_TABLES, CsvRowStream, _refresh, full_refresh_load
+
+
+def test_csv_row_stream_renders_copy_input():
+    rows = [
+        {"pokemon_id": 1, "name": "mr. mime, jr", "base_experience": None, "is_default": True},
+        {"pokemon_id": 2, "name": "ivysaur", "base_experience": 142, "is_default": False},
+    ]
+    stream = CsvRowStream(rows, ["pokemon_id", "name", "base_experience", "is_default"])
+
+    chunks = []
+    while True:
+        chunk = stream.read(7)
+        if not chunk:
+            break
+        chunks.append(chunk)
+
+    assert "".join(chunks) == '1,"mr. mime, jr",,t\n2,ivysaur,142,f\n'
+
+
+def test_full_refresh_requires_postgres(test_engine):
+    with pytest.raises(NotImplementedError):
+        full_refresh_load([], engine=test_engine)
+
+
+class _RecordingCursor:
+    """DB-API cursor stand-in recording statements; catalog queries return no rows"""
+
+    def __init__(self):
+        self.statements = []
+        self.copied = {}
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def fetchall(self):
+        return []
+
+    def copy_expert(self, statement, source):
+        self.copied[statement.split()[1]] = source.read()
+
+    def close(self):
+        pass
+
+
+def test_refresh_swaps_content_hashes_with_the_pokemon_tables(mocker):
+    cursor = _RecordingCursor()
+    engine = mocker.Mock()
+    engine.raw_connection.return_value.cursor.return_value = cursor
+    sources = {table: io.StringIO("") for table in POKEMON_TABLES}
+
+    loaded = _refresh(engine, sources, dict.fromkeys(POKEMON_TABLES, 0), {25: "abc", 1: "def"})
+
+    assert loaded == [25, 1]
+    assert cursor.copied["pokemon_content_hashes_staging"] == "1,def\n25,abc\n"
+    lock = next(s for s in cursor.statements if s.startswith("LOCK TABLE"))
+    assert "pokemon_content_hashes" in lock
+    swap = cursor.statements[cursor.statements.index(lock):]
+    assert "DROP TABLE pokemon_content_hashes" in swap
+    assert "ALTER TABLE pokemon_content_hashes_staging RENAME TO pokemon_content_hashes" in swap
+    assert engine.raw_connection.return_value.commit.call_count == 2
@@ -0,0 +1,62 @@
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from utils.helpers import AdaptiveRateLimiter, retry_after_seconds
+
+
+def _request(limiter, status=200, latency=0.01, retry_after=None):
+    limiter.acquire()
+    limiter.release(latency, status, retry_after)
+
+
+def test_limiter_ramps_up_additively_on_success():
+    limiter = AdaptiveRateLimiter(50, max_rate=100, concurrency=2, max_concurrency=4)
+    for _ in range(4):
+        _request(limiter)
+
+    assert 50 < limiter.current_rate < 51
+    assert limiter.concurrency == 3
+
+
+def test_limiter_backs_off_multiplicatively_once_per_cooldown():
+    limiter = AdaptiveRateLimiter(80, min_rate=30, concurrency=8, cooldown=60)
+    _request(limiter, status=429)
+    _request(limiter, status=503)
+
+    assert limiter.current_rate == 40
+    assert limiter.concurrency == 4
+    assert limiter.stats()["throttled"] == 2
+
+    limiter._decreased_at = float("-inf")
+    _request(limiter, status=None)  # request failed outright
+    assert limiter.current_rate == 30
+
+
+def test_limiter_backs_off_on_latency_and_holds_fixed_when_not_adaptive():
+    limiter = AdaptiveRateLimiter(50, latency_target=0.5, concurrency=4)
+    _request(limiter, latency=2.0)
+    assert limiter.current_rate == 25
+
+    fixed = AdaptiveRateLimiter(50, concurrency=4, adaptive=False)
+    _request(fixed)
+    _request(fixed, status=429)
+    assert fixed.current_rate == 50
+    assert fixed.concurrency == 4
+
+
+def test_limiter_pauses_every_caller_for_retry_after():
+    limiter = AdaptiveRateLimiter(None, concurrency=4)
+    limiter.throttle(retry_after=0.2)
+
+    started = time.monotonic()
+    _request(limiter)
+    assert time.monotonic() - started >= 0.19
+
+
+def test_retry_after_seconds_parses_both_forms():
+    assert retry_after_seconds("120") == 120
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < retry_after_seconds(format_datetime(later, usegmt=True)) <= 30
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
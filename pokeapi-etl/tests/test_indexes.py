@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine, inspect
+
+from data_models.models import Base
+from etl.load.indexes import (
+    analyze_tables,
+    deferred_indexes,
+    ensure_indexes,
+    secondary_indexes,
+)
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_secondary_indexes_leave_unique_keys_alone():
+    names = {index.name for index in secondary_indexes()}
+    assert "ix_pokemon_types_type_id" in names
+    assert "ix_pokemon_stats_stat_name_base_stat" in names
+    assert "uq_pokemon_stats_pokemon_stat" not in names
+
+
+def test_ensure_indexes_builds_indexes_missing_from_existing_tables():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_pokemon_name")
+
+    assert ensure_indexes(engine) == ["ix_pokemon_name"]
+    assert "ix_pokemon_name" in _index_names(engine, "pokemon")
+    assert ensure_indexes(engine) == []
+
+
+def test_deferred_indexes_drop_during_load_and_rebuild_after():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+
+    with deferred_indexes(engine) as dropped:
+        assert "ix_pokemon_stats_stat_name_base_stat" in dropped
+        assert _index_names(engine, "pokemon_stats") == {"uq_pokemon_stats_pokemon_stat"}
+
+    assert _index_names(engine, "pokemon_stats") == {
+        "uq_pokemon_stats_pokemon_stat",
+        "ix_pokemon_stats_stat_name_base_stat",
+    }
+    analyze_tables(engine)
+    with engine.connect() as connection:
+        stats_tables = connection.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).scalar()
+    assert stats_tables == 1
@@ -1,6 +1,10 @@
 import pytest
-from etl.load.loader import load_transformed_data
-from data_models.models import Pokemon
+from collections import Counter
+
+from utils import database
+from etl.load.loader import load_transformed_data, load_transformed_batch, load_transformation, type_ids_cache
+from data_models.models import Pokemon, Type, PokemonType, PokemonStat
+from utils.metrics import metrics
 
 
 def test_load_transformed_data(db_session):
@@ -23,3 +27,93 @@ def test_load_transformed_data(db_session):
 
     pokemon = db_session.query(Pokemon).filter_by(pokemon_id=999).first()
     assert pokemon.name == "testmon"
+
+
+def _record(pokemon_id, name="testmon", type_name="grass"):
+    return {
+        "pokemon": {
+            "pokemon_id": pokemon_id,
+            "name": name,
+            "height": 1,
+            "weight": 1,
+            "base_experience": 1,
+            "is_default": True,
+        },
+        "types": [{"type_name": type_name}],
+        "abilities": [{"ability_name": "overgrow"}],
+        "stats": [{"stat_name": "hp", "base_stat": 45, "effort": 0}],
+    }
+
+
+def test_load_transformed_batch_upserts_records(db_session):
+    first_batch = [_record(1), _record(2, type_name="poison")]
+    assert load_transformed_batch(first_batch, session=db_session) == [1, 2]
+    assert load_transformed_batch([_record(1, name="renamed")], session=db_session) == [1]
+
+    assert db_session.query(Pokemon).count() == 2
+    assert db_session.get(Pokemon, 1).name == "renamed"
+    assert db_session.query(Type).count() == 2
+    assert db_session.query(PokemonType).count() == 2
+    assert db_session.query(PokemonStat).count() == 2
+
+
+def test_reloading_does_not_duplicate_stats(db_session):
+    for _ in range(2):
+        assert load_transformed_data(_record(1), session=db_session) is True
+        assert load_transformed_batch([_record(2)], session=db_session, skip_unchanged=False)
+
+    assert db_session.query(PokemonStat).count() == 2
+
+
+def test_load_transformation_goes_through_the_batch_loader(db_session, mocker):
+    mocker.patch.object(database, "create_database_session", return_value=db_session)
+
+    assert load_transformation(_record(1)) is True
+    assert load_transformation(_record(1, name="renamed")) is True
+    assert load_transformation({"pokemon": None}) is False
+
+    assert db_session.get(Pokemon, 1).name == "renamed"
+    assert db_session.query(PokemonStat).count() == 1
+
+
+def test_load_transformed_batch_isolates_bad_record(db_session):
+    bad_record = _record(3, name=None)
+
+    loaded = load_transformed_batch([_record(1), bad_record, _record(2)], session=db_session)
+
+    assert loaded == [1, 2]
+    assert db_session.query(Pokemon).count() == 2
+
+
+def test_dimension_cache_serves_known_names_without_inserts(db_session):
+    load_transformed_batch([_record(1)], session=db_session)
+
+    type_ids, new_ids = type_ids_cache.resolve(db_session, ["grass"])
+
+    assert new_ids == {}
+    assert type_ids == {"grass": db_session.query(Type).filter_by(type_name="grass").one().type_id}
+
+
+def test_load_transformed_batch_skips_unchanged_records(db_session):
+    stats = Counter()
+    load_transformed_batch([_record(1), _record(2)], session=db_session, stats=stats)
+    loaded = load_transformed_batch(
+        [_record(1), _record(2, name="changed"), _record(3)], session=db_session, stats=stats
+    )
+
+    assert sorted(loaded) == [1, 2, 3]
+    assert stats == Counter(inserted=3, updated=1, unchanged=1)
+    assert db_session.get(Pokemon, 2).name == "changed"
+
+
+def test_load_transformed_batch_records_metrics(db_session):
+    before = metrics.snapshot()
+
+    load_transformed_batch([_record(1), _record(3, name=None), _record(2)], session=db_session)
+
+    summary = metrics.summary(since=before)
+    rows = {e["labels"]["table"]: e["value"] for e in summary["etl_rows_written_total"]}
+    outcomes = {e["labels"]["outcome"]: e["value"] for e in summary["etl_records_loaded_total"]}
+    assert rows["pokemon"] == 2 and rows["pokemon_stats"] == 2
+    assert outcomes == {"inserted": 2, "failed": 1}
+    assert any(e["labels"]["verb"] == "INSERT" for e in summary["etl_db_round_trips_total"])
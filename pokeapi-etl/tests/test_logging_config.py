@@ -0,0 +1,67 @@
+import logging
+from logging.handlers import QueueHandler
+
+from utils import logging_config
+from utils.config import Config
+from utils.logging_config import SampledLogger, report_sampled_logs, setup_logging
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _collecting_logger(name):
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [_Collect()]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger, logger.handlers[0]
+
+
+def test_loggers_share_one_queue_handler():
+    first = setup_logging("tests.logging.first")
+    second = setup_logging("tests.logging.second")
+
+    assert first.handlers == second.handlers
+    assert len(first.handlers) == 1
+    assert isinstance(first.handlers[0], QueueHandler)
+    assert logging_config._listener is not None
+
+
+def test_logging_set_up_again_after_shutdown_still_writes():
+    setup_logging("tests.logging.restart")
+    logging_config.shutdown_logging()
+
+    logger = setup_logging("tests.logging.restart")
+    logger.info("written after a restart")
+    logging_config.shutdown_logging()
+    setup_logging("tests.logging.restart")
+
+    with open(Config.LOG_FILE, encoding="utf-8") as handle:
+        assert "written after a restart" in handle.read()
+
+
+def test_sampled_logger_keeps_first_and_every_nth_message():
+    logger, collected = _collecting_logger("tests.logging.sampled")
+    sampled = SampledLogger(logger, every=10)
+    for pokemon_id in range(1, 26):
+        sampled.info("extracting", "Extracting data for Pokémon ID: %s", pokemon_id)
+    sampled.debug("below-level", "never formatted %s", object())
+
+    assert collected.messages == [
+        "Extracting data for Pokémon ID: 1",
+        "Extracting data for Pokémon ID: 10 [10 so far, 1 in 10 logged]",
+        "Extracting data for Pokémon ID: 20 [20 so far, 1 in 10 logged]",
+    ]
+
+    report_logger, report = _collecting_logger("tests.logging.report")
+    report_sampled_logs(report_logger)
+    assert "tests.logging.sampled: 25 'extracting' messages, 22 not logged (sampled 1 in 10)." in (
+        report.messages
+    )
+    assert sampled.take_counts() == {}
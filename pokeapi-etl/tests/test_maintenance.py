@@ -0,0 +1,32 @@
+from sqlalchemy import create_engine, inspect, insert, select
+
+from data_models.models import Base, Pokemon, PokemonStat
+from etl.load.maintenance import compact_pokemon_stats, ensure_pokemon_stats_key
+
+
+def test_compaction_dedupes_legacy_stats_and_adds_key():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX uq_pokemon_stats_pokemon_stat")
+        connection.execute(insert(Pokemon).values(pokemon_id=1, name="bulbasaur"))
+        for base_stat in (40, 45):
+            connection.execute(
+                insert(PokemonStat).values(pokemon_id=1, stat_name="hp", base_stat=base_stat)
+            )
+        connection.execute(
+            insert(PokemonStat).values(pokemon_id=1, stat_name="speed", base_stat=45)
+        )
+
+    assert ensure_pokemon_stats_key(engine) is True
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(PokemonStat.stat_name, PokemonStat.base_stat).order_by(PokemonStat.stat_name)
+        ).all()
+    assert rows == [("hp", 45), ("speed", 45)]
+    assert "uq_pokemon_stats_pokemon_stat" in {
+        index["name"] for index in inspect(engine).get_indexes("pokemon_stats")
+    }
+    assert compact_pokemon_stats(engine) == 0
+    assert ensure_pokemon_stats_key(engine) is False
@@ -0,0 +1,65 @@
+import json
+
+import requests
+
+from utils.metrics import MetricsRegistry, metrics, start_metrics_server, write_prometheus_file
+
+DEFINITIONS = {
+    "jobs_total": ("counter", "Jobs processed", None),
+    "depth": ("gauge", "Queue depth", None),
+    "job_seconds": ("histogram", "Job latency", (0.1, 1)),
+}
+
+
+def test_prometheus_text_format(tmp_path):
+    registry = MetricsRegistry(DEFINITIONS)
+    registry.inc("jobs_total", 2, kind="pokemon")
+    registry.set_gauge("depth", 3, queue='raw "q"')
+    registry.observe("job_seconds", 0.05)
+    registry.observe("job_seconds", 5)
+
+    text = registry.to_prometheus()
+
+    assert "# TYPE jobs_total counter\njobs_total{kind=\"pokemon\"} 2\n" in text
+    assert 'depth{queue="raw \\"q\\""} 3' in text
+    assert 'job_seconds_bucket{le="0.1"} 1' in text
+    assert 'job_seconds_bucket{le="1"} 1' in text
+    assert 'job_seconds_bucket{le="+Inf"} 2' in text
+    assert "job_seconds_count 2" in text
+
+    path = tmp_path / "etl.prom"
+    write_prometheus_file(str(path), registry)
+    assert path.read_text() == text
+
+
+def test_summary_reports_only_changes_since_snapshot():
+    registry = MetricsRegistry(DEFINITIONS)
+    registry.inc("jobs_total", 5)
+    registry.observe("job_seconds", 0.5)
+    before = registry.snapshot()
+
+    registry.inc("jobs_total", 2)
+    for _ in range(4):
+        registry.observe("job_seconds", 0.05)
+
+    summary = registry.summary(since=before)
+
+    assert summary["jobs_total"] == [{"labels": {}, "value": 2}]
+    latency = summary["job_seconds"][0]["value"]
+    assert latency["count"] == 4
+    assert 0 < latency["p50"] <= 0.1
+    json.dumps(summary)
+
+
+def test_metrics_endpoint_serves_process_registry():
+    metrics.inc("etl_http_retries_total")
+    server = start_metrics_server(0, host="127.0.0.1")
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        response = requests.get(f"{base_url}/metrics")
+        assert response.status_code == 200
+        assert "# TYPE etl_http_retries_total counter" in response.text
+        assert requests.get(f"{base_url}/other").status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,175 @@
+import pytest
+
+from etl import orchestrate
+
+
+def _raw(pokemon_id):
+    return {
+        "pokemon": {
+            "id": pokemon_id,
+            "name": f"mon-{pokemon_id}",
+            "types": [{"type": {"name": "grass"}}],
+            "abilities": [],
+            "stats": [],
+        },
+        "species": None,
+        "evolution_chain": None,
+    }
+
+
+@pytest.fixture
+def pipeline_mocks(mocker):
+    raw_records = [_raw(pokemon_id) for pokemon_id in range(1, 6)]
+    mocker.patch.object(orchestrate, "create_tables")
+    mocker.patch.object(orchestrate, "preload_dimension_caches")
+    mocker.patch.object(orchestrate, "ensure_pokemon_stats_key")
+    mocker.patch.object(orchestrate, "ensure_indexes")
+    mocker.patch.object(orchestrate, "analyze_tables")
+    mocker.patch.object(orchestrate, "record_dead_letters")
+    mocker.patch.object(orchestrate, "resolve_dead_letters")
+    mocker.patch.object(
+        orchestrate,
+        "iter_pokemon_ids",
+        side_effect=lambda ids, **k: iter([r for r in raw_records if r["pokemon"]["id"] in ids]),
+    )
+    mocker.patch.object(orchestrate, "start_run", return_value=1)
+    mocker.patch.object(orchestrate, "finish_run")
+    mocker.patch.object(orchestrate, "CheckpointWriter")
+    return mocker.patch.object(
+        orchestrate,
+        "load_transformed_batch",
+        side_effect=lambda batch, **kwargs: [record["pokemon"]["pokemon_id"] for record in batch],
+    )
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_run_etl_pipeline_loads_every_record(pipeline_mocks, streaming):
+    assert orchestrate.run_etl_pipeline(1, 5, streaming=streaming, batch_size=2) is True
+
+    loaded_ids = [
+        record["pokemon"]["pokemon_id"]
+        for call in pipeline_mocks.call_args_list
+        for record in call.args[0]
+    ]
+    assert loaded_ids == [1, 2, 3, 4, 5]
+    assert all(len(call.args[0]) <= 2 for call in pipeline_mocks.call_args_list)
+
+
+def test_streaming_load_failure_stops_and_joins_the_producers(pipeline_mocks, mocker):
+    pipeline_mocks.side_effect = RuntimeError("database went away")
+    mocker.patch.object(
+        orchestrate, "iter_pokemon_ids", side_effect=lambda ids, **k: (_raw(i) for i in range(1, 500))
+    )
+    run = orchestrate.PipelineRun(1, batch_size=1)
+
+    with pytest.raises(RuntimeError):
+        orchestrate._run_streaming(list(range(1, 500)), run, queue_size=1)
+
+    assert not [t for t in orchestrate.threading.enumerate() if t.name in ("etl-extract", "etl-transform")]
+
+
+def test_run_etl_pipeline_resume_loads_only_pending_ids(pipeline_mocks, mocker):
+    mocker.patch.object(orchestrate, "find_resumable_run", return_value=(7, 1, 5))
+    mocker.patch.object(orchestrate, "pending_ids", return_value=[4, 5])
+
+    assert orchestrate.run_etl_pipeline(resume=True) is True
+
+    loaded_ids = [
+        record["pokemon"]["pokemon_id"]
+        for call in pipeline_mocks.call_args_list
+        for record in call.args[0]
+    ]
+    assert loaded_ids == [4, 5]
+    orchestrate.finish_run.assert_called_once_with(7, "completed")
+
+
+def test_run_etl_pipeline_discovers_only_new_ids(pipeline_mocks, mocker):
+    discover = mocker.patch.object(orchestrate, "discover_pokemon_ids", return_value=[2, 3, 5])
+    mocker.patch.object(orchestrate, "existing_pokemon_ids", return_value={3})
+
+    assert orchestrate.run_etl_pipeline(1, None, discover=True, only_new=True) is True
+
+    assert discover.call_args.kwargs["end_id"] is None
+    orchestrate.start_run.assert_called_once_with(2, 5)
+    loaded_ids = [
+        record["pokemon"]["pokemon_id"]
+        for call in pipeline_mocks.call_args_list
+        for record in call.args[0]
+    ]
+    assert loaded_ids == [2, 5]
+
+
+def test_run_etl_pipeline_defers_indexes_for_large_runs(pipeline_mocks, mocker):
+    deferred = mocker.patch.object(orchestrate, "deferred_indexes")
+    mocker.patch.object(orchestrate.Config, "INDEX_DEFER_MIN_IDS", 5)
+
+    assert orchestrate.run_etl_pipeline(1, 4) is True
+    deferred.assert_not_called()
+
+    assert orchestrate.run_etl_pipeline(1, 5) is True
+    deferred.assert_called_once_with()
+    assert deferred.return_value.__exit__.called
+
+
+def test_run_etl_pipeline_retries_failed_fetches_at_the_end(pipeline_mocks, mocker):
+    attempts = []
+
+    def flaky_extract(ids, failures=None, **kwargs):
+        ids = list(ids)
+        attempts.append(list(ids))
+        if len(attempts) == 1:
+            failures.append(
+                {"pokemon_id": 3, "resource": "pokemon", "url": "u", "error_class": "timeout"}
+            )
+            ids.remove(3)
+        return iter([_raw(pokemon_id) for pokemon_id in ids])
+
+    mocker.patch.object(orchestrate, "iter_pokemon_ids", side_effect=flaky_extract)
+    sleep = mocker.patch.object(orchestrate.time, "sleep")
+
+    assert orchestrate.run_etl_pipeline(1, 5) is True
+
+    assert attempts == [[1, 2, 3, 4, 5], [3]]
+    orchestrate.finish_run.assert_called_once_with(1, "completed")
+    first_failures = orchestrate.record_dead_letters.call_args_list[0].args[0]
+    assert [failure["pokemon_id"] for failure in first_failures] == [3]
+    orchestrate.resolve_dead_letters.assert_called_once_with({1, 2, 3, 4, 5})
+    sleep.assert_called_once_with(orchestrate.Config.DEAD_LETTER_RETRY_DELAYS[0])
+
+
+def test_run_etl_pipeline_does_not_wait_to_retry_permanent_failures(pipeline_mocks, mocker):
+    attempts = []
+
+    def extract_with_a_404(ids, failures=None, **kwargs):
+        ids = list(ids)
+        attempts.append(list(ids))
+        if 3 in ids:
+            failures.append(
+                {"pokemon_id": 3, "resource": "pokemon", "url": "u", "error_class": "http_404"}
+            )
+            ids.remove(3)
+        return iter([_raw(pokemon_id) for pokemon_id in ids])
+
+    mocker.patch.object(orchestrate, "iter_pokemon_ids", side_effect=extract_with_a_404)
+    sleep = mocker.patch.object(orchestrate.time, "sleep")
+
+    assert orchestrate.run_etl_pipeline(1, 5) is True
+
+    assert attempts == [[1, 2, 3, 4, 5]]
+    sleep.assert_not_called()
+    orchestrate.resolve_dead_letters.assert_called_once_with({1, 2, 4, 5})
+
+
+def test_run_worker_processes_claimed_shards(mocker):
+    mocker.patch.object(orchestrate, "create_tables")
+    mocker.patch.object(orchestrate, "claim_work_item", side_effect=[(1, 1, 50), (2, 51, 60), None])
+    mocker.patch.object(orchestrate, "LeaseHeartbeat")
+    complete = mocker.patch.object(orchestrate, "complete_work_item")
+    pipeline = mocker.patch.object(orchestrate, "run_etl_pipeline", side_effect=[True, False])
+
+    assert orchestrate.run_worker("worker-a", batch_size=10) == 2
+
+    pipeline.assert_any_call(start_id=51, end_id=60, batch_size=10, defer_indexes=False)
+    complete.assert_has_calls(
+        [mocker.call(1, "worker-a", True), mocker.call(2, "worker-a", False)]
+    )
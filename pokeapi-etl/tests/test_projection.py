@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from etl.extract import projection
+from etl.extract.projection import decode_payload
+
+POKEMON = {
+    "id": 25,
+    "name": "pikachu",
+    "height": 4,
+    "weight": 60,
+    "base_experience": 112,
+    "types": [{"slot": 1, "type": {"name": "electric", "url": "https://pokeapi.co/api/v2/type/13/"}}],
+    "abilities": [{"slot": 1, "is_hidden": False, "ability": {"name": "static", "url": "u"}}],
+    "stats": [{"base_stat": 35, "effort": 0, "stat": {"name": "hp", "url": "u"}}],
+    "species": {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon-species/25/"},
+    "moves": [{"move": {"name": "thunder-shock"}, "version_group_details": [{"level_learned_at": 1}]}],
+    "sprites": {"front_default": "https://example.com/25.png"},
+    "game_indices": [{"game_index": 84}],
+}
+
+EXPECTED = {
+    "id": 25,
+    "name": "pikachu",
+    "height": 4,
+    "weight": 60,
+    "base_experience": 112,
+    "types": [{"slot": 1, "type": {"name": "electric"}}],
+    "abilities": [{"slot": 1, "is_hidden": False, "ability": {"name": "static"}}],
+    "stats": [{"base_stat": 35, "effort": 0, "stat": {"name": "hp"}}],
+    "species": {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon-species/25/"},
+}
+
+
+@pytest.fixture(params=["msgspec", "json"])
+def decoder_backend(request, monkeypatch):
+    if request.param == "msgspec":
+        if projection.msgspec is None:
+            pytest.skip("msgspec is not installed")
+    else:
+        monkeypatch.setattr(projection, "_decoders", {})
+    return request.param
+
+
+def test_decode_payload_keeps_only_projected_fields(decoder_backend):
+    result = decode_payload(json.dumps(POKEMON).encode(), "pokemon")
+
+    # Absent fields stay absent, so transformer defaults such as is_default=False still apply
+    assert result == EXPECTED
+
+
+def test_decode_payload_handles_nulls_and_unprojected_endpoints(decoder_backend):
+    assert decode_payload(b'{"id": 1, "species": null}', "pokemon") == {"id": 1, "species": None}
+    assert decode_payload(b"null", "pokemon") is None
+
+    chain = {"id": 1, "chain": {"species": {"name": "pichu"}, "evolves_to": []}}
+    assert decode_payload(json.dumps(chain).encode(), "evolution-chain") == chain
+
+
+def test_decode_payload_rejects_invalid_json(decoder_backend):
+    with pytest.raises(ValueError):
+        decode_payload(b'{"id": 1', "pokemon")
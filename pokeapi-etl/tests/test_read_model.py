@@ -0,0 +1,57 @@
+from etl.load.loader import load_transformed_batch
+from etl.load.read_model import rebuild_pokemon_summary, refresh_pokemon_summary
+from data_models.models import Pokemon, PokemonSummary
+
+
+def _record(pokemon_id, types=("grass", "poison"), hp=45, speed=45):
+    return {
+        "pokemon": {
+            "pokemon_id": pokemon_id,
+            "name": f"mon-{pokemon_id}",
+            "height": 7,
+            "weight": 69,
+            "base_experience": 64,
+            "is_default": True,
+        },
+        "types": [{"type_name": type_name} for type_name in types],
+        "abilities": [{"ability_name": "overgrow"}, {"ability_name": "chlorophyll"}],
+        "stats": [
+            {"stat_name": "hp", "base_stat": hp, "effort": 0},
+            {"stat_name": "speed", "base_stat": speed, "effort": 0},
+        ],
+    }
+
+
+def test_load_maintains_one_summary_row_per_pokemon(db_session):
+    load_transformed_batch([_record(1), _record(2, types=("fire",))], session=db_session)
+
+    summary = db_session.get(PokemonSummary, 1)
+    assert summary.name == "mon-1"
+    assert summary.type_names == ["grass", "poison"]
+    assert summary.ability_names == ["chlorophyll", "overgrow"]
+    assert (summary.hp, summary.speed, summary.attack) == (45, 45, None)
+    assert summary.stat_total == 90
+    assert db_session.get(PokemonSummary, 2).type_names == ["fire"]
+
+
+def test_only_touched_rows_are_refreshed(db_session):
+    load_transformed_batch([_record(1), _record(2)], session=db_session)
+    db_session.get(PokemonSummary, 2).name = "stale"
+    db_session.commit()
+
+    load_transformed_batch([_record(1), _record(2), _record(1, hp=60)], session=db_session)
+
+    assert db_session.get(PokemonSummary, 1).hp == 60
+    assert db_session.get(PokemonSummary, 2).name == "stale"  # unchanged, not rewritten
+
+    assert refresh_pokemon_summary(db_session, [2]) == 1
+    assert db_session.get(PokemonSummary, 2).name == "mon-2"
+
+
+def test_rebuild_drops_rows_of_removed_pokemon(db_session):
+    load_transformed_batch([_record(1), _record(2)], session=db_session)
+    db_session.add(PokemonSummary(pokemon_id=99, name="gone", type_names=[], ability_names=[]))
+    db_session.commit()
+
+    assert rebuild_pokemon_summary(session=db_session) == 2
+    assert db_session.query(PokemonSummary).count() == db_session.query(Pokemon).count()
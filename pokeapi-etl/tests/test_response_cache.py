@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from etl.extract.extractor import fetch_data, configure_response_cache
+from etl.extract.response_cache import ResponseCache
+
+URL = "https://pokeapi.co/api/v2/pokemon/1"
+
+
+def test_response_cache_round_trip(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(URL, {"id": 1}, {"ETag": '"abc"'})
+
+    entry = cache.get(URL)
+    assert entry["body"] == {"id": 1}
+    assert cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"abc"'}
+    assert cache.get("https://pokeapi.co/api/v2/pokemon/2") is None
+
+
+def test_response_cache_evicts_oldest_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=400)
+    for pokemon_id in range(10):
+        cache.put(f"{URL}{pokemon_id}", {"id": pokemon_id, "name": "x" * 50})
+
+    assert cache.stats()["bytes"] <= 400
+    assert cache.get(f"{URL}9") is not None
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_fetch_data_serves_warm_cache_without_network(mock_session, tmp_path):
+    mock_response = mock_session.return_value.get.return_value
+    mock_response.status_code = 200
+    mock_response.headers = {"ETag": '"v1"'}
+    mock_response.content = b'{"id": 1, "name": "bulbasaur"}'
+
+    configure_response_cache("on", cache_dir=str(tmp_path))
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+    assert mock_session.return_value.get.call_count == 1
+
+    # Without a payload archive the entry only holds the decoded body
+    assert configure_response_cache("on", cache_dir=str(tmp_path)).get(URL)["raw"] is None
+
+    configure_response_cache("offline", cache_dir=str(tmp_path))
+    assert fetch_data(URL) == {"id": 1, "name": "bulbasaur"}
+    assert fetch_data("https://pokeapi.co/api/v2/pokemon/2") is None
+    assert mock_session.return_value.get.call_count == 1
+
+
+@patch("etl.extract.extractor.requests.Session")
+def test_fetch_data_revalidates_stale_entry(mock_session, tmp_path):
+    cache = configure_response_cache("on", cache_dir=str(tmp_path))
+    cache.ttl = 0
+    cache.put(URL, {"id": 1}, {"ETag": '"v1"'})
+
+    mock_response = mock_session.return_value.get.return_value
+    mock_response.status_code = 304
+    mock_response.headers = {}
+
+    assert fetch_data(URL) == {"id": 1}
+    _, kwargs = mock_session.return_value.get.call_args
+    assert kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert cache.stats()["revalidated"] == 1
@@ -0,0 +1,26 @@
+from etl.run_state import (
+    CheckpointWriter,
+    find_resumable_run,
+    finish_run,
+    pending_ids,
+    start_run,
+)
+from data_models.models import EtlCheckpoint
+
+
+def test_checkpoints_drive_resume(db_session):
+    run_id = start_run(1, 6, session=db_session)
+    checkpoints = CheckpointWriter(run_id, flush_every=3, session=db_session)
+
+    checkpoints.record([1, 2], "loaded")
+    assert db_session.query(EtlCheckpoint).count() == 0
+    checkpoints.record([3], "failed")
+    assert db_session.query(EtlCheckpoint).count() == 3
+    checkpoints.record([3, 4], "loaded")
+    checkpoints.flush()
+
+    assert find_resumable_run(session=db_session) == (run_id, 1, 6)
+    assert pending_ids(run_id, 1, 6, session=db_session) == [5, 6]
+
+    finish_run(run_id, "completed", session=db_session)
+    assert find_resumable_run(session=db_session) is None
@@ -0,0 +1,104 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from etl import service
+from etl.service import EtlService, JobQueue, parse_id_range
+
+
+def test_overlapping_and_adjacent_range_triggers_coalesce():
+    queue = JobQueue()
+    first, coalesced = queue.submit(1, 50)
+    assert coalesced is False
+    second, _ = queue.submit(100, 150)
+
+    widened, coalesced = queue.submit(40, 99)
+
+    assert coalesced is True
+    assert widened["job_id"] == first["job_id"]
+    assert (widened["start_id"], widened["end_id"], widened["triggers"]) == (1, 150, 3)
+    assert queue.get(second["job_id"])["status"] == "merged"
+    assert queue.stats() == {"queued": 1, "running": None}
+
+
+def test_running_job_absorbs_covered_triggers_and_refreshes_supersede():
+    queue = JobQueue()
+    queue.submit(1, 100)
+    running = queue.next_job(timeout=0)
+
+    duplicate, coalesced = queue.submit(10, 20)
+    assert coalesced is True and duplicate["job_id"] == running.job_id
+
+    refresh, _ = queue.submit(1, 151, full_refresh=True)
+    superseding, coalesced = queue.submit(1, 251, full_refresh=True)
+    assert coalesced is True and superseding["job_id"] == refresh["job_id"]
+    assert superseding["end_id"] == 251
+
+    # Range triggers after a queued refresh must not be pulled ahead of it
+    queue.submit(252, 300)
+    assert queue.submit(301, 310)[1] is True
+    assert queue.stats()["queued"] == 2
+
+
+def test_parse_id_range():
+    assert parse_id_range("1-151") == (1, 151)
+    assert parse_id_range(" 20-20 ") == (20, 20)
+    for text in ("151", "0-5", "9-3", "a-b"):
+        with pytest.raises(ValueError):
+            parse_id_range(text)
+
+
+def _request(url, payload=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, method="POST" if data else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def running_service(mocker):
+    def fake_pipeline(start_id, end_id, progress=None, **kwargs):
+        requested = end_id - start_id + 1
+        progress({"run_id": 1, "ids_requested": requested, "loaded": requested})
+        return True
+
+    pipeline = mocker.patch.object(service, "run_etl_pipeline", side_effect=fake_pipeline)
+    etl_service = EtlService(host="127.0.0.1", port=0, workers=2)
+    host, port = etl_service.start()
+    yield f"http://{host}:{port}", pipeline
+    etl_service.stop()
+
+
+def test_trigger_api_runs_jobs_on_the_warm_worker(running_service):
+    base_url, pipeline = running_service
+
+    status, job = _request(f"{base_url}/jobs", {"start_id": 1, "end_id": 10})
+    assert status == 202 and job["coalesced"] is False
+
+    for _ in range(50):
+        status, state = _request(f"{base_url}/jobs/{job['job_id']}")
+        if state["status"] == "succeeded":
+            break
+        time.sleep(0.1)
+    assert state["status"] == "succeeded"
+    assert state["progress"]["percent"] == 100.0
+    assert pipeline.call_args.kwargs["workers"] == 2
+
+    assert _request(f"{base_url}/jobs", {"start_id": 5, "end_id": 1})[0] == 400
+    assert _request(f"{base_url}/jobs/999")[0] == 404
+    assert _request(f"{base_url}/health")[1]["status"] == "ok"
+
+
+def test_frontend_trigger_path_queues_a_job(running_service):
+    base_url, _ = running_service
+
+    status, job = _request(f"{base_url}/trigger-etl", {"start_id": 1, "end_id": 20})
+
+    assert status == 202
+    assert (job["kind"], job["start_id"], job["end_id"]) == ("range", 1, 20)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from etl.work_queue import (
+    claim_work_item,
+    complete_work_item,
+    renew_lease,
+    seed_work_items,
+    seed_work_items_for_ids,
+    work_progress,
+)
+from data_models.models import EtlWorkItem
+
+
+def test_seed_splits_range_into_shards(db_session):
+    assert seed_work_items(1, 25, shard_size=10, session=db_session) == 3
+
+    shards = [(item.start_id, item.end_id) for item in db_session.query(EtlWorkItem)]
+    assert shards == [(1, 10), (11, 20), (21, 25)]
+    assert work_progress(session=db_session) == {"pending": {"items": 3, "ids": 25}}
+
+
+def test_seed_for_ids_skips_gaps_between_discovered_ids(db_session):
+    pokemon_ids = [1, 2, 3, 4, 5, 10001, 10002]
+    assert seed_work_items_for_ids(pokemon_ids, shard_size=3, session=db_session) == 3
+
+    shards = [(item.start_id, item.end_id) for item in db_session.query(EtlWorkItem)]
+    assert shards == [(1, 3), (4, 5), (10001, 10002)]
+
+
+def test_workers_claim_distinct_items_until_drained(db_session):
+    seed_work_items(1, 4, shard_size=2, session=db_session)
+
+    first = claim_work_item("worker-a", session=db_session)
+    second = claim_work_item("worker-b", session=db_session)
+
+    assert first[1:] == (1, 2)
+    assert second[1:] == (3, 4)
+    assert claim_work_item("worker-c", session=db_session) is None
+    assert renew_lease(first[0], "worker-a", session=db_session) is True
+    assert renew_lease(first[0], "worker-b", session=db_session) is False
+
+
+def test_expired_lease_is_reclaimed(db_session):
+    seed_work_items(1, 2, shard_size=2, session=db_session)
+    item_id, _, _ = claim_work_item("worker-a", session=db_session)
+    item = db_session.get(EtlWorkItem, item_id)
+    item.lease_expires_at = datetime.now() - timedelta(seconds=1)
+    db_session.commit()
+
+    assert claim_work_item("worker-b", session=db_session)[0] == item_id
+    # The original worker finishing late must not overwrite the new lease holder
+    complete_work_item(item_id, "worker-a", succeeded=True, session=db_session)
+    assert db_session.get(EtlWorkItem, item_id).status == "claimed"
+
+
+def test_failed_items_are_retried_then_given_up(db_session):
+    seed_work_items(1, 2, shard_size=2, session=db_session)
+
+    item_id, _, _ = claim_work_item("worker-a", session=db_session)
+    complete_work_item(item_id, "worker-a", succeeded=False, max_attempts=2, session=db_session)
+    assert work_progress(session=db_session) == {"pending": {"items": 1, "ids": 2}}
+
+    item_id, _, _ = claim_work_item("worker-a", session=db_session)
+    complete_work_item(item_id, "worker-a", succeeded=False, max_attempts=2, session=db_session)
+    assert work_progress(session=db_session) == {"failed": {"items": 1, "ids": 2}}
+    assert claim_work_item("worker-a", session=db_session) is None
+
+
+def test_repeatedly_abandoned_item_is_given_up_on_reclaim(db_session):
+    seed_work_items(1, 4, shard_size=2, session=db_session)
+
+    for worker_id in ("worker-a", "worker-b"):
+        item_id, _, _ = claim_work_item(worker_id, max_attempts=2, session=db_session)
+        item = db_session.get(EtlWorkItem, item_id)
+        item.lease_expires_at = datetime.now() - timedelta(seconds=1)
+        db_session.commit()
+    assert item.attempts == 2
+
+    # The expired shard has used its attempts, so the next claim moves on to the other one
+    assert claim_work_item("worker-c", max_attempts=2, session=db_session)[1:] == (3, 4)
+    assert db_session.get(EtlWorkItem, item_id).status == "failed"
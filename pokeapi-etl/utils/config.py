@@ -14,10 +14,78 @@ class Config:
 
     # API
     POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2/")
-    REQUEST_DELAY = float(os.getenv("REQUEST_DELAY", 0.1))
     API_RETRIES = int(os.getenv("API_RETRIES", 3))
     API_BACKOFF_FACTOR = float(os.getenv("API_BACKOFF_FACTOR", 0.3))
 
+    # Extraction
+    EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", 1))
+    MAX_REQUESTS_PER_SECOND = float(os.getenv("MAX_REQUESTS_PER_SECOND", 10))  # 0 = unpaced
+
+    # Adaptive rate limiting
+    RATE_LIMIT_ADAPTIVE = os.getenv("RATE_LIMIT_ADAPTIVE", "true").lower() == "true"
+    INITIAL_REQUESTS_PER_SECOND = float(os.getenv("INITIAL_REQUESTS_PER_SECOND", 5))
+    MIN_REQUESTS_PER_SECOND = float(os.getenv("MIN_REQUESTS_PER_SECOND", 0.5))
+    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 16))
+    RATE_LIMIT_LATENCY_TARGET = float(os.getenv("RATE_LIMIT_LATENCY_TARGET", 2.0))  # seconds
+    SHARED_FETCH_CACHE_SIZE = int(os.getenv("SHARED_FETCH_CACHE_SIZE", 256))
+    DISCOVERY_PAGE_SIZE = int(os.getenv("DISCOVERY_PAGE_SIZE", 200))  # IDs per list page
+
+    # Pipeline
+    PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "false").lower() == "true"
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 50))
+
+    # Loading
+    LOAD_BATCH_SIZE = int(os.getenv("LOAD_BATCH_SIZE", 100))
+    CHECKPOINT_BATCH_SIZE = int(os.getenv("CHECKPOINT_BATCH_SIZE", 100))
+    INDEX_DEFER_MIN_IDS = int(os.getenv("INDEX_DEFER_MIN_IDS", 2000))  # 0 never drops indexes
+    INDEX_BUILD_MEMORY = os.getenv("INDEX_BUILD_MEMORY", "256MB")  # maintenance_work_mem
+
+    # Distributed workers
+    WORK_SHARD_SIZE = int(os.getenv("WORK_SHARD_SIZE", 50))  # IDs per work item
+    WORK_LEASE_SECONDS = int(os.getenv("WORK_LEASE_SECONDS", 300))
+    WORK_MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", 3))
+    WORK_POLL_SECONDS = float(os.getenv("WORK_POLL_SECONDS", 5))
+
+    # Dead-letter retries
+    DEAD_LETTER_MAX_ATTEMPTS = int(os.getenv("DEAD_LETTER_MAX_ATTEMPTS", 5))
+    DEAD_LETTER_RETRY_ROUNDS = int(os.getenv("DEAD_LETTER_RETRY_ROUNDS", 2))  # 0 = no end-of-run pass
+    DEAD_LETTER_RETRY_DELAYS = [  # seconds before each round; the last one repeats
+        float(delay) for delay in os.getenv("DEAD_LETTER_RETRY_DELAYS", "5,15").split(",") if delay.strip()
+    ]
+    DEAD_LETTER_WORKERS = int(os.getenv("DEAD_LETTER_WORKERS", 1))
+
+    # HTTP client
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 4))  # host pools kept
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 16))  # connections per host
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+
+    # HTTP response cache
+    HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "off")  # off, on or offline
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".cache/http")
+    HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", 86400))  # seconds
+    HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+    # Raw-payload archive
+    PAYLOAD_ARCHIVE_MODE = os.getenv("PAYLOAD_ARCHIVE_MODE", "off")  # off, record or replay
+    PAYLOAD_ARCHIVE_DIR = os.getenv("PAYLOAD_ARCHIVE_DIR", ".archive/payloads")
+    PAYLOAD_ARCHIVE_SEGMENT_BYTES = int(
+        os.getenv("PAYLOAD_ARCHIVE_SEGMENT_BYTES", 64 * 1024 * 1024)
+    )
+
+    # Trigger service
+    ETL_SERVICE_HOST = os.getenv("ETL_SERVICE_HOST", "127.0.0.1")
+    ETL_SERVICE_PORT = int(os.getenv("ETL_SERVICE_PORT", 8088))
+    ETL_SERVICE_JOB_HISTORY = int(os.getenv("ETL_SERVICE_JOB_HISTORY", 100))  # finished jobs kept
+    ETL_SERVICE_INITIAL_JOB = os.getenv("ETL_SERVICE_INITIAL_JOB", "")  # START-END queued on startup
+
+    # Metrics
+    METRICS_FILE = os.getenv("METRICS_FILE", "")  # Prometheus textfile, written after each run
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # 0 disables the /metrics endpoint
+    RUN_SUMMARY_FILE = os.getenv("RUN_SUMMARY_FILE", "")  # JSON summary of the last run
+
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = os.getenv("LOG_FILE", "pokeapi_etl.log")
+    LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() == "true"  # write logs on a listener thread
+    LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 100))  # per-record messages: 1 in N
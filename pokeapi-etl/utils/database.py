@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from utils.config import Config
+from utils.metrics import metrics
 from data_models.models import Base
 
 engine = create_engine(
@@ -13,6 +16,21 @@ engine = create_engine(
 )
 
 
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info["statement_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_round_trip(conn, cursor, statement, parameters, context, executemany):
+    """Count every statement sent to any engine, by SQL verb, for the pipeline metrics"""
+    verb = statement.split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    metrics.inc("etl_db_round_trips_total", verb=verb)
+    started = conn.info.pop("statement_started", None)
+    if started is not None:
+        metrics.observe("etl_db_statement_seconds", time.perf_counter() - started, verb=verb)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 SessionScoped = scoped_session(SessionLocal)
 
@@ -22,5 +40,30 @@ def get_database_engine():
 def create_database_session():
     return SessionScoped()
 
+def with_session(session, work):
+    """Run `work(session)` and commit, opening and closing a session if none is given"""
+    own_session = session is None
+    if own_session:
+        session = create_database_session()
+    try:
+        result = work(session)
+        session.commit()
+        return result
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if own_session:
+            session.close()
+
 def create_tables(engine_param=None):
     Base.metadata.create_all(bind=engine_param or engine)
+
+
+def configure_database(url, **engine_kwargs):
+    """Rebind the shared engine and sessions to another database URL or Engine (benchmarks, tooling)"""
+    global engine
+    SessionScoped.remove()
+    engine = url if isinstance(url, Engine) else create_engine(url, pool_pre_ping=True, **engine_kwargs)
+    SessionLocal.configure(bind=engine)
+    return engine
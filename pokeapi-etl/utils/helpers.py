@@ -1,8 +1,199 @@
 import logging
+import threading
 import time
-from utils.config import Config
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import os
 
-def get_request_delay():
-    delay = Config.REQUEST_DELAY
-    return float(delay)
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket plus in-flight cap shared by every request, tuned by server feedback (AIMD)
+
+    Each request takes a token (refilled at `rate` per second) and an in-flight slot
+    (at most `concurrency` at once). Successful responses raise the rate additively,
+    by about `increase` requests/s per second, and the in-flight cap by one per round of
+    responses. A 429 or 503, a failed request, or latency above `latency_target` is a
+    congestion signal: the rate and cap are cut by `decrease` at most once per
+    `cooldown` seconds, and a Retry-After pauses every caller for that long. With
+    `adaptive` off the limiter holds `rate` and `concurrency` fixed; a rate of 0 or
+    None leaves requests unpaced.
+    """
+
+    def __init__(
+        self,
+        rate,
+        min_rate=0.5,
+        max_rate=None,
+        concurrency=16,
+        max_concurrency=None,
+        adaptive=True,
+        increase=1.0,
+        decrease=0.5,
+        latency_target=None,
+        cooldown=1.0,
+    ):
+        self.max_rate = max_rate or rate
+        self.rate = min(rate, self.max_rate) if rate and rate > 0 else None
+        self.min_rate = min(min_rate, self.rate) if self.rate else min_rate
+        self.max_concurrency = max_concurrency or concurrency
+        self.concurrency = min(concurrency, self.max_concurrency)
+        self.adaptive = adaptive
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.latency = None  # moving average of response latency
+        self.throttled = 0
+        self._condition = threading.Condition()
+        self._tokens = 1.0
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased_at = float("-inf")
+        self._in_flight = 0
+        self._round_successes = 0
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(1.0, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self):
+        """Block until the caller may send its next request; pair with `release()`"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._in_flight >= self.concurrency:
+                    wait = None
+                elif not self.rate or self._tokens >= 1:
+                    self._tokens -= 1 if self.rate else 0
+                    self._in_flight += 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+                self._condition.wait(wait)
+
+    def release(self, latency=None, status=None, retry_after=None):
+        """Free the caller's slot and feed back how its request went
+
+        `status` is the response's HTTP status, or None when the request failed outright.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if latency is not None:
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if status is None or status in (429, 503):
+                self._throttle(retry_after)
+            elif self.latency_target and self.latency and self.latency > self.latency_target:
+                self._throttle(None)
+            elif self.adaptive:
+                self._speed_up()
+            self._condition.notify_all()
+
+    def throttle(self, retry_after=None):
+        """Report a 429/503 seen outside `release()`, such as one retried by the HTTP client"""
+        with self._condition:
+            self._throttle(retry_after)
+            self._condition.notify_all()
+
+    def _throttle(self, retry_after):
+        now = time.monotonic()
+        self.throttled += 1
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if not self.adaptive or now - self._decreased_at < self.cooldown:
+            return
+        self._decreased_at = now
+        if self.rate:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.concurrency = max(1, int(self.concurrency * self.decrease))
+        self._round_successes = 0
+
+    def _speed_up(self):
+        if self.rate:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+        self._round_successes += 1
+        if self._round_successes >= self.concurrency:
+            self._round_successes = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    @property
+    def current_rate(self):
+        """Requests per second currently allowed (None when unpaced)"""
+        return self.rate
+
+    def stats(self):
+        with self._condition:
+            return {
+                "rate": round(self.rate, 3) if self.rate else None,
+                "concurrency": self.concurrency,
+                "in_flight": self._in_flight,
+                "throttled": self.throttled,
+                "latency": round(self.latency, 4) if self.latency is not None else None,
+            }
+
+
+class SingleFlight:
+    """Memoizes results by key; concurrent callers for the same key share one in-flight call.
+
+    Failed calls (returning None) are not memoized so a later caller can retry them.
+    With `max_entries` set, the least recently used results are dropped beyond that size.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            event.wait()
+            return self._results.get(key)
+
+        value = None
+        try:
+            value = fn(key)
+        finally:
+            with self._lock:
+                if value is not None:
+                    self._results[key] = value
+                    if self.max_entries and len(self._results) > self.max_entries:
+                        self._results.popitem(last=False)
+                del self._inflight[key]
+            event.set()
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
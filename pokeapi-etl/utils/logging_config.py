@@ -1,16 +1,76 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 from utils.config import Config
 
-def setup_logging(logger_name='pokeapi_etl', level=None):
-    if level is None:
-        level = getattr(logging, Config.LOG_LEVEL)
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s"
 
+# One handler set per process; loggers only enqueue records, the listener thread writes them
+_handler_lock = threading.Lock()
+_handlers = None
+_listener = None
+_samplers = []
+
+
+def _build_handlers():
     log_dir = os.path.dirname(Config.LOG_FILE)
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
+    formatter = logging.Formatter(LOG_FORMAT)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(
+        Config.LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3  # 5MB
+    )
+    file_handler.setFormatter(formatter)
+    return [console_handler, file_handler]
+
+
+def _shared_handlers():
+    """Handlers every pipeline logger writes through, created once per process
+
+    With LOG_QUEUE on (the default) that is a single QueueHandler feeding a QueueListener,
+    so file writes and rotation checks happen on the listener's thread, not the caller's.
+    """
+    global _handlers, _listener
+    with _handler_lock:
+        if _handlers is None:
+            handlers = _build_handlers()
+            if Config.LOG_QUEUE:
+                log_queue = queue.SimpleQueue()
+                _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+                _listener.start()
+                atexit.register(shutdown_logging)
+                _handlers = [QueueHandler(log_queue)]
+            else:
+                _handlers = handlers
+        return _handlers
+
+
+def shutdown_logging():
+    """Stop the listener thread once every queued record has been written, then close its files
+
+    The handler set is dropped with it, so a later `setup_logging` starts a fresh listener
+    instead of handing out a queue handler nothing reads from.
+    """
+    global _handlers, _listener
+    with _handler_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+            _handlers = None
+
+
+def setup_logging(logger_name='pokeapi_etl', level=None):
+    if level is None:
+        level = getattr(logging, Config.LOG_LEVEL)
+
     logger = logging.getLogger(logger_name)
     logger.setLevel(level)
     logger.propagate = False
@@ -18,26 +78,8 @@ def setup_logging(logger_name='pokeapi_etl', level=None):
     if logger.handlers:
         for handler in logger.handlers[:]:
             logger.removeHandler(handler)
-
-    log_file = Config.LOG_FILE
-    file_handler = RotatingFileHandler(
-        log_file, maxBytes=5 * 1024 * 1024, backupCount=3  # 5MB
-    )
-    file_handler.setLevel(logging.DEBUG)
-
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s"
-    )
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # File handler
-    file_handler.setLevel(level)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    for handler in _shared_handlers():
+        logger.addHandler(handler)
 
     return logger
 
@@ -45,23 +87,64 @@ def setup_logging(logger_name='pokeapi_etl', level=None):
 def setup_logger():
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG)
+    for handler in _shared_handlers():
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
 
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    return logger
 
-    log_file = Config.LOG_FILE
-    file_handler = RotatingFileHandler(
-        log_file, maxBytes=5 * 1024 * 1024, backupCount=3  # 5MB
-    )
-    file_handler.setLevel(logging.DEBUG)
 
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s"
-    )
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
+class SampledLogger:
+    """Logs per-record messages sampled by key: the first, then every `every`-th one
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    Hot loops log through this instead of the logger, so a run over thousands of records
+    writes a handful of lines per message kind. Arguments are %-formatted only for the
+    lines kept; `report_sampled_logs()` logs how many were seen and dropped.
+    """
 
-    return logger
+    def __init__(self, logger, every=None):
+        self.logger = logger
+        self.every = max(Config.LOG_SAMPLE_EVERY if every is None else every, 1)
+        self._lock = threading.Lock()
+        self._seen = {}
+        with _handler_lock:
+            _samplers.append(self)
+
+    def log(self, level, key, msg, *args):
+        if not self.logger.isEnabledFor(level):
+            return
+        with self._lock:
+            seen = self._seen[key] = self._seen.get(key, 0) + 1
+        if seen == 1 or seen % self.every == 0:
+            if seen > 1:
+                msg = f"{msg} [{seen} so far, 1 in {self.every} logged]"
+            self.logger.log(level, msg, *args, stacklevel=3)
+
+    def debug(self, key, msg, *args):
+        self.log(logging.DEBUG, key, msg, *args)
+
+    def info(self, key, msg, *args):
+        self.log(logging.INFO, key, msg, *args)
+
+    def warning(self, key, msg, *args):
+        self.log(logging.WARNING, key, msg, *args)
+
+    def take_counts(self):
+        """Return and reset {key: messages seen} since the last call"""
+        with self._lock:
+            seen, self._seen = self._seen, {}
+        return seen
+
+
+def report_sampled_logs(logger):
+    """Log, per sampled message kind, how many messages were seen and how many dropped"""
+    with _handler_lock:
+        samplers = list(_samplers)
+    for sampler in samplers:
+        for key, seen in sorted(sampler.take_counts().items()):
+            logged = seen if sampler.every == 1 else 1 + seen // sampler.every
+            if seen > logged:
+                logger.info(
+                    f"{sampler.logger.name}: {seen} '{key}' messages, {seen - logged} not logged "
+                    f"(sampled 1 in {sampler.every})."
+                )
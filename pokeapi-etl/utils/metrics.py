@@ -0,0 +1,245 @@
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bucket upper bounds: seconds for latencies, item counts for queue depths
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DEPTH_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# name -> (type, help, buckets); every metric the pipeline records is declared here
+METRICS = {
+    "etl_http_requests_total": (
+        "counter", "HTTP fetches by endpoint kind and outcome (status code, cache_hit, error)", None
+    ),
+    "etl_http_request_seconds": (
+        "histogram", "Network request latency by endpoint kind, retries included", LATENCY_BUCKETS
+    ),
+    "etl_http_decode_seconds": (
+        "histogram", "JSON decode and field projection time by endpoint kind", LATENCY_BUCKETS
+    ),
+    "etl_http_bytes_downloaded_total": ("counter", "Response body bytes by endpoint kind", None),
+    "etl_http_retries_total": ("counter", "Requests retried by the HTTP client", None),
+    "etl_http_backoff_seconds_total": ("counter", "Time slept in retry backoff", None),
+    "etl_http_rate_limit": ("gauge", "Requests per second the adaptive limiter allows", None),
+    "etl_http_concurrency_limit": ("gauge", "Requests the adaptive limiter lets run at once", None),
+    "etl_stage_seconds": (
+        "histogram", "Time per record (extract, transform) or per batch (load, transform_batch)",
+        LATENCY_BUCKETS,
+    ),
+    "etl_db_round_trips_total": ("counter", "Statements sent to the database by verb", None),
+    "etl_db_statement_seconds": ("histogram", "Database statement latency", LATENCY_BUCKETS),
+    "etl_rows_written_total": ("counter", "Rows written (committed) per table", None),
+    "etl_records_loaded_total": (
+        "counter", "Pokémon by load outcome (inserted, updated, unchanged, failed)", None
+    ),
+    "etl_queue_depth": ("gauge", "Records waiting between streaming stages", None),
+    "etl_queue_depth_observed": (
+        "histogram", "Queue depth sampled each time the load stage takes a record", DEPTH_BUCKETS
+    ),
+    "etl_service_triggers_total": (
+        "counter", "Trigger-service requests by outcome (queued, coalesced, rejected)", None
+    ),
+    "etl_service_jobs_total": ("counter", "Trigger-service jobs finished by status", None),
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _bound(bound):
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+class MetricsRegistry:
+    """Thread-safe in-process counters, gauges and histograms for the pipeline
+
+    Values accumulate for the life of the process, as Prometheus expects; per-run
+    figures come from diffing against a `snapshot()` taken when the run started.
+    """
+
+    def __init__(self, definitions=METRICS):
+        self.definitions = definitions
+        self._lock = threading.Lock()
+        self._values = {name: {} for name in definitions}
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._values[name][_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        buckets = self.definitions[name][2]
+        key = _key(labels)
+        with self._lock:
+            series = self._values[name].get(key)
+            if series is None:
+                series = self._values[name][key] = {
+                    "buckets": [0] * (len(buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return copy.deepcopy(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values = {name: {} for name in self.definitions}
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        values = self.snapshot()
+        lines = []
+        for name, (kind, help_text, buckets) in self.definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(values[name].items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + [float("inf")], value["buckets"]):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{_format_labels(key, [('le', _bound(bound))])} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_format_labels(key)} {value['sum']:g}")
+                lines.append(f"{name}_count{_format_labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, since=None):
+        """JSON-ready view of the metrics, limited to what changed after `since` (a snapshot)
+
+        Histograms are reported as count, sum, mean and p50/p99 estimated from buckets.
+        """
+        values = self.snapshot()
+        since = since or {}
+        result = {}
+        for name, (kind, _, buckets) in self.definitions.items():
+            entries = []
+            for key, value in sorted(values[name].items()):
+                before = since.get(name, {}).get(key)
+                if kind == "counter":
+                    value -= before or 0
+                    if not value:
+                        continue
+                elif kind == "histogram":
+                    value = _histogram_delta(value, before)
+                    if not value["count"]:
+                        continue
+                    value = _histogram_summary(value, buckets)
+                entries.append({"labels": dict(key), "value": value})
+            if entries:
+                result[name] = entries
+        return result
+
+
+def _histogram_delta(value, before):
+    if before is None:
+        return value
+    return {
+        "buckets": [now - then for now, then in zip(value["buckets"], before["buckets"])],
+        "sum": value["sum"] - before["sum"],
+        "count": value["count"] - before["count"],
+    }
+
+
+def _bucket_quantile(quantile, buckets, counts):
+    """Linear interpolation within the bucket holding the quantile, like histogram_quantile()"""
+    total = sum(counts)
+    rank = quantile * total
+    cumulative = 0
+    lower = 0.0
+    for bound, count in zip(list(buckets) + [float("inf")], counts):
+        if count and cumulative + count >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound
+    return lower
+
+
+def _histogram_summary(value, buckets):
+    return {
+        "count": value["count"],
+        "sum": round(value["sum"], 6),
+        "mean": round(value["sum"] / value["count"], 6),
+        "p50": round(_bucket_quantile(0.5, buckets, value["buckets"]), 6),
+        "p99": round(_bucket_quantile(0.99, buckets, value["buckets"]), 6),
+    }
+
+
+# Process-wide registry shared by every pipeline module
+metrics = MetricsRegistry()
+
+
+def write_prometheus_file(path, registry=metrics):
+    """Write the metrics for a node_exporter textfile collector (atomically)"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(registry.to_prometheus())
+    os.replace(temporary, path)
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True, default=str)
+
+
+def start_metrics_server(port, host="0.0.0.0", registry=metrics):
+    """Serve GET /metrics in the Prometheus text format on a daemon thread"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server